@@ -0,0 +1,52 @@
+from typing import Optional
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+import hashlib
+import json
+import os
+import uuid
+
+from .loaders import Document
+
+
+def content_hash(document: Document) -> str:
+    """Stable hash of the fields that determine a document's stored form"""
+    digest = hashlib.sha256(document.content.encode("utf8"))
+    update_date = getattr(document, "update_date", None)
+    if update_date:
+        digest.update(b"\0" + update_date.encode("utf8"))
+    return digest.hexdigest()
+
+
+@dataclass
+class IngestCheckpoint:
+    """Progress of a streaming ingest, persisted after every committed window
+
+    ``offset`` is the number of source entries fully processed, so a resumed
+    run continues from there. ``snapshot`` identifies the source file version;
+    a checkpoint for a different snapshot is not resumed.
+    """
+    snapshot: Optional[str] = None
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    offset: int = 0
+    windows: int = 0
+    successful: int = 0
+    failed: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    completed: bool = False
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["IngestCheckpoint"]:
+        """Read a checkpoint, or return None if there is none"""
+        if not Path(path).exists():
+            return None
+        with open(path, encoding="utf8") as f:
+            return cls(**json.load(f))
+
+    def save(self, path: Path) -> None:
+        """Atomically write the checkpoint"""
+        tmp_path = Path(f"{path}.tmp")
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
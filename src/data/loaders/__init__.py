@@ -1,2 +1,3 @@
-from .base_loader import BaseDatasetLoader, Document
-from .arxiv_loader import ArxivLoader
\ No newline at end of file
+from .base_loader import BaseDatasetLoader, Document, DocumentBatch
+from .arxiv_loader import ArxivLoader
+from .filters import Contains, Equals, In, Range
\ No newline at end of file
@@ -17,17 +17,24 @@
 
 import json
 import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, Iterator, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
 from dataclasses import dataclass
 
+import numpy as np
+
 from .base_loader import BaseDatasetLoader, Document
+from .field_index import FieldIndex
+from .filters import EntryFilter
+from .offset_index import LineOffsetIndex
 
 
 
-@dataclass
-class ArxivDocument(Document):
-    """ArXiv specific document class"""
+@dataclass(slots=True)
+class _ArxivFields(Document):
     submitter: str
     authors: str
     title: str
@@ -37,16 +44,65 @@ class ArxivDocument(Document):
     report_no: str
     categories: str
     license: str
-    abstract: str
     update_date: str
 
 
+class ArxivDocument(_ArxivFields):
+    """ArXiv specific document class
+
+    The abstract is the document content and is not stored a second time;
+    ``abstract`` remains accepted as a constructor keyword and as a settable
+    alias of ``content``.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, abstract: Optional[str] = None, **kwargs):
+        if abstract is not None:
+            content = args[1] if len(args) > 1 else kwargs.get("content", abstract)
+            if content != abstract:
+                raise ValueError("ArxivDocument content and abstract must match")
+            if len(args) <= 1:
+                kwargs["content"] = abstract
+        super().__init__(*args, **kwargs)
+
+    @property
+    def abstract(self) -> str:
+        return self.content
+
+    @abstract.setter
+    def abstract(self, value: str) -> None:
+        self.content = value
+
+
+def _parse_range(
+        loader_cls: Type["ArxivLoader"],
+        data_dir: str,
+        start: int,
+        end: int,
+        filter_dict: Optional[Dict[str, Any]] = None
+) -> List[ArxivDocument]:
+    """Parse the entries in a line-aligned byte range (process pool worker)"""
+    loader = loader_cls(data_dir)
+    entry_filter = EntryFilter(filter_dict) if filter_dict else None
+    documents = []
+    for entry in loader._load_entries(start, end, entry_filter.prefilter if entry_filter else None):
+        if entry_filter and not entry_filter.matches(entry):
+            continue
+        try:
+            documents.append(loader._parse_entry(entry))
+        except Exception as e:
+            loader.logger.error(f"Error parsing entry at bytes {start}-{end}: {str(e)}")
+    return documents
+
+
 class ArxivLoader(BaseDatasetLoader):
     """Loader for ArXiv dataset"""
 
     # Class constants
     FILENAME = "arxiv-metadata-oai-snapshot.json"
     VERSION = "1.1.0"
+    PARALLEL_CHUNK_BYTES = 8 * 1024 * 1024
+    INDEXED_FIELDS = ("categories", "update_date", "authors")
 
     def __init__(self, data_dir: str):
         """
@@ -57,6 +113,14 @@ class ArxivLoader(BaseDatasetLoader):
         """
         super().__init__(data_dir)
         self.file_path = Path(data_dir) / self.FILENAME
+        self._index: Optional[LineOffsetIndex] = None
+
+        # Constant metadata shared by every document from this file (read-only)
+        self._metadata = {
+            "source": sys.intern(str(self.file_path)),
+            "version": self.VERSION
+        }
+        self._field_indexes: Dict[str, FieldIndex] = {}
 
     @property
     def download_instructions(self) -> str:
@@ -82,10 +146,7 @@ class ArxivLoader(BaseDatasetLoader):
         return ArxivDocument(
             id=entry["id"],
             content=entry["abstract"],  # Using abstract as main content
-            metadata={
-                "source": str(self.file_path),
-                "version": self.VERSION
-            },
+            metadata=self._metadata,
             submitter=entry["submitter"],
             authors=entry["authors"],
             title=entry["title"],
@@ -93,68 +154,390 @@ class ArxivLoader(BaseDatasetLoader):
             journal_ref=entry["journal-ref"],
             doi=entry["doi"],
             report_no=entry["report-no"],
-            categories=entry["categories"],
-            license=entry["license"],
-            abstract=entry["abstract"],
-            update_date=entry["update_date"]
+            categories=sys.intern(entry["categories"]),
+            license=entry["license"] and sys.intern(entry["license"]),
+            update_date=sys.intern(entry["update_date"])
         )
 
-    def _load_entries(self) -> Iterator[Dict]:
-        """Load entries from the JSON file"""
-        with open(self.file_path, encoding="utf8") as f:
+    def _load_entries(
+            self,
+            start: int = 0,
+            end: Optional[int] = None,
+            prefilter: Optional[Callable[[bytes], bool]] = None
+    ) -> Iterator[Dict]:
+        """Load entries from the JSON file, optionally within a byte range
+
+        Lines rejected by ``prefilter`` are skipped without being parsed.
+        """
+        with open(self.file_path, "rb") as f:
+            f.seek(start)
+            position = start
             for line in f:
+                if end is not None and position >= end:
+                    break
+                position += len(line)
+                if prefilter is not None and not prefilter(line):
+                    continue
                 yield json.loads(line)
 
-    def load_documents(self, limit: Optional[int] = None) -> list[ArxivDocument]:
+    def build_index(self, force: bool = False) -> LineOffsetIndex:
+        """
+        Load the byte-offset index, building it if missing or stale
+
+        The index is stored next to the dataset file and rebuilt whenever the
+        file's size or modification time changes.
+
+        Args:
+            force: Rebuild even if a fresh sidecar exists
+
+        Returns:
+            LineOffsetIndex for the dataset file
+        """
+        self._validate_file()
+
+        if not force and self._index is not None and not self._index.is_stale(self.file_path):
+            return self._index
+
+        sidecar = LineOffsetIndex.sidecar_path(self.file_path)
+        index = None
+        if not force and sidecar.exists():
+            index = LineOffsetIndex.load(sidecar)
+            if index.is_stale(self.file_path):
+                self.logger.info(f"Offset index {sidecar} is stale, rebuilding")
+                index = None
+
+        if index is None:
+            index = LineOffsetIndex.build(self.file_path)
+            index.save(sidecar)
+
+        self._index = index
+        return index
+
+    def iter_documents(
+            self,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> Iterator[ArxivDocument]:
+        """
+        Stream ArXiv documents one at a time
+
+        Only the current line is held in memory, so this is safe to use on
+        the full snapshot.
+
+        Args:
+            limit: Maximum number of entries to read
+            offset: Number of entries to skip; seeks via the offset index
+
+        Yields:
+            ArxivDocument objects
+        """
+        for i, document in self.iter_numbered_documents(offset):
+            if limit and i - offset >= limit:
+                break
+            yield document
+
+    def iter_numbered_documents(self, offset: int = 0) -> Iterator[Tuple[int, ArxivDocument]]:
+        """
+        Stream ``(line_number, document)`` pairs starting at line ``offset``
+
+        Args:
+            offset: Number of entries to skip; seeks via the offset index
+
+        Yields:
+            (line_number, ArxivDocument) tuples
+        """
+        self._validate_file()
+
+        start = self.build_index().byte_range(offset)[0] if offset else 0
+        for i, entry in enumerate(self._load_entries(start), start=offset):
+            try:
+                yield i, self._parse_entry(entry)
+            except Exception as e:
+                self.logger.error(f"Error parsing entry {i}: {str(e)}")
+                continue
+
+    def snapshot_id(self) -> Optional[str]:
+        """Size and modification time of the dataset file"""
+        self._validate_file()
+        stat = os.stat(self.file_path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def load_documents(
+            self,
+            limit: Optional[int] = None,
+            offset: int = 0,
+            workers: Optional[int] = None,
+            ordered: bool = True
+    ) -> list[ArxivDocument]:
         """
         Load ArXiv documents
 
         Args:
             limit: Maximum number of documents to load
+            offset: Number of entries to skip
+            workers: Parse in this many processes (see iter_document_chunks)
+            ordered: Keep file order when parsing in parallel
 
         Returns:
             List of ArxivDocument objects
         """
+        if workers:
+            return self._collect(
+                self.iter_document_chunks(workers, ordered=ordered, offset=offset),
+                limit
+            )
+        return list(self.iter_documents(limit, offset))
+
+    def _chunk_ranges(self, start: int = 0, chunk_bytes: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Cut the file from ``start`` into line-aligned byte ranges of about ``chunk_bytes``"""
+        chunk_bytes = chunk_bytes or self.PARALLEL_CHUNK_BYTES
+        size = os.path.getsize(self.file_path)
+        bounds = [start]
+        with open(self.file_path, "rb") as f:
+            position = start + chunk_bytes
+            while position < size:
+                f.seek(position)
+                f.readline()  # advance to the next line start
+                position = f.tell()
+                if position >= size:
+                    break
+                bounds.append(position)
+                position += chunk_bytes
+        bounds.append(size)
+        return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def iter_document_chunks(
+            self,
+            workers: Optional[int] = None,
+            ordered: bool = True,
+            chunk_bytes: Optional[int] = None,
+            offset: int = 0,
+            filter_dict: Optional[Dict[str, Any]] = None
+    ) -> Iterator[List[ArxivDocument]]:
+        """
+        Parse the dataset in a process pool, yielding documents in chunks
+
+        The file is split into line-aligned byte ranges of about ``chunk_bytes``
+        that are parsed by ``workers`` processes. At most two ranges per worker
+        are in flight, so memory stays bounded.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count)
+            ordered: Yield chunks in file order, otherwise as they complete
+            chunk_bytes: Approximate size of each parsed range
+            offset: Number of entries to skip; seeks via the offset index
+            filter_dict: Only return entries matching these criteria
+
+        Yields:
+            Lists of ArxivDocument objects, one per byte range
+        """
         self._validate_file()
 
+        workers = workers or os.cpu_count() or 1
+        start = self.build_index().byte_range(offset)[0] if offset else 0
+        ranges = iter(self._chunk_ranges(start, chunk_bytes))
+        max_pending = 2 * workers
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            def submit() -> bool:
+                byte_range = next(ranges, None)
+                if byte_range is None:
+                    return False
+                pending.append(executor.submit(
+                    _parse_range, self.__class__, self.data_dir, *byte_range, filter_dict
+                ))
+                return True
+
+            pending = deque()
+            try:
+                while len(pending) < max_pending and submit():
+                    pass
+
+                while pending:
+                    if ordered:
+                        future = pending.popleft()
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        future = done.pop()
+                        pending.remove(future)
+                    submit()
+                    yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _collect(chunks: Iterator[List[ArxivDocument]], limit: Optional[int]) -> List[ArxivDocument]:
+        """Concatenate chunks, stopping once ``limit`` documents were collected"""
         documents = []
-        for i, entry in enumerate(self._load_entries()):
-            if limit and i >= limit:
-                break
+        for chunk in chunks:
+            documents.extend(chunk)
+            if limit and len(documents) >= limit:
+                return documents[:limit]
+        return documents
+
+    def load_slice(self, start: int, stop: int) -> List[ArxivDocument]:
+        """
+        Load the documents on lines ``[start, stop)``
+
+        Args:
+            start: First line to read
+            stop: Line to stop before
 
+        Returns:
+            List of ArxivDocument objects
+        """
+        begin, end = self.build_index().byte_range(start, stop)
+        documents = []
+        for i, entry in enumerate(self._load_entries(begin, end), start=start):
             try:
-                document = self._parse_entry(entry)
-                documents.append(document)
+                documents.append(self._parse_entry(entry))
             except Exception as e:
                 self.logger.error(f"Error parsing entry {i}: {str(e)}")
+        return documents
+
+    def get_document(self, arxiv_id: str) -> Optional[ArxivDocument]:
+        """
+        Fetch a single paper by its arXiv ID without scanning the file
+
+        Args:
+            arxiv_id: arXiv identifier, e.g. "0704.0001"
+
+        Returns:
+            ArxivDocument or None if the ID is not in the dataset
+        """
+        line = self.build_index().line_of(arxiv_id)
+        if line is None:
+            return None
+        documents = self.load_slice(line, line + 1)
+        return documents[0] if documents else None
+
+    def split_ranges(self, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the dataset into line-aligned byte ranges for parallel workers
+
+        Args:
+            parts: Number of ranges to produce
+
+        Returns:
+            List of (start_byte, end_byte) tuples covering the file
+        """
+        index = self.build_index()
+        return [index.byte_range(start, stop) for start, stop in index.split(parts)]
+
+    @staticmethod
+    def _matches(entry: Dict, filter_dict: Dict[str, Any]) -> bool:
+        """Check whether a raw entry matches all criteria"""
+        return EntryFilter(filter_dict).matches(entry)
+
+    def build_field_indexes(
+            self,
+            fields: Tuple[str, ...] = INDEXED_FIELDS,
+            force: bool = False
+    ) -> Dict[str, FieldIndex]:
+        """
+        Load or build persistent secondary indexes on entry fields
+
+        Indexes are stored next to the dataset file, rebuilt when the file
+        changes, and then used by load_by_filter to read matching lines only.
+
+        Args:
+            fields: Fields to index
+            force: Rebuild even if fresh sidecars exist
+
+        Returns:
+            Mapping of field name to FieldIndex
+        """
+        self._validate_file()
+
+        missing = []
+        for field in fields:
+            index = None if force else self._load_field_index(field)
+            if index is None:
+                missing.append(field)
+
+        if missing:
+            for field, index in FieldIndex.build_many(self.file_path, missing).items():
+                index.save(FieldIndex.sidecar_path(self.file_path, field))
+                self._field_indexes[field] = index
+
+        return {field: self._field_indexes[field] for field in fields}
+
+    def _load_field_index(self, field: str) -> Optional[FieldIndex]:
+        """Return a fresh index for ``field`` from memory or disk, if any"""
+        index = self._field_indexes.get(field)
+        if index is None:
+            sidecar = FieldIndex.sidecar_path(self.file_path, field)
+            if sidecar.exists():
+                index = FieldIndex.load(sidecar)
+
+        if index is None or index.is_stale(self.file_path):
+            self._field_indexes.pop(field, None)
+            return None
+
+        self._field_indexes[field] = index
+        return index
+
+    def _indexed_lines(self, entry_filter: EntryFilter) -> Optional[np.ndarray]:
+        """Candidate line numbers from secondary indexes, or None if none apply"""
+        lines = None
+        for field, predicate in entry_filter.predicates.items():
+            index = self._load_field_index(field)
+            candidates = index.candidates(predicate) if index is not None else None
+            if candidates is None:
                 continue
+            lines = candidates if lines is None else np.intersect1d(lines, candidates, assume_unique=True)
+        return lines
 
-        return documents
+    def _load_lines(self, lines: np.ndarray) -> Iterator[Dict]:
+        """Load the entries on the given (sorted) line numbers"""
+        offsets = self.build_index().offsets
+        with open(self.file_path, "rb") as f:
+            for line in lines:
+                f.seek(int(offsets[line]))
+                yield json.loads(f.readline())
 
     def load_by_filter(
             self,
-            filter_dict: Dict[str, str],
-            limit: Optional[int] = None
+            filter_dict: Dict[str, Any],
+            limit: Optional[int] = None,
+            workers: Optional[int] = None,
+            ordered: bool = True
     ) -> list[ArxivDocument]:
         """
         Load documents matching specific criteria
 
+        Values are matched for equality unless they are predicates from
+        ``filters`` (Contains, In, Range). When secondary indexes exist for
+        filtered fields only the candidate lines are read; otherwise lines are
+        pre-filtered on their raw bytes before being parsed.
+
         Args:
-            filter_dict: Dictionary of field-value pairs to filter by
+            filter_dict: Dictionary of field-value (or field-predicate) pairs to filter by
             limit: Maximum number of documents to return
+            workers: Parse in this many processes (see iter_document_chunks)
+            ordered: Keep file order when parsing in parallel
 
         Returns:
             List of matching ArxivDocument objects
         """
-        documents = []
+        entry_filter = EntryFilter(filter_dict)
+        lines = self._indexed_lines(entry_filter)
 
-        for i, entry in enumerate(self._load_entries()):
-            matches = all(
-                entry.get(key, "") == value
-                for key, value in filter_dict.items()
+        if lines is not None:
+            entries = self._load_lines(lines)
+        elif workers:
+            return self._collect(
+                self.iter_document_chunks(workers, ordered=ordered, filter_dict=filter_dict),
+                limit
             )
+        else:
+            entries = self._load_entries(prefilter=entry_filter.prefilter)
 
-            if matches:
+        documents = []
+
+        for i, entry in enumerate(entries):
+            if entry_filter.matches(entry):
                 try:
                     document = self._parse_entry(entry)
                     documents.append(document)
@@ -165,4 +548,4 @@ class ArxivLoader(BaseDatasetLoader):
                     self.logger.error(f"Error parsing entry {i}: {str(e)}")
                     continue
 
-        return documents
\ No newline at end of file
+        return documents
@@ -1,17 +1,48 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
-    """Base document class that all dataset-specific documents will inherit from"""
+    """Base document class that all dataset-specific documents will inherit from
+
+    Documents are slotted to keep per-instance overhead low on large corpora.
+    ``metadata`` may be shared between documents from the same source, so
+    update it by assigning a new dict rather than mutating it in place.
+    """
     id: str
     content: str
     metadata: Dict[str, Any]
 
 
+@dataclass(slots=True)
+class DocumentBatch:
+    """Columnar batch of documents for bulk pipeline stages"""
+    ids: List[str]
+    contents: List[str]
+    metadata: List[Dict[str, Any]]
+
+    @classmethod
+    def from_documents(cls, documents: List[Document]) -> "DocumentBatch":
+        return cls(
+            ids=[document.id for document in documents],
+            contents=[document.content for document in documents],
+            metadata=[document.metadata for document in documents]
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Document]:
+        for doc_id, content, metadata in zip(self.ids, self.contents, self.metadata):
+            yield Document(id=doc_id, content=content, metadata=metadata)
+
+    def to_documents(self) -> List[Document]:
+        return list(self)
+
+
 class BaseDatasetLoader(ABC):
     """Abstract base class for all dataset loaders"""
 
@@ -38,6 +69,50 @@ class BaseDatasetLoader(ABC):
         """
         pass
 
+    def iter_documents(
+            self,
+            limit: Optional[int] = None,
+            offset: int = 0
+    ) -> Iterator[Document]:
+        """
+        Lazily iterate over documents from the dataset
+
+        Loaders backed by large files should override this to stream
+        records instead of materializing the full list.
+
+        Args:
+            limit: Maximum number of documents to yield
+            offset: Number of documents to skip
+
+        Yields:
+            Document objects
+        """
+        documents = self.load_documents(offset + limit if limit else None)
+        yield from documents[offset:]
+
+    def iter_numbered_documents(self, offset: int = 0) -> Iterator[Tuple[int, Document]]:
+        """
+        Iterate over ``(entry_number, document)`` pairs starting at ``offset``
+
+        Entry numbers count source records, including ones that failed to
+        parse, so ``entry_number + 1`` is a valid resume offset.
+
+        Args:
+            offset: Number of entries to skip
+
+        Yields:
+            (entry_number, Document) tuples
+        """
+        yield from enumerate(self.iter_documents(offset=offset), start=offset)
+
+    def snapshot_id(self) -> Optional[str]:
+        """
+        Identifier of the current version of the source data, if known
+
+        Used to decide whether an ingest checkpoint still applies.
+        """
+        return None
+
     @abstractmethod
     def load_by_filter(
             self,
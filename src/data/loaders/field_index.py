@@ -0,0 +1,133 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .filters import Contains, Equals, In, Predicate, Range, field_values
+
+
+class FieldIndex:
+    """Persistent secondary index mapping a field's values to line numbers
+
+    Values are kept sorted with their line lists in CSR layout, so equality
+    and membership are a binary search and range predicates are a slice.
+    Multi-valued fields (``categories``, ``authors``) are indexed per value.
+    """
+
+    def __init__(
+            self,
+            field: str,
+            values: np.ndarray,
+            offsets: np.ndarray,
+            lines: np.ndarray,
+            file_size: int,
+            file_mtime_ns: int
+    ):
+        self.field = field
+        self.values = values
+        self.offsets = offsets
+        self.lines = lines
+        self.file_size = file_size
+        self.file_mtime_ns = file_mtime_ns
+
+    @staticmethod
+    def sidecar_path(file_path: Path, field: str) -> Path:
+        return Path(f"{file_path}.{field}.idx.npz")
+
+    @classmethod
+    def build_many(cls, file_path: Path, fields: Iterable[str]) -> Dict[str, "FieldIndex"]:
+        """Build indexes for several fields in a single scan of the file"""
+        stat = os.stat(file_path)
+        postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in fields}
+
+        with open(file_path, "rb") as f:
+            for line_number, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                for field, field_postings in postings.items():
+                    for value in field_values(field, entry.get(field)):
+                        if value is not None:
+                            field_postings.setdefault(str(value), []).append(line_number)
+
+        indexes = {}
+        for field, field_postings in postings.items():
+            values = sorted(field_postings)
+            counts = [len(field_postings[value]) for value in values]
+            indexes[field] = cls(
+                field=field,
+                values=np.array([value.encode("utf8") for value in values], dtype=np.bytes_),
+                offsets=np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]),
+                lines=np.array(
+                    [line for value in values for line in field_postings[value]], dtype=np.uint32
+                ),
+                file_size=stat.st_size,
+                file_mtime_ns=stat.st_mtime_ns
+            )
+        return indexes
+
+    def save(self, path: Path) -> None:
+        tmp_path = Path(f"{path}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                field=np.array(self.field),
+                values=self.values,
+                offsets=self.offsets,
+                lines=self.lines,
+                file_stat=np.array([self.file_size, self.file_mtime_ns], dtype=np.int64)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FieldIndex":
+        with np.load(path) as data:
+            file_size, file_mtime_ns = (int(x) for x in data["file_stat"])
+            return cls(
+                str(data["field"]), data["values"], data["offsets"], data["lines"],
+                file_size, file_mtime_ns
+            )
+
+    def is_stale(self, file_path: Path) -> bool:
+        stat = os.stat(file_path)
+        return stat.st_size != self.file_size or stat.st_mtime_ns != self.file_mtime_ns
+
+    def _slice(self, lo: int, hi: int) -> np.ndarray:
+        return self.lines[self.offsets[lo]:self.offsets[hi]]
+
+    def lookup(self, value: str) -> np.ndarray:
+        """Lines where the field (or one of its values) equals ``value``"""
+        key = str(value).encode("utf8")
+        lo = int(np.searchsorted(self.values, key, side="left"))
+        hi = int(np.searchsorted(self.values, key, side="right"))
+        return self._slice(lo, hi)
+
+    def range(self, gte: Optional[str] = None, lte: Optional[str] = None) -> np.ndarray:
+        """Lines whose value lies in ``[gte, lte]`` (lexicographic)"""
+        lo = 0 if gte is None else int(np.searchsorted(self.values, str(gte).encode("utf8"), side="left"))
+        hi = len(self.values) if lte is None else int(
+            np.searchsorted(self.values, str(lte).encode("utf8"), side="right")
+        )
+        return self._slice(lo, max(lo, hi))
+
+    def candidates(self, predicate: Predicate) -> Optional[np.ndarray]:
+        """Sorted candidate lines for ``predicate``, or ``None`` if unsupported
+
+        Candidates are a superset of the matches; entries are re-checked after
+        parsing.
+        """
+        multi_valued = self.field in ("categories", "authors")
+        if isinstance(predicate, Contains) or (isinstance(predicate, Equals) and not multi_valued):
+            lines = self.lookup(predicate.value)
+        elif isinstance(predicate, In):
+            lines = np.concatenate([self.lookup(value) for value in predicate.values] or [self.lines[:0]])
+        elif isinstance(predicate, Range):
+            lower = predicate.gte if predicate.gte is not None else predicate.gt
+            upper = predicate.lte if predicate.lte is not None else predicate.lt
+            lines = self.range(lower, upper)
+        else:
+            return None
+        return np.unique(lines)
@@ -0,0 +1,142 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def split_authors(authors: str) -> List[str]:
+    """Split an arXiv author string ("A, B and C") into names"""
+    return [name.strip() for name in re.split(r",|\band\b", authors or "") if name.strip()]
+
+
+# Fields holding several values in one string, and how to split them
+MULTI_VALUE_FIELDS: Dict[str, Callable[[str], List[str]]] = {
+    "categories": lambda value: (value or "").split(),
+    "authors": split_authors,
+}
+
+
+def field_values(field: str, value: Any) -> List[Any]:
+    """Individual values of a (possibly multi-valued) field"""
+    splitter = MULTI_VALUE_FIELDS.get(field)
+    if splitter is None or not isinstance(value, str):
+        return [value]
+    return splitter(value)
+
+
+def _raw_token(value: Any) -> Optional[bytes]:
+    """Bytes that must appear verbatim in a JSON line containing ``value``
+
+    Only plain ASCII strings are safe: anything the writer might escape
+    differently (quotes, backslashes, non-ASCII) gets no pre-filter.
+    """
+    if not isinstance(value, str) or not value.isascii():
+        return None
+    encoded = json.dumps(value)[1:-1]
+    if encoded != value:
+        return None
+    return value.encode("ascii")
+
+
+class Predicate(ABC):
+    """Condition on a single entry field"""
+
+    @abstractmethod
+    def matches(self, field: str, value: Any) -> bool:
+        pass
+
+    def raw_tokens(self) -> Optional[List[bytes]]:
+        """Byte strings at least one of which a matching raw line must contain
+
+        ``None`` means no cheap pre-filter is possible.
+        """
+        return None
+
+
+@dataclass(frozen=True)
+class Equals(Predicate):
+    """Field equals ``value`` exactly"""
+    value: Any
+
+    def matches(self, field: str, value: Any) -> bool:
+        return value == self.value
+
+    def raw_tokens(self) -> Optional[List[bytes]]:
+        token = _raw_token(self.value)
+        return [token] if token else None
+
+
+@dataclass(frozen=True)
+class Contains(Predicate):
+    """Multi-valued field (e.g. ``categories``) contains ``value``"""
+    value: str
+
+    def matches(self, field: str, value: Any) -> bool:
+        return self.value in field_values(field, value)
+
+    def raw_tokens(self) -> Optional[List[bytes]]:
+        token = _raw_token(self.value)
+        return [token] if token else None
+
+
+@dataclass(frozen=True)
+class In(Predicate):
+    """Field, or one of its values, is any of ``values``"""
+    values: Tuple[Any, ...]
+
+    def __init__(self, values):
+        object.__setattr__(self, "values", tuple(values))
+
+    def matches(self, field: str, value: Any) -> bool:
+        return any(v in self.values for v in field_values(field, value))
+
+    def raw_tokens(self) -> Optional[List[bytes]]:
+        tokens = [_raw_token(value) for value in self.values]
+        return tokens if all(tokens) else None
+
+
+@dataclass(frozen=True)
+class Range(Predicate):
+    """Field lies within bounds (e.g. ISO ``update_date`` strings)"""
+    gte: Any = None
+    lte: Any = None
+    gt: Any = None
+    lt: Any = None
+
+    def matches(self, field: str, value: Any) -> bool:
+        if value is None:
+            return False
+        return (
+            (self.gte is None or value >= self.gte)
+            and (self.lte is None or value <= self.lte)
+            and (self.gt is None or value > self.gt)
+            and (self.lt is None or value < self.lt)
+        )
+
+
+class EntryFilter:
+    """Compiled filter over raw arXiv entries
+
+    Plain values in ``filter_dict`` mean equality. ``prefilter`` rejects raw
+    JSON lines that cannot match before they are parsed; ``matches`` gives the
+    exact answer on a parsed entry.
+    """
+
+    def __init__(self, filter_dict: Dict[str, Any]):
+        self.predicates: Dict[str, Predicate] = {
+            field: condition if isinstance(condition, Predicate) else Equals(condition)
+            for field, condition in filter_dict.items()
+        }
+        self._raw_tokens = [
+            tokens for tokens in (p.raw_tokens() for p in self.predicates.values()) if tokens
+        ]
+
+    def prefilter(self, line: bytes) -> bool:
+        return all(any(token in line for token in tokens) for tokens in self._raw_tokens)
+
+    def matches(self, entry: Dict) -> bool:
+        return all(
+            predicate.matches(field, entry.get(field, ""))
+            for field, predicate in self.predicates.items()
+        )
@@ -0,0 +1,113 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class LineOffsetIndex:
+    """Byte-offset index over a JSON-lines file
+
+    Holds the starting byte offset of every line plus a sorted array of record
+    IDs, so a reader can ``seek`` straight to line N or to a given ID. The index
+    is stored as a compact ``.npz`` sidecar next to the file and records the
+    file's size and mtime so it can be invalidated when the file changes.
+    """
+
+    SUFFIX = ".idx.npz"
+    _ID_PATTERN = re.compile(rb'"id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+    def __init__(
+            self,
+            offsets: np.ndarray,
+            ids: np.ndarray,
+            file_size: int,
+            file_mtime_ns: int
+    ):
+        # offsets has one entry per line plus the end-of-file offset
+        self.offsets = offsets
+        self.file_size = file_size
+        self.file_mtime_ns = file_mtime_ns
+
+        self._id_order = np.argsort(ids, kind="stable")
+        self._sorted_ids = ids[self._id_order]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def sidecar_path(cls, file_path: Path) -> Path:
+        return Path(f"{file_path}{cls.SUFFIX}")
+
+    @classmethod
+    def build(cls, file_path: Path) -> "LineOffsetIndex":
+        """Scan the file once, recording line offsets and record IDs"""
+        stat = os.stat(file_path)
+        offsets = [0]
+        ids = []
+        with open(file_path, "rb") as f:
+            for line in f:
+                offsets.append(offsets[-1] + len(line))
+                match = cls._ID_PATTERN.search(line)
+                if match:
+                    ids.append(json.loads(b'"' + match.group(1) + b'"').encode("utf8"))
+                else:
+                    ids.append(b"")
+
+        return cls(
+            offsets=np.array(offsets, dtype=np.uint64),
+            ids=np.array(ids, dtype=np.bytes_),
+            file_size=stat.st_size,
+            file_mtime_ns=stat.st_mtime_ns
+        )
+
+    def save(self, path: Path) -> None:
+        ids = np.empty_like(self._sorted_ids)
+        ids[self._id_order] = self._sorted_ids
+        tmp_path = Path(f"{path}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                offsets=self.offsets,
+                ids=ids,
+                file_stat=np.array([self.file_size, self.file_mtime_ns], dtype=np.int64)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LineOffsetIndex":
+        with np.load(path) as data:
+            file_size, file_mtime_ns = (int(x) for x in data["file_stat"])
+            return cls(data["offsets"], data["ids"], file_size, file_mtime_ns)
+
+    def is_stale(self, file_path: Path) -> bool:
+        """True when the indexed file changed size or mtime since the build"""
+        stat = os.stat(file_path)
+        return stat.st_size != self.file_size or stat.st_mtime_ns != self.file_mtime_ns
+
+    def line_of(self, record_id: str) -> Optional[int]:
+        """Line number holding ``record_id``, if present"""
+        key = record_id.encode("utf8")
+        position = int(np.searchsorted(self._sorted_ids, key))
+        if position < len(self._sorted_ids) and self._sorted_ids[position] == key:
+            return int(self._id_order[position])
+        return None
+
+    def byte_range(self, start: int = 0, stop: Optional[int] = None) -> Tuple[int, int]:
+        """Byte range covering lines ``[start, stop)``"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = min(max(start, 0), stop)
+        return int(self.offsets[start]), int(self.offsets[stop])
+
+    def split(self, parts: int) -> List[Tuple[int, int]]:
+        """Split the lines into ``parts`` contiguous ``(start, stop)`` ranges of similar byte size"""
+        parts = max(1, min(parts, len(self))) if len(self) else 1
+        targets = np.linspace(0, int(self.offsets[-1]), parts + 1)[1:-1]
+        bounds = [0] + np.searchsorted(self.offsets[:-1], targets.astype(np.uint64)).tolist() + [len(self)]
+        return [
+            (start, stop)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
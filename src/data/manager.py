@@ -1,26 +1,79 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+from dataclasses import dataclass
+import asyncio
+import itertools
 import logging
+import time
 from datetime import datetime
+from pathlib import Path
 
 import numpy as np
 
+from .checkpoint import IngestCheckpoint, content_hash
 from .loaders import BaseDatasetLoader, Document
+from .processors import ProcessorChain, TextProcessor
+from .processors.dedup_processor import DedupProcessor
 from .storage import MongoDocumentStore, QdrantVectorStore
+from .storage.payload import payload_fields
+from .storage.vector_store import chunk_key
 from .validators import DocumentValidator, EmbeddingValidator
 
 
+# Stage output for a document intentionally dropped (e.g. a skipped duplicate)
+_SKIPPED = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for a single pipeline stage"""
+    name: str
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Documents handled per second of busy worker time"""
+        if not self.busy_seconds:
+            return 0.0
+        return (self.processed + self.failed) / self.busy_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'processed': self.processed,
+            'failed': self.failed,
+            'busy_seconds': self.busy_seconds,
+            'throughput': self.throughput
+        }
+
+
 class DataManager:
     """Manages the entire data flow: loading, validation, preprocessing, and storage"""
 
+    STAGES = ('validate', 'preprocess', 'store')
+
     def __init__(
             self,
             document_store: MongoDocumentStore,
             vector_store: QdrantVectorStore,
-            loader: Optional[BaseDatasetLoader] = None
+            loader: Optional[BaseDatasetLoader] = None,
+            preprocessing_pipeline: Optional[Any] = None,
+            concurrency: int = 8,
+            deduplicator: Optional[DedupProcessor] = None,
+            lexical_index: Optional[Any] = None
     ):
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+
         self.document_store = document_store
         self.vector_store = vector_store
         self.loader = loader
+        self.preprocessing_pipeline = preprocessing_pipeline
+        self.deduplicator = deduplicator
+        self.lexical_index = lexical_index
+        self.concurrency = concurrency
+        self._wire_lexical_analyzer()
+        self._ingest_listeners: List[Callable[[List[str]], Any]] = []
 
         # Validators
         self.document_validator = DocumentValidator()
@@ -29,69 +82,427 @@ class DataManager:
         # Logging
         self.logger = logging.getLogger(__name__)
 
+    def _wire_lexical_analyzer(self) -> None:
+        """Analyze lexical queries like the ingest tokens the index is fed
+
+        A token-emitting ``TextProcessor`` indexes ``hep-th`` as ``hepth``,
+        which the index's default analyzer would split into ``hep`` and
+        ``th``, so the index switches to the processor's ``terms``. An explicitly chosen analyzer
+        is left alone.
+        """
+        if self.lexical_index is None or not self.lexical_index.uses_default_analyzer:
+            return
+        chain = getattr(self.preprocessing_pipeline, 'processor_chain', None)
+        if not isinstance(chain, ProcessorChain):
+            return
+        for processor in chain.processors:
+            if isinstance(processor, TextProcessor) and processor.emit_tokens:
+                self.lexical_index.analyzer = processor.terms
+                return
+
+    def add_ingest_listener(self, listener: Callable[[List[str]], Any]) -> None:
+        """Call ``listener`` with the IDs of documents stored or deleted by ingest
+
+        Used to invalidate state derived from documents, e.g. query caches.
+        """
+        self._ingest_listeners.append(listener)
+
+    def _notify_ingest(self, document_ids: List[str]) -> None:
+        for listener in self._ingest_listeners:
+            try:
+                listener(document_ids)
+            except Exception as e:
+                self.logger.error(f"Ingest listener failed: {str(e)}")
+
     async def process_document(self, document: Document) -> Optional[Document]:
         """Process a single document through the entire pipeline"""
         try:
-            # Validate document
-            validation_result = self.document_validator.validate(document)
+            validated_doc = await self._validate_document(document)
+            if validated_doc is None:
+                return None
+
+            processed_doc = await self._preprocess_document(validated_doc)
+            if processed_doc is None or processed_doc is _SKIPPED:
+                return None
+
+            return await self._store_document(processed_doc)
+
+        except Exception as e:
+            self.logger.error(f"Error processing document: {str(e)}")
+            return None
+
+    async def _validate_document(self, document: Document) -> Optional[Document]:
+        """Validation stage for a single document"""
+        return (await self._validate_documents([document]))[0]
+
+    async def _validate_documents(self, documents: List[Document]) -> List[Optional[Document]]:
+        """Validation stage: reject invalid documents"""
+        validated = []
+        for document, validation_result in zip(documents, self.document_validator.validate_batch(documents)):
             if not validation_result.is_valid:
                 self.logger.error(f"Document validation failed: {validation_result.errors}")
-                return None
+                validated.append(None)
+                continue
 
             # Log warnings if any
             for warning in validation_result.warnings:
                 self.logger.warning(f"Document warning: {warning}")
+            validated.append(document)
 
-            # Preprocess document
-            processed_doc = await self.preprocessing_pipeline.preprocess(document)
+        return validated
 
-            # Validate embeddings
-            embeddings = processed_doc.metadata['preprocessing_results'].get('embeddings')
-            if embeddings:
-                for i, emb in enumerate(embeddings):
-                    emb_validation = self.embedding_validator.validate(emb)
-                    if not emb_validation.is_valid:
-                        self.logger.error(f"Embedding {i} validation failed: {emb_validation.errors}")
-                        return None
+    async def _preprocess_document(self, document: Document) -> Optional[Document]:
+        """Preprocessing stage for a single document"""
+        return (await self._preprocess_documents([document]))[0]
 
-            # Store document
-            await self.document_store.save(processed_doc)
+    async def _preprocess_documents(self, documents: List[Document]) -> List[Optional[Document]]:
+        """Preprocessing stage: run the pipeline and validate produced embeddings
 
-            # Store embeddings
-            if embeddings:
-                await self.vector_store.save(processed_doc.id, embeddings[0])  # Store first chunk embedding
+        Near-duplicates found by the deduplicator are dropped in ``skip`` mode
+        and stored without embeddings in ``link`` mode. Pipelines with a
+        ``preprocess_batch`` method get all remaining documents in one call.
+        Canonical documents that fail here are taken out of the dedup index.
+        """
+        outputs: List[Any] = list(documents)
+        pending = list(range(len(documents)))
+        if self.deduplicator is not None:
+            pending = []
+            for i, document in enumerate(documents):
+                outputs[i] = await self.deduplicator.process(document)
+                if not self.deduplicator.is_duplicate(outputs[i]):
+                    pending.append(i)
+                elif self.deduplicator.mode == 'skip':
+                    outputs[i] = _SKIPPED
 
-            return processed_doc
+        if self.preprocessing_pipeline is None or not pending:
+            return outputs
 
-        except Exception as e:
-            self.logger.error(f"Error processing document: {str(e)}")
+        batch = [outputs[i] for i in pending]
+        try:
+            if hasattr(self.preprocessing_pipeline, 'preprocess_batch'):
+                processed = await self.preprocessing_pipeline.preprocess_batch(batch)
+            else:
+                processed = [await self.preprocessing_pipeline.preprocess(document) for document in batch]
+        except Exception:
+            self._forget_canonicals(batch)
+            raise
+
+        for i, document in zip(pending, processed):
+            outputs[i] = self._validate_embeddings(document)
+        self._forget_canonicals([documents[i] for i in pending if outputs[i] is None])
+        return outputs
+
+    def _forget_canonicals(self, documents: List[Document]) -> None:
+        """Drop failed documents from the dedup index they were added to as canonicals
+
+        Otherwise later near-duplicates would be skipped in favour of a
+        document that was never stored.
+        """
+        if self.deduplicator is None:
+            return
+        failed = [document.id for document in documents if not self.deduplicator.is_duplicate(document)]
+        if failed:
+            self.deduplicator.remove(failed)
+
+    def _validate_embeddings(self, document: Document) -> Optional[Document]:
+        """Validate all chunk embeddings at once, normalizing non-unit rows in place"""
+        embeddings = self._get_embeddings(document)
+        if embeddings is not None:
+            embeddings = np.array(embeddings, dtype=np.float32)
+            emb_validation = self.embedding_validator.validate_batch(embeddings, normalize=True)
+            if not emb_validation.is_valid:
+                self.logger.error(f"Embedding validation failed: {emb_validation.errors}")
+                return None
+            document.metadata['preprocessing_results']['embeddings'] = embeddings
+
+        return document
+
+    async def _store_document(self, document: Document) -> Optional[Document]:
+        """Storage stage for a single document"""
+        return (await self._store_documents([document]))[0]
+
+    async def _store_documents(self, documents: List[Document]) -> List[Optional[Document]]:
+        """Storage stage: persist documents in bulk, then all chunk embeddings
+
+        Embeddings and ingest tokens are detached from the document metadata
+        before it is written to the document store; every chunk becomes its
+        own vector point, and chunks beyond the new chunk count of a document
+        are removed. Stored documents are then added to the lexical index;
+        documents that failed are taken out of the dedup index.
+
+        Documents written to the document store whose vectors could not be
+        stored lose their ``content_hash``, so incremental runs reprocess
+        them. If the stage raises, embeddings and tokens are reattached so
+        the documents can be retried.
+        """
+        embeddings = [self._detach_embeddings(document) for document in documents]
+        tokens = [self._detach_tokens(document) for document in documents]
+        try:
+            return await self._store_detached(documents, embeddings, tokens)
+        except Exception:
+            for document, doc_embeddings, doc_tokens in zip(documents, embeddings, tokens):
+                if doc_embeddings is not None:
+                    document.metadata['preprocessing_results']['embeddings'] = doc_embeddings
+                if doc_tokens is not None:
+                    document.metadata = {**document.metadata, 'tokens': doc_tokens}
+            raise
+
+    async def _store_detached(
+            self,
+            documents: List[Document],
+            embeddings: List[Optional[List[np.ndarray]]],
+            tokens: List[Optional[List[str]]]
+    ) -> List[Optional[Document]]:
+        saved = await self.document_store.save_many(documents)
+        written = [document.id for document, ok in zip(documents, saved) if ok]
+        try:
+            return await self._store_vectors(documents, embeddings, tokens, saved)
+        except Exception:
+            await self._mark_incomplete(written)
+            raise
+
+    async def _mark_incomplete(self, document_ids: List[str]) -> None:
+        """Flag documents stored without their vectors for reprocessing"""
+        if document_ids:
+            self.logger.error(f"{len(document_ids)} documents were stored without their vectors")
+            await self.document_store.clear_content_hashes(document_ids)
+
+    async def _store_vectors(
+            self,
+            documents: List[Document],
+            embeddings: List[Optional[List[np.ndarray]]],
+            tokens: List[Optional[List[str]]],
+            saved: List[bool]
+    ) -> List[Optional[Document]]:
+        stored, failed_documents = [], []
+        keys, vectors, payloads = [], [], []
+        chunk_counts = {}
+        for document, doc_embeddings, ok in zip(documents, embeddings, saved):
+            if not ok:
+                self.logger.error(f"Failed to store document {document.id}")
+                stored.append(None)
+                failed_documents.append(document)
+                continue
+
+            chunk_counts[document.id] = 0 if doc_embeddings is None else len(doc_embeddings)
+            if doc_embeddings is not None:
+                offsets = document.metadata.get('preprocessing_results', {}).get('chunk_offsets')
+                fields = payload_fields(document)
+                for i, emb in enumerate(doc_embeddings):
+                    keys.append(chunk_key(document.id, i))
+                    vectors.append(emb)
+                    payloads.append({**self._chunk_payload(document, i, offsets), **fields})
+            stored.append(document)
+
+        # Store all chunk embeddings of the batch in a single batched upsert
+        if keys and not await self.vector_store.save_many(keys, np.stack(vectors), payloads=payloads):
+            self.logger.error(f"Failed to store {len(keys)} chunk embeddings")
+            failed = {payload['document_id'] for payload in payloads}
+            failed_documents.extend(doc for doc in stored if doc is not None and doc.id in failed)
+            stored = [None if doc is not None and doc.id in failed else doc for doc in stored]
+            chunk_counts = {doc_id: n for doc_id, n in chunk_counts.items() if doc_id not in failed}
+            await self._mark_incomplete(sorted(failed))
+        self._forget_canonicals(failed_documents)
+
+        # Drop chunks of previous, longer versions only once the new ones are stored
+        if chunk_counts and not await self.vector_store.trim_documents(chunk_counts):
+            self.logger.error(f"Failed to remove stale chunks of {len(chunk_counts)} documents")
+
+        if self.lexical_index is not None:
+            for document, doc_tokens in zip(stored, tokens):
+                if document is not None:
+                    self.lexical_index.add(document.id, tokens=doc_tokens, text=document.content)
+
+        stored_ids = [document.id for document in stored if document is not None]
+        if stored_ids:
+            self._notify_ingest(stored_ids)
+        return stored
+
+    @staticmethod
+    def _chunk_payload(
+            document: Document,
+            chunk_index: int,
+            offsets: Optional[List[Any]]
+    ) -> Dict[str, Any]:
+        """Vector payload locating a chunk inside its parent document"""
+        payload = {'document_id': document.id, 'chunk_index': chunk_index}
+        if offsets is not None and chunk_index < len(offsets):
+            payload['start'], payload['end'] = (int(x) for x in offsets[chunk_index])
+        return payload
+
+    @staticmethod
+    def _get_embeddings(document: Document) -> Optional[List[np.ndarray]]:
+        """Return the chunk embeddings produced by preprocessing, if any"""
+        embeddings = document.metadata.get('preprocessing_results', {}).get('embeddings')
+        if embeddings is None or len(embeddings) == 0:
             return None
+        return embeddings
+
+    def _detach_embeddings(self, document: Document) -> Optional[List[np.ndarray]]:
+        """Remove chunk embeddings from the metadata and return them"""
+        embeddings = self._get_embeddings(document)
+        document.metadata.get('preprocessing_results', {}).pop('embeddings', None)
+        return embeddings
+
+    @staticmethod
+    def _detach_tokens(document: Document) -> Optional[List[str]]:
+        """Remove ingest tokens from the metadata and return them"""
+        if 'tokens' not in document.metadata:
+            return None
+        metadata = dict(document.metadata)
+        tokens = metadata.pop('tokens')
+        document.metadata = metadata
+        return tokens
 
     async def process_batch(
             self,
             documents: List[Document],
-            batch_size: int = 100
+            batch_size: int = 100,
+            concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Process a batch of documents"""
+        """Process a batch of documents through a concurrent staged pipeline
+
+        Each stage (validate -> preprocess -> store) runs ``concurrency`` workers.
+        Stages are connected by queues holding at most ``batch_size`` documents,
+        so a slow stage applies backpressure to the ones before it. Workers
+        drain up to ``batch_size`` queued documents at a time, so the pipeline
+        embeds chunks of several documents together and the store stage
+        writes them in one bulk write.
+        """
+        concurrency = concurrency or self.concurrency
         results = {
             'successful': [],
             'failed': [],
+            'skipped': [],
             'total': len(documents)
         }
+        stats = {name: StageStats(name) for name in self.STAGES}
+        handlers = {
+            'validate': self._validate_documents,
+            'preprocess': self._preprocess_documents,
+            'store': self._store_documents
+        }
+        stage_batch_sizes = {'validate': batch_size, 'preprocess': batch_size, 'store': batch_size}
+        # Documents the store stage failed on alone never made it into the stores
+        error_handlers = {'store': self._forget_canonicals}
+
+        queues = [asyncio.Queue(maxsize=batch_size) for _ in self.STAGES]
+        outboxes = queues[1:] + [None]
 
-        # Process in batches
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
+        async def feed():
+            for doc in documents:
+                await queues[0].put(doc)
+            for _ in range(concurrency):
+                await queues[0].put(None)
 
-            for doc in batch:
-                processed_doc = await self.process_document(doc)
-                if processed_doc:
-                    results['successful'].append(doc.id)
-                else:
-                    results['failed'].append(doc.id)
+        started = time.perf_counter()
+        await asyncio.gather(
+            feed(),
+            *(
+                self._run_stage(
+                    stats[name], handlers[name], inbox, outbox,
+                    concurrency, stage_batch_sizes[name], results, error_handlers.get(name)
+                )
+                for name, inbox, outbox in zip(self.STAGES, queues, outboxes)
+            )
+        )
+        elapsed = time.perf_counter() - started
 
+        results['elapsed_seconds'] = elapsed
+        results['documents_per_second'] = len(documents) / elapsed if elapsed else 0.0
+        results['stage_stats'] = {name: stage.as_dict() for name, stage in stats.items()}
         return results
 
+    async def _run_stage(
+            self,
+            stats: StageStats,
+            handler: Callable[[List[Document]], Awaitable[List[Optional[Document]]]],
+            inbox: asyncio.Queue,
+            outbox: Optional[asyncio.Queue],
+            workers: int,
+            batch_size: int,
+            results: Dict[str, Any],
+            on_error: Optional[Callable[[List[Document]], None]] = None
+    ) -> None:
+        """Run a pool of workers for one stage until the inbox is drained
+
+        Each worker takes up to ``batch_size`` documents that are already
+        queued and hands them to ``handler`` together. If the handler raises
+        on a batch, its documents are retried one by one so a single bad
+        document fails alone; ``on_error`` gets the documents that still fail.
+        """
+
+        async def worker():
+            finished = False
+            while not finished:
+                document = await inbox.get()
+                if document is None:
+                    return
+
+                batch = [document]
+                while len(batch) < batch_size:
+                    try:
+                        document = inbox.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if document is None:
+                        finished = True
+                        break
+                    batch.append(document)
+
+                started = time.perf_counter()
+                try:
+                    outputs = await handler(batch)
+                except Exception as e:
+                    self.logger.error(f"Error in {stats.name} stage: {str(e)}")
+                    outputs = await self._handle_each(stats.name, handler, batch, on_error)
+                stats.busy_seconds += time.perf_counter() - started
+
+                for document, output in zip(batch, outputs):
+                    if output is None:
+                        stats.failed += 1
+                        results['failed'].append(document.id)
+                        continue
+
+                    stats.processed += 1
+                    if output is _SKIPPED:
+                        results['skipped'].append(document.id)
+                    elif outbox is None:
+                        results['successful'].append(document.id)
+                    else:
+                        await outbox.put(output)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        # Signal the next stage that no more documents are coming
+        if outbox is not None:
+            for _ in range(workers):
+                await outbox.put(None)
+
+    async def _handle_each(
+            self,
+            name: str,
+            handler: Callable[[List[Document]], Awaitable[List[Optional[Document]]]],
+            batch: List[Document],
+            on_error: Optional[Callable[[List[Document]], None]]
+    ) -> List[Optional[Document]]:
+        """Outputs of ``handler`` for each document of a failed batch on its own"""
+        if len(batch) == 1:
+            outputs = [None]
+        else:
+            outputs = []
+            for document in batch:
+                try:
+                    outputs.extend(await handler([document]))
+                except Exception as e:
+                    self.logger.error(f"Error in {name} stage for document {document.id}: {str(e)}")
+                    outputs.append(None)
+
+        failed = [document for document, output in zip(batch, outputs) if output is None]
+        if on_error is not None and failed:
+            on_error(failed)
+        return outputs
+
     async def load_and_process(
             self,
             limit: Optional[int] = None
@@ -101,30 +512,219 @@ class DataManager:
             raise ValueError("No loader configured")
 
         # Load documents
-        documents = await self.loader.load_documents(limit)
+        documents = self.loader.load_documents(limit)
 
         # Process loaded documents
         return await self.process_batch(documents)
 
-    async def search_similar(
+    async def load_and_process_stream(
+            self,
+            limit: Optional[int] = None,
+            window_size: int = 1000,
+            batch_size: int = 100,
+            checkpoint_path: Optional[Path] = None,
+            incremental: bool = False,
+            delete_missing: bool = True
+    ) -> Dict[str, Any]:
+        """Stream documents from the loader and process them in fixed-size windows
+
+        Only one window of documents is held in memory at a time, so peak memory
+        depends on ``window_size`` rather than on the dataset size. The summary
+        reports counts only.
+
+        With ``checkpoint_path`` the position of the last committed window is
+        persisted after each window (after the dedup and lexical indexes), and
+        an interrupted run over the same source snapshot resumes from there. With ``incremental`` documents
+        whose content hash matches the stored copy are skipped, and once the
+        whole source has been read, documents no longer present in it are
+        removed from both stores (unless ``delete_missing`` is False).
+        """
+        if not self.loader:
+            raise ValueError("No loader configured")
+        if window_size <= 0:
+            raise ValueError("window_size must be positive")
+
+        snapshot = self.loader.snapshot_id()
+        checkpoint = IngestCheckpoint.load(checkpoint_path) if checkpoint_path else None
+        if checkpoint is None or checkpoint.completed or checkpoint.snapshot != snapshot:
+            checkpoint = IngestCheckpoint(snapshot=snapshot)
+        elif checkpoint.offset:
+            self.logger.info(f"Resuming ingest run {checkpoint.run_id} at entry {checkpoint.offset}")
+
+        summary = {
+            'successful': 0,
+            'failed': 0,
+            'total': 0,
+            'windows': 0
+        }
+        if incremental:
+            summary.update(unchanged=0, deleted=0)
+        if self.deduplicator is not None:
+            summary['skipped'] = 0
+
+        documents = itertools.islice(self.loader.iter_numbered_documents(checkpoint.offset), limit)
+        exhausted = False
+        while True:
+            numbered = list(itertools.islice(documents, window_size))
+            if not numbered:
+                exhausted = True
+                break
+            window = [document for _, document in numbered]
+            # Every ID still in the source survives delete_stale, whatever its outcome
+            source_ids = [document.id for document in window]
+
+            unchanged: List[str] = []
+            if incremental:
+                window, unchanged = await self._select_changed(window)
+
+            results = await self.process_batch(window, batch_size=batch_size) if window else {
+                'successful': [], 'failed': [], 'total': 0
+            }
+            if incremental:
+                await self.document_store.mark_seen(source_ids, checkpoint.run_id)
+                summary['unchanged'] += len(unchanged)
+                summary['total'] += len(unchanged)
+                checkpoint.unchanged += len(unchanged)
+
+            summary['successful'] += len(results['successful'])
+            summary['failed'] += len(results['failed'])
+            summary['total'] += results['total']
+            summary['windows'] += 1
+            if self.deduplicator is not None:
+                summary['skipped'] += len(results.get('skipped', []))
+
+            checkpoint.offset = numbered[-1][0] + 1
+            checkpoint.windows += 1
+            checkpoint.successful += len(results['successful'])
+            checkpoint.failed += len(results['failed'])
+            if checkpoint_path:
+                # Indexes first: a resumed run never reprocesses this window
+                self._save_indexes()
+                checkpoint.save(checkpoint_path)
+
+            self.logger.info(
+                f"Processed window {summary['windows']}: "
+                f"{summary['successful']} successful, {summary['failed']} failed"
+            )
+
+        # A limited run may have stopped short of the end of the source
+        complete = exhausted and limit is None
+        if incremental and complete and delete_missing:
+            summary['deleted'] = await self.delete_stale(checkpoint.run_id)
+            checkpoint.deleted += summary['deleted']
+        if self.lexical_index is not None:
+            # Once per run rather than on every re-added document
+            self.lexical_index.maybe_compact()
+        self._save_indexes()
+        if complete:
+            checkpoint.completed = True
+            if checkpoint_path:
+                checkpoint.save(checkpoint_path)
+
+        return summary
+
+    def _save_indexes(self) -> None:
+        """Persist the ingest-side indexes that have an index path"""
+        if self.deduplicator is not None and self.deduplicator.index_path:
+            self.deduplicator.save()
+        if self.lexical_index is not None and self.lexical_index.index_path:
+            self.lexical_index.save()
+
+    async def _select_changed(self, documents: List[Document]) -> Tuple[List[Document], List[str]]:
+        """Split a window into documents to (re)process and IDs left unchanged
+
+        Each document is stamped with its ``content_hash``. The old chunk
+        vectors of a changed document are left in place: the storage stage
+        overwrites them and trims leftover chunks once the new version is
+        stored, so a failed reprocessing keeps the previous version.
+        """
+        stored = await self.document_store.load_content_hashes([d.id for d in documents])
+
+        changed, unchanged = [], []
+        for document in documents:
+            digest = content_hash(document)
+            if stored.get(document.id) == digest:
+                unchanged.append(document.id)
+                continue
+            document.metadata = {**document.metadata, 'content_hash': digest}
+            changed.append(document)
+
+        return changed, unchanged
+
+    async def delete_stale(self, run_id: str) -> int:
+        """Remove documents not seen in ingest run ``run_id`` from both stores"""
+        deleted = 0
+        async for document_ids in self.document_store.iter_stale_ids(run_id):
+            await self.vector_store.delete_documents(document_ids)
+            deleted += await self.document_store.delete_many(document_ids)
+            if self.deduplicator is not None:
+                self.deduplicator.remove(document_ids)
+            if self.lexical_index is not None:
+                self.lexical_index.remove(document_ids)
+            self._notify_ingest(document_ids)
+        if deleted:
+            self.logger.info(f"Deleted {deleted} documents missing from the source")
+        return deleted
+
+    async def rank_similar(
             self,
             query_embedding: np.ndarray,
-            k: int = 5
-    ) -> List[Document]:
-        """Search for similar documents using embeddings"""
+            k: int = 5,
+            aggregation: str = 'max',
+            chunk_oversample: int = 4,
+            filter_dict: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """Best ``(document_id, score)`` pairs for a query embedding
+
+        Chunk hits are grouped back to their parent documents, scored with
+        ``aggregation`` ('max' or 'sum') over the matching chunks.
+        ``filter_dict`` (e.g. ``{"categories": "cs.LG"}``) is applied by the
+        vector store before ranking.
+        """
+        if aggregation not in ('max', 'sum'):
+            raise ValueError(f"Unknown aggregation: {aggregation}")
+
         # Validate query embedding
         validation_result = self.embedding_validator.validate(query_embedding)
         if not validation_result.is_valid:
             self.logger.error(f"Query embedding validation failed: {validation_result.errors}")
             return []
 
-        # Search vector store
-        similar_docs = await self.vector_store.search(query_embedding, k)
+        # Search vector store, over-fetching since several chunks may share a document
+        chunk_hits = await self.vector_store.search(
+            query_embedding, k * chunk_oversample, filter_dict=filter_dict
+        )
+
+        scores: Dict[str, float] = {}
+        for doc_id, score in chunk_hits:
+            if doc_id not in scores:
+                scores[doc_id] = score
+            elif aggregation == 'sum':
+                scores[doc_id] += score
+            else:
+                scores[doc_id] = max(scores[doc_id], score)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    async def search_similar(
+            self,
+            query_embedding: np.ndarray,
+            k: int = 5,
+            aggregation: str = 'max',
+            chunk_oversample: int = 4,
+            filter_dict: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """Search for similar documents using embeddings (see ``rank_similar``)"""
+        similar_docs = await self.rank_similar(
+            query_embedding, k, aggregation, chunk_oversample, filter_dict=filter_dict
+        )
+        if not similar_docs:
+            return []
+
+        # Load full documents in one round-trip
+        documents = await self.document_store.load_many([doc_id for doc_id, _ in similar_docs])
 
-        # Load full documents
         results = []
-        for doc_id, score in similar_docs:
-            doc = await self.document_store.load(doc_id)
+        for (doc_id, score), doc in zip(similar_docs, documents):
             if doc:
                 doc.metadata['similarity_score'] = score
                 results.append(doc)
@@ -1,22 +1,151 @@
-from .base_processor import BaseProcessor
+from typing import Any, Awaitable, Callable, Dict, List, Union
+from dataclasses import dataclass
+import asyncio
+import time
+
+from ..loaders.base_loader import Document
+from .base_processor import BaseProcessor, MetadataExtractor
 from .text_processor import TextProcessor
 from .scientific_processor import ScientificProcessor
 from .metadata_processor import MetadataProcessor
+from .dedup_processor import DedupProcessor
+
+
+@dataclass
+class ProcessorStats:
+    """Time spent in a single processor of a chain"""
+    name: str
+    calls: int = 0
+    documents: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'documents': self.documents,
+            'seconds': self.seconds,
+            'documents_per_second': self.documents / self.seconds if self.seconds else 0.0
+        }
 
 
 # Chain multiple processors
 class ProcessorChain:
-    """Chain multiple processors together"""
+    """Chain multiple processors together
+
+    ``process_batch`` runs the chain stage by stage over the batch:
+
+    * batch-native processors receive the whole batch (and may drop documents),
+    * consecutive metadata extractors are fused: their fields are applied
+      in one metadata update, and with ``concurrent_extract`` their ``extract``
+      calls run concurrently,
+    * any other processor handles documents one by one.
 
-    def __init__(self, processors: List[BaseProcessor]):
+    At most ``concurrency`` documents are in flight within a stage. Raising it
+    (or enabling ``concurrent_extract``) only pays off for processors that
+    await I/O; each concurrent call costs an asyncio task. Time spent per
+    processor is accumulated in ``stats``.
+    """
+
+    def __init__(
+            self,
+            processors: List[BaseProcessor],
+            concurrency: int = 1,
+            concurrent_extract: bool = False
+    ):
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
         self.processors = processors
+        self.concurrency = concurrency
+        self.concurrent_extract = concurrent_extract
+        self.stats = {self._name(i, p): ProcessorStats(self._name(i, p)) for i, p in enumerate(processors)}
+        self._stages = self._plan()
+
+    @staticmethod
+    def _name(position: int, processor: BaseProcessor) -> str:
+        return f"{position}:{type(processor).__name__}"
+
+    def _plan(self) -> List[Union[int, List[int]]]:
+        """Group processor positions into stages; lists are fused runs of metadata extractors"""
+        stages: List[Union[int, List[int]]] = []
+        for i, processor in enumerate(self.processors):
+            if isinstance(processor, MetadataExtractor) and not processor.batch_native:
+                if stages and isinstance(stages[-1], list):
+                    stages[-1].append(i)
+                else:
+                    stages.append([i])
+            else:
+                stages.append(i)
+        return stages
 
     async def process(self, document: Document) -> Document:
         """Process document through all processors in chain"""
-        for processor in self.processors:
+        for i, processor in enumerate(self.processors):
+            started = time.perf_counter()
             document = await processor.process(document)
+            self._record(i, 1, time.perf_counter() - started)
         return document
 
     async def process_batch(self, documents: List[Document]) -> List[Document]:
         """Process multiple documents"""
-        return [await self.process(doc) for doc in documents]
\ No newline at end of file
+        for stage in self._stages:
+            if isinstance(stage, list):
+                documents = await self._map(lambda d, stage=stage: self._run_fused(stage, d), documents)
+            elif self.processors[stage].batch_native:
+                started = time.perf_counter()
+                processed = await self.processors[stage].process_batch(documents)
+                self._record(stage, len(documents), time.perf_counter() - started)
+                documents = processed
+            else:
+                documents = await self._map(lambda d, stage=stage: self._run_single(stage, d), documents)
+        return documents
+
+    async def _map(
+            self,
+            handler: Callable[[Document], Awaitable[Document]],
+            documents: List[Document]
+    ) -> List[Document]:
+        """Apply ``handler`` to every document, at most ``concurrency`` at a time"""
+        if self.concurrency == 1:
+            return [await handler(document) for document in documents]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(document: Document) -> Document:
+            async with semaphore:
+                return await handler(document)
+
+        return list(await asyncio.gather(*(bounded(document) for document in documents)))
+
+    async def _run_single(self, position: int, document: Document) -> Document:
+        started = time.perf_counter()
+        document = await self.processors[position].process(document)
+        self._record(position, 1, time.perf_counter() - started)
+        return document
+
+    async def _run_fused(self, positions: List[int], document: Document) -> Document:
+        if self.concurrent_extract:
+            fields = await asyncio.gather(*(self._timed_extract(p, document) for p in positions))
+        else:
+            fields = [await self._timed_extract(p, document) for p in positions]
+
+        merged: Dict[str, Any] = {}
+        for processor_fields in fields:
+            merged.update(processor_fields)
+        BaseProcessor._update_metadata(document, merged)
+        return document
+
+    async def _timed_extract(self, position: int, document: Document) -> Dict[str, Any]:
+        started = time.perf_counter()
+        fields = await self.processors[position].extract(document)
+        self._record(position, 1, time.perf_counter() - started)
+        return fields
+
+    def _record(self, position: int, documents: int, seconds: float) -> None:
+        stats = self.stats[self._name(position, self.processors[position])]
+        stats.calls += 1
+        stats.documents += documents
+        stats.seconds += seconds
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        """Per-processor timing summary, keyed by ``position:ClassName``"""
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
@@ -6,6 +6,10 @@ from ..loaders.base_loader import Document
 class BaseProcessor(ABC):
     """Base class for all document processors"""
 
+    # Processors whose ``process_batch`` is a real batch implementation set
+    # this so ProcessorChain hands them whole batches
+    batch_native: bool = False
+
     @abstractmethod
     async def process(self, document: Document) -> Document:
         """Process a single document"""
@@ -13,4 +17,26 @@ class BaseProcessor(ABC):
 
     async def process_batch(self, documents: List[Document]) -> List[Document]:
         """Process multiple documents"""
-        return [await self.process(doc) for doc in documents]
\ No newline at end of file
+        return [await self.process(doc) for doc in documents]
+
+    @staticmethod
+    def _update_metadata(document: Document, fields: Dict[str, Any]) -> None:
+        """Add metadata fields without mutating a possibly shared dict"""
+        document.metadata = {**document.metadata, **fields}
+
+
+class MetadataExtractor(BaseProcessor):
+    """Base class for processors that leave content alone and only add metadata
+
+    ProcessorChain runs consecutive extractors concurrently and applies
+    their fields in one update.
+    """
+
+    @abstractmethod
+    async def extract(self, document: Document) -> Dict[str, Any]:
+        """Metadata fields this processor adds"""
+        pass
+
+    async def process(self, document: Document) -> Document:
+        self._update_metadata(document, await self.extract(document))
+        return document
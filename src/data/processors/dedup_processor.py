@@ -0,0 +1,261 @@
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .base_processor import BaseProcessor
+from ..loaders.base_loader import Document
+
+# Mersenne prime for the universal hash family; (a * x + b) with a, b < P and
+# 32-bit x stays below 2**63, so it never overflows uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_WORD = re.compile(r"\w+")
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """CRC32 hashes of the distinct word ``size``-grams of ``text``"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        grams = {" ".join(words)}
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures
+
+    Signatures live in one growable ``uint32`` matrix. Each band is hashed
+    to a 64-bit key; per band, keys are kept in a sorted array (binary
+    search) plus a small dict of recent inserts that is merged into the
+    sorted array every ``merge_every`` additions.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, seed: int = 0, merge_every: int = 65536):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.seed = seed
+        self.merge_every = merge_every
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 1 << 63, self.rows_per_band, dtype=np.uint64) | np.uint64(1)
+
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._keys = [np.empty(0, dtype=np.uint64) for _ in range(bands)]
+        self._key_rows = [np.empty(0, dtype=np.int64) for _ in range(bands)]
+        self._pending: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._pending_count = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        """MinHash signature of a set of 32-bit shingle hashes"""
+        if len(shingles) == 0:
+            return np.full(self.num_perm, int(_PRIME), dtype=np.uint32)
+        hashed = (np.outer(shingles, self._a) + self._b) % _PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> np.ndarray:
+        """64-bit key of each band of ``signature``"""
+        bands = signature.reshape(self.bands, self.rows_per_band).astype(np.uint64)
+        with np.errstate(over="ignore"):
+            return (bands * self._band_mix).sum(axis=1, dtype=np.uint64)
+
+    def candidates(self, signature: np.ndarray) -> Set[int]:
+        """Rows sharing at least one band with ``signature``"""
+        rows: Set[int] = set()
+        for band, key in enumerate(self.band_keys(signature)):
+            keys = self._keys[band]
+            lo = int(np.searchsorted(keys, key, side="left"))
+            hi = int(np.searchsorted(keys, key, side="right"))
+            rows.update(self._key_rows[band][lo:hi].tolist())
+            rows.update(self._pending[band].get(int(key), ()))
+        return rows
+
+    def query(self, signature: np.ndarray, threshold: float) -> List[Tuple[str, float]]:
+        """Indexed documents whose estimated Jaccard similarity is >= ``threshold``
+
+        Returned best first as ``(doc_id, similarity)``.
+        """
+        rows = [row for row in self.candidates(signature) if self._ids[row] is not None]
+        if not rows:
+            return []
+        similarity = (self._signatures[rows] == signature).mean(axis=1)
+        order = np.argsort(-similarity, kind="stable")
+        return [
+            (self._ids[rows[i]], float(similarity[i]))
+            for i in order if similarity[i] >= threshold
+        ]
+
+    def add(self, doc_id: str, signature: np.ndarray) -> None:
+        """Index ``signature`` under ``doc_id``, replacing an earlier version"""
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = len(self._ids)
+            if row == len(self._signatures):
+                grown = np.empty((max(1024, 2 * row), self.num_perm), dtype=np.uint32)
+                grown[:row] = self._signatures
+                self._signatures = grown
+            self._ids.append(doc_id)
+            self._rows[doc_id] = row
+        # Keys of a replaced version stay behind but fail verification
+        self._signatures[row] = signature
+
+        for band, key in enumerate(self.band_keys(signature)):
+            self._pending[band].setdefault(int(key), []).append(row)
+        self._pending_count += 1
+        if self._pending_count >= self.merge_every:
+            self._merge()
+
+    def remove(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._ids[row] = None
+        return True
+
+    def _merge(self) -> None:
+        """Fold pending inserts into the sorted per-band arrays"""
+        for band, pending in enumerate(self._pending):
+            if not pending:
+                continue
+            new_keys = np.array(
+                [key for key, rows in pending.items() for _ in rows], dtype=np.uint64
+            )
+            new_rows = np.array([row for rows in pending.values() for row in rows], dtype=np.int64)
+            order = np.argsort(new_keys, kind="stable")
+            new_keys, new_rows = new_keys[order], new_rows[order]
+
+            positions = np.searchsorted(self._keys[band], new_keys, side="right")
+            self._keys[band] = np.insert(self._keys[band], positions, new_keys)
+            self._key_rows[band] = np.insert(self._key_rows[band], positions, new_rows)
+            pending.clear()
+        self._pending_count = 0
+
+    def save(self, path: Path) -> None:
+        self._merge()
+        count = len(self._ids)
+        tmp_path = Path(f"{path}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                params=np.array([self.num_perm, self.bands, self.seed], dtype=np.int64),
+                signatures=self._signatures[:count],
+                ids=np.array([doc_id or "" for doc_id in self._ids], dtype=np.str_),
+                alive=np.array([doc_id is not None for doc_id in self._ids], dtype=bool),
+                keys=np.stack(self._keys) if count else np.empty((self.bands, 0), dtype=np.uint64),
+                key_rows=np.stack(self._key_rows) if count else np.empty((self.bands, 0), dtype=np.int64)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, merge_every: int = 65536) -> "MinHashLSH":
+        with np.load(path) as data:
+            num_perm, bands, seed = (int(x) for x in data["params"])
+            index = cls(num_perm=num_perm, bands=bands, seed=seed, merge_every=merge_every)
+            index._signatures = data["signatures"]
+            index._ids = [
+                doc_id if alive else None
+                for doc_id, alive in zip(data["ids"].tolist(), data["alive"].tolist())
+            ]
+            index._keys = list(data["keys"])
+            index._key_rows = list(data["key_rows"])
+        index._rows = {doc_id: row for row, doc_id in enumerate(index._ids) if doc_id is not None}
+        return index
+
+
+class DedupProcessor(BaseProcessor):
+    """Detect near-duplicate documents with MinHash/LSH
+
+    Each document's word shingles are MinHashed and looked up in an LSH
+    index of previously seen canonical documents. A document whose estimated
+    Jaccard similarity to an indexed one reaches ``threshold`` gets
+    ``duplicate_of`` (and ``duplicate_similarity``) in its metadata; any other
+    document becomes canonical and is indexed. In ``skip`` mode
+    ``process_batch`` drops duplicates, in ``link`` mode it keeps them.
+
+    The index is loaded from ``index_path`` if present and written back by
+    ``save``, so incremental runs see documents from earlier runs.
+    """
+
+    batch_native = True
+
+    MODES = ("link", "skip")
+
+    def __init__(
+            self,
+            threshold: float = 0.8,
+            num_perm: int = 128,
+            bands: int = 16,
+            shingle_size: int = 3,
+            mode: str = "link",
+            index_path: Optional[Path] = None,
+            seed: int = 0
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedup mode: {mode}")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.mode = mode
+        self.index_path = Path(index_path) if index_path else None
+
+        if self.index_path and self.index_path.exists():
+            self.index = MinHashLSH.load(self.index_path)
+        else:
+            self.index = MinHashLSH(num_perm=num_perm, bands=bands, seed=seed)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.index.signature(shingle_hashes(text, self.shingle_size))
+
+    async def process(self, document: Document) -> Document:
+        """Link a near-duplicate to its canonical document, or index it as canonical"""
+        signature = self.signature(document.content)
+        matches = [
+            (doc_id, similarity)
+            for doc_id, similarity in self.index.query(signature, self.threshold)
+            if doc_id != document.id
+        ]
+        if matches:
+            canonical, similarity = matches[0]
+            self._update_metadata(document, {
+                'duplicate_of': canonical,
+                'duplicate_similarity': similarity
+            })
+        else:
+            self.index.add(document.id, signature)
+        return document
+
+    async def process_batch(self, documents: List[Document]) -> List[Document]:
+        """Process documents in order; in ``skip`` mode duplicates are dropped"""
+        processed = [await self.process(doc) for doc in documents]
+        if self.mode == "skip":
+            return [doc for doc in processed if not self.is_duplicate(doc)]
+        return processed
+
+    @staticmethod
+    def is_duplicate(document: Document) -> bool:
+        return 'duplicate_of' in document.metadata
+
+    def remove(self, document_ids: List[str]) -> int:
+        """Drop documents (e.g. deleted from the source) from the index"""
+        return sum(self.index.remove(doc_id) for doc_id in document_ids)
+
+    def save(self, path: Optional[Path] = None) -> None:
+        path = Path(path) if path else self.index_path
+        if path is None:
+            raise ValueError("No index path configured")
+        self.index.save(path)
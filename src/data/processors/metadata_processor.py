@@ -1,28 +1,28 @@
 from datetime import datetime
 from typing import Dict, Any
-from .base_processor import BaseProcessor
+from .base_processor import MetadataExtractor
 from ..loaders.base_loader import Document
 
 
-class MetadataProcessor(BaseProcessor):
+class MetadataProcessor(MetadataExtractor):
     """Process and enrich document metadata"""
 
-    async def process(self, document: Document) -> Document:
-        """Process document metadata"""
+    async def extract(self, document: Document) -> Dict[str, Any]:
+        """Standard and processing metadata fields for the document"""
         # Enrich metadata
-        metadata = self._enrich_metadata(document.metadata)
+        fields = {
+            key: value
+            for key, value in self._enrich_metadata(document.metadata).items()
+            if key not in document.metadata
+        }
 
         # Add processing metadata
-        metadata.update({
+        fields.update({
             'processed_at': datetime.utcnow().isoformat(),
             'content_length': len(document.content),
             'language': self._detect_language(document.content)
         })
-
-        # Update document
-        document.metadata = metadata
-
-        return document
+        return fields
 
     def _enrich_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Enrich existing metadata"""
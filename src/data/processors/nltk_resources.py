@@ -0,0 +1,129 @@
+import logging
+import os
+import re
+from functools import lru_cache, partial
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+import nltk
+
+from ...utils.exceptions import ResourceUnavailableError
+
+# Set to a true value to never download NLTK data (air-gapped workers)
+OFFLINE_ENV_VAR = "NLTK_OFFLINE"
+
+# Newer NLTK releases ship the sentence tokenizer as punkt_tab
+PUNKT_RESOURCES = ("tokenizers/punkt_tab", "tokenizers/punkt")
+STOPWORDS_RESOURCE = "corpora/stopwords"
+
+# NLTK's English stopword list, used when the corpus is not installed
+FALLBACK_STOPWORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours
+yourself yourselves he him his himself she she's her hers herself it it's its
+itself they them their theirs themselves what which who whom this that that'll
+these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about
+against between into through during before after above below to from up down in
+out on off over under again further then once here there when where why how all
+any both each few more most other some such no nor not only own same so than too
+very s t can will just don don't should should've now d ll m o re ve y ain aren
+aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven
+haven't isn isn't ma mightn mightn't mustn mustn't needn needn't shan shan't
+shouldn shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD_TOKEN = re.compile(r"\w+(?:[-']\w+)*|[^\w\s]")
+
+logger = logging.getLogger(__name__)
+
+
+def fallback_sent_tokenize(text: str) -> List[str]:
+    """Split sentences at terminal punctuation followed by a capitalized start"""
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+
+
+def fallback_word_tokenize(text: str) -> List[str]:
+    """Split words, keeping punctuation as separate tokens"""
+    return _WORD_TOKEN.findall(text)
+
+
+def offline_default() -> bool:
+    return os.environ.get(OFFLINE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+def _find(resource: str) -> bool:
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def _ensure(resources: Tuple[str, ...], offline: bool) -> Optional[str]:
+    """First available resource of ``resources``, downloading it at most once per process"""
+    for resource in resources:
+        if _find(resource):
+            return resource
+    if offline:
+        return None
+
+    for resource in resources:
+        package = resource.rsplit("/", 1)[-1]
+        try:
+            if nltk.download(package, quiet=True) and _find(resource):
+                return resource
+        except Exception as e:
+            logger.warning(f"Could not download NLTK resource {package}: {e}")
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_stopwords(offline: bool = False, fallback: bool = True) -> FrozenSet[str]:
+    """English stopwords, loaded once per process and shared by all callers"""
+    if _ensure((STOPWORDS_RESOURCE,), offline):
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("english"))
+    if not fallback:
+        raise ResourceUnavailableError(
+            f"NLTK resource '{STOPWORDS_RESOURCE}' is not installed and downloads are disabled; "
+            f"run nltk.download('stopwords') or enable the bundled fallback"
+        )
+    logger.info("NLTK stopwords unavailable, using bundled list")
+    return FALLBACK_STOPWORDS
+
+
+@lru_cache(maxsize=None)
+def get_tokenizers(
+        offline: bool = False,
+        fallback: bool = True
+) -> Tuple[Callable[[str], List[str]], Callable[[str], List[str]]]:
+    """``(sent_tokenize, word_tokenize)``, resolved once per process"""
+    if _ensure(PUNKT_RESOURCES, offline):
+        from nltk.tokenize import sent_tokenize, word_tokenize
+        try:
+            # Recent NLTK needs punkt_tab even when the legacy punkt is present
+            word_tokenize("Probe sentence.")
+            return sent_tokenize, word_tokenize
+        except LookupError:
+            pass
+    if not fallback:
+        raise ResourceUnavailableError(
+            "NLTK punkt tokenizer data is not installed and downloads are disabled; "
+            "run nltk.download('punkt_tab') or enable the bundled fallback"
+        )
+    logger.info("NLTK punkt unavailable, using bundled regex tokenizer")
+    return fallback_sent_tokenize, fallback_word_tokenize
+
+
+@lru_cache(maxsize=None)
+def get_sentence_word_tokenizer(offline: bool = False, fallback: bool = True) -> Callable[[str], List[str]]:
+    """Word tokenizer for text that is already a single sentence
+
+    Mapping it over ``sent_tokenize(text)`` gives exactly ``word_tokenize(text)``
+    without splitting sentences a second time.
+    """
+    word_tokenize = get_tokenizers(offline, fallback)[1]
+    if word_tokenize is fallback_word_tokenize:
+        return fallback_word_tokenize
+    return partial(word_tokenize, preserve_line=True)
@@ -1,10 +1,21 @@
 import re
-from typing import Dict, List
-from .base_processor import BaseProcessor
+from functools import lru_cache
+from typing import Any, Dict, List, Pattern, Tuple
+from .base_processor import MetadataExtractor
 from ..loaders.base_loader import Document
 
+REFERENCES_PATTERN = r'references'
 
-class ScientificProcessor(BaseProcessor):
+# Same spans as the lazy r'\$.*?\$', without backtracking
+_EQUATION = re.compile(r'\$[^\n$]*\$')
+
+
+@lru_cache(maxsize=None)
+def _compile_keyword(pattern: str, ignore_case: bool) -> Pattern:
+    return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+
+class ScientificProcessor(MetadataExtractor):
     """Process scientific documents (papers, articles)"""
 
     def __init__(self):
@@ -17,46 +28,69 @@ class ScientificProcessor(BaseProcessor):
             'conclusion': r'conclusion'
         }
 
-    async def process(self, document: Document) -> Document:
-        """Process scientific document"""
-        # Extract sections
-        sections = self._extract_sections(document.content)
-
-        # Process references
-        references = self._extract_references(document.content)
-
-        # Extract mathematical equations
-        equations = self._extract_equations(document.content)
-
-        # Update document
-        document.metadata.update({
+    async def extract(self, document: Document) -> Dict[str, Any]:
+        """Sections, references and equation count of the document"""
+        sections, references, equations = self._scan(document.content)
+        return {
             'sections': sections,
             'references': references,
             'equation_count': len(equations),
             'document_type': 'scientific'
-        })
+        }
+
+    def section_spans(self, text: str) -> Dict[str, Tuple[int, int, int]]:
+        """Locate sections (and the references block) without copying text
+
+        Returns ``name -> (header_start, body_start, body_end)``: a section's
+        header is the line holding the first occurrence of its keyword, and
+        its body runs from the next line to the next blank line or the end
+        of the text. Each keyword search stops at its first hit, and ASCII
+        text is lowercased once so the searches run case-sensitively.
+        """
+        if text.isascii():
+            haystack, ignore_case = text.lower(), False
+        else:
+            haystack, ignore_case = text, True
+
+        patterns = dict(self.section_patterns, references=REFERENCES_PATTERN)
+        spans = {}
+        for name, pattern in patterns.items():
+            match = _compile_keyword(pattern, ignore_case).search(haystack)
+            if match is None:
+                continue
+            line_end = text.find('\n', match.start())
+            if line_end == -1:
+                continue
+            body_end = text.find('\n\n', line_end + 1)
+            header_start = text.rfind('\n', 0, match.start()) + 1
+            spans[name] = (header_start, line_end + 1, body_end if body_end != -1 else len(text))
+        return spans
+
+    def _scan(self, text: str) -> Tuple[Dict[str, str], List[str], List[str]]:
+        """Extract sections, references and equations without backtracking
+
+        Equations are ``$...$`` spans within a line.
+        """
+        blocks = {
+            name: text[body_start:body_end]
+            for name, (_, body_start, body_end) in self.section_spans(text).items()
+        }
 
-        return document
+        references_block = blocks.pop('references', None)
+        sections = {name: block.strip() for name, block in blocks.items()}
+        references = [] if references_block is None else [
+            ref.strip() for ref in references_block.split('\n') if ref.strip()
+        ]
+        return sections, references, _EQUATION.findall(text)
 
     def _extract_sections(self, text: str) -> Dict[str, str]:
         """Extract standard scientific paper sections"""
-        sections = {}
-        for section, pattern in self.section_patterns.items():
-            match = re.search(f'(?i){pattern}.*?\n(.*?)(?=\n\n|\Z)', text, re.DOTALL)
-            if match:
-                sections[section] = match.group(1).strip()
-        return sections
+        return self._scan(text)[0]
 
     def _extract_references(self, text: str) -> List[str]:
         """Extract references from the document"""
-        references = []
-        ref_section = re.search(r'references.*?\n(.*?)(?=\n\n|\Z)', text, re.DOTALL | re.IGNORECASE)
-        if ref_section:
-            ref_text = ref_section.group(1)
-            references = [ref.strip() for ref in ref_text.split('\n') if ref.strip()]
-        return references
+        return self._scan(text)[1]
 
     def _extract_equations(self, text: str) -> List[str]:
         """Extract mathematical equations"""
-        equations = re.findall(r'\$.*?\$', text)  # LaTeX math mode
-        return equations
+        return _EQUATION.findall(text)  # LaTeX math mode
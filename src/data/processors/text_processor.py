@@ -1,52 +1,162 @@
+import asyncio
 import re
-from typing import List
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, FrozenSet, List, Optional, Tuple
 from .base_processor import BaseProcessor
+from .nltk_resources import get_sentence_word_tokenizer, get_stopwords, get_tokenizers, offline_default
 from ..loaders.base_loader import Document
 
+_SPECIAL_CHARACTERS = re.compile(r'[^\w\s.,!?]')
+_WORD_CHARACTER = re.compile(r'\w')
+
+Analysis = Tuple[str, int, int, Optional[List[str]]]
+
+
+def _analyze_texts(texts: List[str], offline: bool, fallback: bool, emit_tokens: bool) -> List[Analysis]:
+    """Worker entry point: clean and count a chunk of texts"""
+    processor = TextProcessor(offline=offline, fallback=fallback, emit_tokens=emit_tokens)
+    return [processor._analyze(text) for text in texts]
+
 
 class TextProcessor(BaseProcessor):
-    """Process text content of documents"""
+    """Process text content of documents
+
+    NLTK data is resolved lazily on first use and cached per process, so
+    constructing processors is cheap and all instances share one stopword
+    set. ``offline`` (default: the ``NLTK_OFFLINE`` environment variable)
+    disables downloads; missing data then falls back to bundled resources,
+    or raises ``ResourceUnavailableError`` when ``fallback`` is False.
+
+    ``process_batch`` runs off the event loop: in ``workers`` processes when
+    set, otherwise in the loop's default thread pool.
+
+    With ``emit_tokens`` the lowercased non-stopword word tokens of the
+    cleaned text are kept in ``metadata['tokens']``, e.g. for a lexical
+    index; ``terms`` analyzes query text the same way.
+    """
+
+    batch_native = True
+
+    def __init__(
+            self,
+            offline: Optional[bool] = None,
+            fallback: bool = True,
+            workers: Optional[int] = None,
+            chunk_size: int = 256,
+            emit_tokens: bool = False
+    ):
+        self.offline = offline_default() if offline is None else offline
+        self.fallback = fallback
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.emit_tokens = emit_tokens
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def stop_words(self) -> FrozenSet[str]:
+        return get_stopwords(self.offline, self.fallback)
+
+    @property
+    def _sent_tokenize(self) -> Callable[[str], List[str]]:
+        return get_tokenizers(self.offline, self.fallback)[0]
 
-    def __init__(self):
-        nltk.download('punkt')
-        nltk.download('stopwords')
-        self.stop_words = set(stopwords.words('english'))
+    @property
+    def _word_tokenize(self) -> Callable[[str], List[str]]:
+        return get_tokenizers(self.offline, self.fallback)[1]
 
     async def process(self, document: Document) -> Document:
         """Process document text"""
-        # Clean text
-        cleaned_text = self._clean_text(document.content)
+        return self._apply(document, *self._analyze(document.content))
 
-        # Tokenize
-        sentences = self._tokenize_sentences(cleaned_text)
-        words = self._tokenize_words(cleaned_text)
+    async def process_batch(self, documents: List[Document]) -> List[Document]:
+        """Process documents in chunks off the event loop"""
+        if not documents:
+            return []
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        chunks = [
+            [document.content for document in documents[i:i + self.chunk_size]]
+            for i in range(0, len(documents), self.chunk_size)
+        ]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, _analyze_texts, chunk, self.offline, self.fallback, self.emit_tokens)
+            for chunk in chunks
+        ))
+
+        analyses = [analysis for chunk_results in results for analysis in chunk_results]
+        return [self._apply(document, *analysis) for document, analysis in zip(documents, analyses)]
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker processes, if any"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def terms(self, text: str) -> List[str]:
+        """Index terms of ``text``, as emitted in ``metadata['tokens']``"""
+        return self._analyze(text, emit_tokens=True)[3]
 
-        # Update document
+    def _apply(
+            self,
+            document: Document,
+            cleaned_text: str,
+            sentence_count: int,
+            word_count: int,
+            tokens: Optional[List[str]] = None
+    ) -> Document:
         document.content = cleaned_text
-        document.metadata.update({
-            'sentence_count': len(sentences),
-            'word_count': len(words),
+        metadata = {
+            'sentence_count': sentence_count,
+            'word_count': word_count,
             'processed': True
-        })
-
+        }
+        if tokens is not None:
+            metadata['tokens'] = tokens
+        self._update_metadata(document, metadata)
         return document
 
+    def _analyze(self, text: str, emit_tokens: Optional[bool] = None) -> Analysis:
+        """Clean text and count sentences and non-stopword tokens in one tokenization pass"""
+        cleaned_text = self._clean_text(text)
+        sentences = self._tokenize_sentences(cleaned_text)
+
+        # Tokenizing each sentence matches word_tokenize over the whole text
+        tokenize = get_sentence_word_tokenizer(self.offline, self.fallback)
+        stop_words = self.stop_words
+        words = [
+            word
+            for sentence in sentences
+            for word in (token.lower() for token in tokenize(sentence))
+            if word not in stop_words
+        ]
+
+        if emit_tokens is None:
+            emit_tokens = self.emit_tokens
+        tokens = None
+        if emit_tokens:
+            tokens = [word for word in words if _WORD_CHARACTER.search(word)]
+        return cleaned_text, len(sentences), len(words), tokens
+
     def _clean_text(self, text: str) -> str:
         """Clean text content"""
         # Remove special characters
-        text = re.sub(r'[^\w\s.,!?]', '', text)
+        text = _SPECIAL_CHARACTERS.sub('', text)
         # Remove extra whitespace
         text = ' '.join(text.split())
         return text
 
     def _tokenize_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
-        return sent_tokenize(text)
+        return self._sent_tokenize(text)
 
     def _tokenize_words(self, text: str) -> List[str]:
         """Split text into words and remove stopwords"""
-        words = word_tokenize(text)
-        return [word for word in words if word.lower() not in self.stop_words]
\ No newline at end of file
+        words = self._word_tokenize(text)
+        stop_words = self.stop_words
+        return [word for word in words if word.lower() not in stop_words]
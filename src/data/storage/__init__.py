@@ -1,2 +1,3 @@
 from .document_store import MongoDocumentStore
-from vector_store import QdrantVectorStore
\ No newline at end of file
+from .vector_store import QdrantVectorStore
+from .numpy_store import NumpyVectorStore
\ No newline at end of file
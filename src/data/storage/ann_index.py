@@ -0,0 +1,180 @@
+from typing import Callable, Optional, Sequence, Tuple
+from pathlib import Path
+
+import numpy as np
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest neighbour index over matrix rows
+
+    Rows are assigned to the nearest of ``nlist`` coarse centroids learned with
+    spherical k-means. A query scores only the rows in its ``nprobe`` closest
+    lists, trading recall for latency. The index stores row numbers, not
+    vectors; callers pass the backing matrix to ``search``.
+    """
+
+    def __init__(
+            self,
+            nlist: int = 256,
+            nprobe: int = 8,
+            iterations: int = 20,
+            seed: int = 0
+    ):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray, sample_size: Optional[int] = None) -> None:
+        """Learn coarse centroids from (normalized) vectors"""
+        rng = np.random.default_rng(self.seed)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if sample_size and len(vectors) > sample_size:
+            vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        if len(vectors) == 0:
+            raise ValueError("Cannot train an IVF index without vectors")
+
+        nlist = min(self.nlist, len(vectors))
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            assignments = self._nearest(vectors, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            counts = np.bincount(assignments, minlength=nlist)
+
+            # Re-seed empty lists from random vectors
+            empty = counts == 0
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms == 0, 1, norms)
+
+        self.centroids = centroids.astype(np.float32)
+        self.nlist = nlist
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = None
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Index of the closest centroid for every vector, in bounded-memory chunks"""
+        return np.concatenate([
+            np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), chunk_size)
+        ]).astype(np.int32) if len(vectors) else np.zeros(0, dtype=np.int32)
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Assign matrix ``rows`` (holding ``vectors``) to their lists"""
+        if not self.is_trained:
+            raise RuntimeError("IVF index must be trained before adding vectors")
+
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        needed = int(rows.max()) + 1
+        if needed > len(self._assignments):
+            grown = np.full(max(needed, 2 * len(self._assignments)), -1, dtype=np.int32)
+            grown[:len(self._assignments)] = self._assignments
+            self._assignments = grown
+
+        self._assignments[rows] = self._nearest(np.asarray(vectors, dtype=np.float32), self.centroids)
+        self._lists = None
+
+    def remove(self, rows: np.ndarray) -> None:
+        """Drop matrix ``rows`` from the index"""
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[rows < len(self._assignments)]
+        self._assignments[rows] = -1
+        self._lists = None
+
+    def remap(self, live_rows: np.ndarray) -> None:
+        """Renumber rows after the backing matrix was compacted to ``live_rows``"""
+        live_rows = np.asarray(live_rows, dtype=np.int64)
+        assignments = np.full(len(live_rows), -1, dtype=np.int32)
+        known = live_rows < len(self._assignments)
+        assignments[known] = self._assignments[live_rows[known]]
+        self._assignments = assignments
+        self._lists = None
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows grouped by list (CSR layout), rebuilt lazily after changes"""
+        if self._lists is None:
+            indexed = np.flatnonzero(self._assignments >= 0)
+            order = indexed[np.argsort(self._assignments[indexed], kind="stable")]
+            counts = np.bincount(self._assignments[indexed], minlength=self.nlist)
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            self._lists = (order, offsets)
+        return self._lists
+
+    def search(
+            self,
+            matrix: np.ndarray,
+            query: np.ndarray,
+            k: int,
+            nprobe: Optional[int] = None,
+            scorer: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k rows of ``matrix`` by dot product with ``query``
+
+        ``scorer`` maps candidate rows to scores and defaults to exact dot
+        products against ``matrix``. Returns ``(rows, scores)`` sorted by
+        descending score.
+        """
+        if not self.is_trained:
+            raise RuntimeError("IVF index must be trained before searching")
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        order, offsets = self._inverted_lists()
+        candidates = np.concatenate([order[offsets[p]:offsets[p + 1]] for p in probes])
+        if len(candidates) == 0:
+            return candidates, np.zeros(0, dtype=np.float32)
+
+        scores = scorer(candidates) if scorer else matrix[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return candidates[top], scores[top]
+
+    def save(self, path: str) -> None:
+        """Save centroids and row assignments to an ``.npz`` file"""
+        if not self.is_trained:
+            raise RuntimeError("Cannot save an untrained IVF index")
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                assignments=self._assignments,
+                params=np.array([self.nlist, self.nprobe, self.iterations, self.seed])
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """Load an index written by ``save``"""
+        with np.load(Path(path)) as data:
+            nlist, nprobe, iterations, seed = (int(x) for x in data["params"])
+            index = cls(nlist=nlist, nprobe=nprobe, iterations=iterations, seed=seed)
+            index.centroids = data["centroids"]
+            index._assignments = data["assignments"]
+        return index
+
+
+def recall_at_k(exact: Sequence[Sequence], approximate: Sequence[Sequence]) -> float:
+    """Mean fraction of the exact top-k results found by the approximate top-k
+
+    Both arguments hold one sequence of result IDs per query.
+    """
+    total = sum(len(e) for e in exact)
+    if total == 0:
+        return 1.0
+    hits = sum(len(set(e) & set(a)) for e, a in zip(exact, approximate))
+    return hits / total
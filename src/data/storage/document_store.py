@@ -1,6 +1,7 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel, ASCENDING
+from pymongo import IndexModel, ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime
 
 from .base_storage import BaseStorage
@@ -10,30 +11,57 @@ from ..loaders.base_loader import Document
 class MongoDocumentStore(BaseStorage):
     """MongoDB-based document storage"""
 
-    def __init__(self, connection_url: str, database: str = "llm_app", collection: str = "documents"):
+    def __init__(
+            self,
+            connection_url: str,
+            database: str = "llm_app",
+            collection: str = "documents",
+            bulk_chunk_size: int = 1000
+    ):
         self.client = AsyncIOMotorClient(connection_url)
         self.db = self.client[database]
         self.collection = self.db[collection]
+        self.bulk_chunk_size = bulk_chunk_size
 
     async def initialize(self):
         """Initialize indexes"""
         indexes = [
             IndexModel([("id", ASCENDING)], unique=True),
             IndexModel([("metadata.type", ASCENDING)]),
-            IndexModel([("created_at", ASCENDING)])
+            IndexModel([("created_at", ASCENDING)]),
+            IndexModel([("ingest_run", ASCENDING)])
         ]
         await self.collection.create_indexes(indexes)
 
+    @staticmethod
+    def _to_record(document: Document) -> Dict:
+        """Convert a document into its MongoDB representation"""
+        now = datetime.utcnow()
+        return {
+            "id": document.id,
+            "content": document.content,
+            "metadata": document.metadata,
+            "created_at": now,
+            "updated_at": now
+        }
+
+    @staticmethod
+    def _from_record(doc_dict: Dict) -> Document:
+        """Convert a MongoDB record back into a document"""
+        return Document(
+            id=doc_dict["id"],
+            content=doc_dict["content"],
+            metadata=doc_dict["metadata"]
+        )
+
+    def _chunks(self, items: List, chunk_size: Optional[int]) -> List[List]:
+        chunk_size = chunk_size or self.bulk_chunk_size
+        return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
     async def save(self, document: Document) -> bool:
         """Save document to MongoDB"""
         try:
-            doc_dict = {
-                "id": document.id,
-                "content": document.content,
-                "metadata": document.metadata,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
+            doc_dict = self._to_record(document)
 
             await self.collection.update_one(
                 {"id": document.id},
@@ -46,6 +74,36 @@ class MongoDocumentStore(BaseStorage):
             print(f"Error saving document: {e}")
             return False
 
+    async def save_many(
+            self,
+            documents: List[Document],
+            chunk_size: Optional[int] = None
+    ) -> List[bool]:
+        """Upsert documents with unordered bulk writes
+
+        Returns one flag per input document telling whether it was written.
+        """
+        saved = [True] * len(documents)
+        offset = 0
+
+        for chunk in self._chunks(documents, chunk_size):
+            operations = [
+                UpdateOne({"id": document.id}, {"$set": self._to_record(document)}, upsert=True)
+                for document in chunk
+            ]
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    saved[offset + error["index"]] = False
+                print(f"Error saving documents: {len(e.details.get('writeErrors', []))} write errors")
+            except Exception as e:
+                saved[offset:offset + len(chunk)] = [False] * len(chunk)
+                print(f"Error saving documents: {e}")
+            offset += len(chunk)
+
+        return saved
+
     async def load(self, document_id: str) -> Optional[Document]:
         """Load document from MongoDB"""
         try:
@@ -53,16 +111,31 @@ class MongoDocumentStore(BaseStorage):
             if not doc_dict:
                 return None
 
-            return Document(
-                id=doc_dict["id"],
-                content=doc_dict["content"],
-                metadata=doc_dict["metadata"]
-            )
+            return self._from_record(doc_dict)
 
         except Exception as e:
             print(f"Error loading document: {e}")
             return None
 
+    async def load_many(
+            self,
+            document_ids: List[str],
+            chunk_size: Optional[int] = None
+    ) -> List[Optional[Document]]:
+        """Load documents with one query per chunk, preserving input order
+
+        Missing documents are returned as ``None`` at their position.
+        """
+        found: Dict[str, Document] = {}
+        try:
+            for chunk in self._chunks(list(dict.fromkeys(document_ids)), chunk_size):
+                async for doc_dict in self.collection.find({"id": {"$in": chunk}}):
+                    found[doc_dict["id"]] = self._from_record(doc_dict)
+        except Exception as e:
+            print(f"Error loading documents: {e}")
+
+        return [found.get(document_id) for document_id in document_ids]
+
     async def delete(self, document_id: str) -> bool:
         """Delete document from MongoDB"""
         try:
@@ -70,4 +143,96 @@ class MongoDocumentStore(BaseStorage):
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting document: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    async def delete_many(
+            self,
+            document_ids: List[str],
+            chunk_size: Optional[int] = None
+    ) -> int:
+        """Delete documents by ID, returning how many were removed"""
+        deleted = 0
+        try:
+            for chunk in self._chunks(list(document_ids), chunk_size):
+                result = await self.collection.delete_many({"id": {"$in": chunk}})
+                deleted += result.deleted_count
+        except Exception as e:
+            print(f"Error deleting documents: {e}")
+        return deleted
+
+    async def load_content_hashes(
+            self,
+            document_ids: List[str],
+            chunk_size: Optional[int] = None
+    ) -> Dict[str, Optional[str]]:
+        """Stored ``metadata.content_hash`` of each known document
+
+        Only the hash is projected, so this is cheap enough to run per
+        ingest window. Unknown IDs are absent from the result.
+        """
+        hashes: Dict[str, Optional[str]] = {}
+        try:
+            for chunk in self._chunks(list(document_ids), chunk_size):
+                cursor = self.collection.find(
+                    {"id": {"$in": chunk}},
+                    {"_id": 0, "id": 1, "metadata.content_hash": 1}
+                )
+                async for doc_dict in cursor:
+                    hashes[doc_dict["id"]] = doc_dict.get("metadata", {}).get("content_hash")
+        except Exception as e:
+            print(f"Error loading content hashes: {e}")
+        return hashes
+
+    async def clear_content_hashes(
+            self,
+            document_ids: List[str],
+            chunk_size: Optional[int] = None
+    ) -> int:
+        """Unset ``metadata.content_hash`` so incremental runs reprocess the documents"""
+        cleared = 0
+        try:
+            for chunk in self._chunks(list(document_ids), chunk_size):
+                result = await self.collection.update_many(
+                    {"id": {"$in": chunk}},
+                    {"$unset": {"metadata.content_hash": ""}}
+                )
+                cleared += result.modified_count
+        except Exception as e:
+            print(f"Error clearing content hashes: {e}")
+        return cleared
+
+    async def mark_seen(
+            self,
+            document_ids: List[str],
+            run_id: str,
+            chunk_size: Optional[int] = None
+    ) -> int:
+        """Tag documents as present in ingest run ``run_id``"""
+        marked = 0
+        try:
+            for chunk in self._chunks(list(document_ids), chunk_size):
+                result = await self.collection.update_many(
+                    {"id": {"$in": chunk}},
+                    {"$set": {"ingest_run": run_id}}
+                )
+                marked += result.matched_count
+        except Exception as e:
+            print(f"Error marking documents: {e}")
+        return marked
+
+    async def iter_stale_ids(
+            self,
+            run_id: str,
+            chunk_size: Optional[int] = None
+    ) -> AsyncIterator[List[str]]:
+        """Yield, in chunks, IDs of documents not seen in ingest run ``run_id``"""
+        chunk_size = chunk_size or self.bulk_chunk_size
+        chunk: List[str] = []
+        cursor = self.collection.find({"ingest_run": {"$ne": run_id}}, {"_id": 0, "id": 1})
+        async for doc_dict in cursor:
+            chunk.append(doc_dict["id"])
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,578 @@
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .ann_index import IVFIndex, recall_at_k
+from .base_storage import BaseStorage
+from .payload import DATETIME_FIELDS, KEYWORD_FIELDS, payload_predicates
+from .quantization import QUANTIZERS, BaseQuantizer
+from ..loaders.filters import Contains, Equals, In, Predicate, Range
+
+# Timestamp of rows without a (valid) date
+_NO_DATE = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(value: Any) -> Optional[int]:
+    """Microseconds since the epoch of an ISO date(-time) string, or None
+
+    Dates without a time are midnight and naive times are UTC, as in
+    Qdrant's datetime payload index.
+    """
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - _EPOCH) // timedelta(microseconds=1)
+
+
+class NumpyVectorStore(BaseStorage):
+    """In-process vector storage backed by a contiguous float32 matrix
+
+    Vectors are L2-normalized on write so that top-k cosine search is a single
+    matrix-vector product followed by ``argpartition``. When ``directory`` is
+    given the matrix lives in a memory-mapped ``vectors.npy`` file and the
+    id/row index in ``index.json``, so a cold start only maps the file.
+    Deleted rows are tombstoned and reclaimed by ``compact()``, which runs
+    automatically once the tombstoned fraction exceeds ``compact_threshold``.
+
+    An optional ``IVFIndex`` replaces the brute-force scan once it has been
+    trained with ``train_index()``; new rows are added to it incrementally.
+
+    An optional quantizer keeps compact codes of every row in memory once
+    ``train_quantizer()`` has run. Searches score the codes and, with
+    ``rescore``, re-rank the best ``k * rescore_factor`` candidates against
+    the full-precision (memory-mapped) matrix.
+
+    ``search`` filters are applied before scoring: keyword payload fields
+    keep one packed row bitmap per value and date fields a timestamp
+    column, both rebuilt from the payloads on open. Filtered searches score
+    only the matching rows (exactly, or through quantized codes) and bypass
+    the ANN index, whose probed lists could miss selective filters.
+    """
+
+    MATRIX_FILE = "vectors.npy"
+    INDEX_FILE = "index.json"
+    ANN_FILE = "ann_index.npz"
+    QUANTIZED_FILE = "quantized.npz"
+    # Rows copied at a time when the matrix is rewritten
+    COPY_ROWS = 65536
+
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            dimension: int = 768,
+            initial_capacity: int = 1024,
+            compact_threshold: float = 0.25,
+            ann_index: Optional[IVFIndex] = None,
+            quantizer: Optional[BaseQuantizer] = None,
+            rescore: bool = True,
+            rescore_factor: int = 4
+    ):
+        self.directory = Path(directory) if directory else None
+        self.dimension = dimension
+        self.initial_capacity = initial_capacity
+        self.compact_threshold = compact_threshold
+        self.ann_index = ann_index
+        self.quantizer = quantizer
+        self.rescore = rescore
+        self.rescore_factor = rescore_factor
+
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._count = 0
+        self._keys: List[Optional[str]] = []
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+        self._document_rows: Dict[str, Set[int]] = {}
+        self._codes: Optional[np.ndarray] = None
+        self._bitmaps: Dict[str, Dict[Any, np.ndarray]] = {field: {} for field in KEYWORD_FIELDS}
+        self._dates: Dict[str, np.ndarray] = {
+            field: np.full(0, _NO_DATE, dtype=np.int64) for field in DATETIME_FIELDS
+        }
+
+    async def initialize(self):
+        """Open an existing store from disk or allocate an empty one"""
+        if self.directory and (self.directory / self.INDEX_FILE).exists():
+            self._open()
+        else:
+            self._allocate(self.initial_capacity)
+
+    async def close(self):
+        """Persist the store"""
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # Persistence
+
+    def _open(self) -> None:
+        with open(self.directory / self.INDEX_FILE, encoding="utf8") as f:
+            index = json.load(f)
+
+        if index["dimension"] != self.dimension:
+            raise ValueError(
+                f"Store at {self.directory} has dimension {index['dimension']}, expected {self.dimension}"
+            )
+
+        self._matrix = np.load(self.directory / self.MATRIX_FILE, mmap_mode="r+")
+        self._count = index["count"]
+        self._keys = index["keys"]
+        self._payloads = index["payloads"]
+        self._alive = np.zeros(len(self._matrix), dtype=bool)
+        self._bitmaps = {field: {} for field in KEYWORD_FIELDS}
+        self._dates = {field: np.full(len(self._matrix), _NO_DATE, dtype=np.int64) for field in DATETIME_FIELDS}
+        self._rows = {}
+        self._document_rows = {}
+        for row, key in enumerate(self._keys):
+            if key is not None:
+                self._index_row(row, key, self._payloads[row])
+
+        if (self.directory / self.ANN_FILE).exists():
+            self.ann_index = IVFIndex.load(str(self.directory / self.ANN_FILE))
+
+        if (self.directory / self.QUANTIZED_FILE).exists():
+            with np.load(self.directory / self.QUANTIZED_FILE) as data:
+                name = str(data["name"])
+                state = {key[len("state_"):]: data[key] for key in data.files if key.startswith("state_")}
+                self.quantizer = QUANTIZERS[name].from_state(self.dimension, state)
+                self._codes = self.quantizer.empty_codes(len(self._matrix))
+                self._codes[:self._count] = data["codes"]
+
+    def _write_matrix(self, capacity: int, rows: np.ndarray) -> None:
+        """Replace the matrix by one of ``capacity`` rows starting with ``rows``
+
+        On disk the new matrix is written to a temporary file and swapped in
+        with ``os.replace``, so the old file stays intact until it is complete.
+        Rows are copied ``COPY_ROWS`` at a time, so a memory-mapped matrix is
+        never read into memory as a whole.
+        """
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / self.MATRIX_FILE
+            tmp_path = self.directory / f"{self.MATRIX_FILE}.tmp"
+            matrix = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dimension)
+            )
+        else:
+            matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+
+        for start in range(0, len(rows), self.COPY_ROWS):
+            chunk = rows[start:start + self.COPY_ROWS]
+            matrix[start:start + len(chunk)] = self._matrix[chunk]
+
+        if self.directory:
+            matrix.flush()
+            del matrix
+            self._matrix = None
+            try:
+                os.replace(tmp_path, path)
+            finally:
+                # Maps the old file again if the replace failed
+                self._matrix = np.load(path, mmap_mode="r+")
+        else:
+            self._matrix = matrix
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow (or create) the matrix to ``capacity`` rows, keeping used rows"""
+        capacity = max(capacity, 1)
+        self._write_matrix(capacity, np.arange(self._count))
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._count] = self._alive[:self._count]
+        self._alive = alive
+
+        for field, timestamps in self._dates.items():
+            grown = np.full(capacity, _NO_DATE, dtype=np.int64)
+            grown[:self._count] = timestamps[:self._count]
+            self._dates[field] = grown
+
+        if self._codes is not None:
+            codes = self.quantizer.empty_codes(capacity)
+            codes[:self._count] = self._codes[:self._count]
+            self._codes = codes
+
+    def flush(self) -> None:
+        """Write the matrix and id/row index to disk"""
+        if not self.directory:
+            return
+
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+
+        tmp_path = self.directory / f"{self.INDEX_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump({
+                "dimension": self.dimension,
+                "count": self._count,
+                "keys": self._keys,
+                "payloads": self._payloads
+            }, f)
+        os.replace(tmp_path, self.directory / self.INDEX_FILE)
+
+        if self.ann_index is not None and self.ann_index.is_trained:
+            self.ann_index.save(str(self.directory / self.ANN_FILE))
+
+        if self._codes is not None:
+            state = {f"state_{key}": value for key, value in self.quantizer.state().items()}
+            with open(self.directory / self.QUANTIZED_FILE, "wb") as f:
+                np.savez(f, name=self.quantizer.name, codes=self._codes[:self._count], **state)
+
+    # Index bookkeeping
+
+    def _index_row(self, row: int, key: str, payload: Dict[str, Any]) -> None:
+        self._rows[key] = row
+        self._alive[row] = True
+        self._document_rows.setdefault(payload["document_id"], set()).add(row)
+        self._index_payload(row, payload, True)
+
+    def _index_payload(self, row: int, payload: Dict[str, Any], present: bool) -> None:
+        """Set (or clear) the filter bits of a row"""
+        for field, bitmaps in self._bitmaps.items():
+            values = payload.get(field)
+            for value in values if isinstance(values, list) else [values]:
+                if value is None:
+                    continue
+                bitmap = bitmaps.get(value)
+                if bitmap is None or row >> 3 >= len(bitmap):
+                    if not present:
+                        continue
+                    grown = np.zeros(len(self._matrix) // 8 + 1, dtype=np.uint8)
+                    if bitmap is not None:
+                        grown[:len(bitmap)] = bitmap
+                    bitmap = bitmaps[value] = grown
+                if present:
+                    bitmap[row >> 3] |= np.uint8(1 << (row & 7))
+                else:
+                    bitmap[row >> 3] &= np.uint8(~(1 << (row & 7)) & 0xFF)
+
+        for field, timestamps in self._dates.items():
+            value = payload.get(field) if present else None
+            # Unparseable dates never match a date filter
+            timestamp = _timestamp(value) if value else None
+            timestamps[row] = _NO_DATE if timestamp is None else timestamp
+
+    def _tombstone(self, row: int) -> None:
+        key = self._keys[row]
+        self._index_payload(row, self._payloads[row], False)
+        document_id = self._payloads[row]["document_id"]
+        rows = self._document_rows.get(document_id)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del self._document_rows[document_id]
+
+        del self._rows[key]
+        if self.ann_index is not None and self.ann_index.is_trained:
+            self.ann_index.remove(np.array([row]))
+        self._alive[row] = False
+        self._keys[row] = None
+        self._payloads[row] = None
+
+    def _maybe_compact(self) -> None:
+        if self._count and (self._count - len(self._rows)) / self._count > self.compact_threshold:
+            self.compact()
+
+    def compact(self) -> None:
+        """Move live rows to the front of the matrix and drop tombstones
+
+        On disk the compacted matrix is written to a new file, which replaces
+        the old one only when complete, and the id/row index is rewritten
+        right after; the rows on disk never move under the persisted index.
+        """
+        live = np.flatnonzero(self._alive[:self._count])
+        if self.directory:
+            self._write_matrix(len(self._matrix), live)
+        else:
+            self._matrix[:len(live)] = self._matrix[live]
+        if self._codes is not None:
+            self._codes[:len(live)] = self._codes[live]
+        self._keys = [self._keys[row] for row in live]
+        self._payloads = [self._payloads[row] for row in live]
+        self._count = len(live)
+        if self.ann_index is not None and self.ann_index.is_trained:
+            self.ann_index.remap(live)
+        self._alive[:] = False
+        self._rows = {}
+        self._document_rows = {}
+        self._bitmaps = {field: {} for field in KEYWORD_FIELDS}
+        for row, key in enumerate(self._keys):
+            self._index_row(row, key, self._payloads[row])
+        self.flush()
+
+    # Filtering
+
+    def _filter_mask(self, filter_dict: Dict[str, Any]) -> np.ndarray:
+        """Live rows matching every condition of ``filter_dict``"""
+        mask = self._alive[:self._count].copy()
+        for field, predicate in payload_predicates(filter_dict).items():
+            mask &= self._predicate_mask(field, predicate)
+        return mask
+
+    def _predicate_mask(self, field: str, predicate: Predicate) -> np.ndarray:
+        if field in self._dates:
+            if not isinstance(predicate, Range):
+                raise ValueError(f"Unsupported filter on {field}: {predicate!r}")
+            timestamps = self._dates[field][:self._count]
+            mask = timestamps != _NO_DATE
+            for bound, compare in (
+                    (predicate.gte, np.greater_equal), (predicate.gt, np.greater),
+                    (predicate.lte, np.less_equal), (predicate.lt, np.less)
+            ):
+                if bound is None:
+                    continue
+                timestamp = _timestamp(bound)
+                if timestamp is None:
+                    raise ValueError(f"Invalid {field} bound: {bound!r}")
+                mask &= compare(timestamps, timestamp)
+            return mask
+
+        if isinstance(predicate, (Equals, Contains)):
+            values = [predicate.value]
+        elif isinstance(predicate, In):
+            values = predicate.values
+        else:
+            raise ValueError(f"Unsupported filter on {field}: {predicate!r}")
+
+        # OR the value bitmaps, then expand to one flag per row
+        packed = np.zeros((self._count + 7) // 8, dtype=np.uint8)
+        for value in values:
+            bitmap = self._bitmaps[field].get(value)
+            if bitmap is not None:
+                n = min(len(bitmap), len(packed))
+                packed[:n] |= bitmap[:n]
+        return np.unpackbits(packed, count=self._count, bitorder="little").astype(bool)
+
+    def _filtered_top_k(
+            self,
+            query: np.ndarray,
+            rows: np.ndarray,
+            k: int,
+            exact: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k among ``rows``, through quantized codes when available"""
+        if self._codes is not None and not exact:
+            fetch = k * self.rescore_factor if self.rescore else k
+            top, scores = self._top_k(self.quantizer.scores(self._codes[rows], query), fetch)
+            if not self.rescore:
+                return rows[top][:k], scores[:k]
+            rows = np.sort(rows[top])  # sorted reads are mmap-friendly
+        top, scores = self._top_k(self._matrix[rows] @ query, k)
+        return rows[top], scores
+
+    # Storage contract
+
+    async def save(self, key: str, vector: np.ndarray) -> bool:
+        """Save a single vector"""
+        return await self.save_many([key], np.asarray(vector)[np.newaxis, :])
+
+    async def save_many(
+            self,
+            keys: Sequence[str],
+            matrix: np.ndarray,
+            batch_size: Optional[int] = None,
+            *,
+            payloads: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> bool:
+        """Insert or overwrite the rows of a 2-D array, one row per key
+
+        ``batch_size`` is accepted for interface parity with QdrantVectorStore.
+        """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape != (len(keys), self.dimension):
+            raise ValueError(
+                f"Expected a matrix of shape ({len(keys)}, {self.dimension}), got {matrix.shape}"
+            )
+        if payloads is None:
+            payloads = [{"document_id": key} for key in keys]
+
+        # A key repeated within the call keeps its last row only
+        last = {key: i for i, key in enumerate(keys)}
+        if len(last) < len(keys):
+            unique = sorted(last.values())
+            keys = [keys[i] for i in unique]
+            matrix = matrix[unique]
+            payloads = [payloads[i] for i in unique]
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+
+        new_keys = [key for key in keys if key not in self._rows]
+        if self._count + len(new_keys) > len(self._matrix):
+            self._allocate(max(2 * len(self._matrix), self._count + len(new_keys)))
+
+        for key, vector, payload in zip(keys, matrix, payloads):
+            row = self._rows.get(key)
+            if row is not None:
+                self._tombstone(row)
+                self._keys[row] = key
+                self._payloads[row] = dict(payload)
+            else:
+                row = self._count
+                self._count += 1
+                self._keys.append(key)
+                self._payloads.append(dict(payload))
+            self._matrix[row] = vector
+            self._index_row(row, key, payload)
+
+        rows = np.array([self._rows[key] for key in keys])
+        if self._codes is not None:
+            self._codes[rows] = self.quantizer.encode(matrix)
+        if self.ann_index is not None and self.ann_index.is_trained:
+            self.ann_index.add(rows, matrix)
+
+        return True
+
+    async def load(self, key: str) -> Optional[np.ndarray]:
+        """Load a (normalized) vector by key"""
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._matrix[row])
+
+    async def delete(self, key: str) -> bool:
+        """Tombstone a vector"""
+        row = self._rows.get(key)
+        if row is None:
+            return False
+        self._tombstone(row)
+        self._maybe_compact()
+        return True
+
+    async def delete_documents(self, document_ids: Sequence[str]) -> bool:
+        """Tombstone every chunk vector belonging to the given documents"""
+        for document_id in document_ids:
+            for row in list(self._document_rows.get(document_id, ())):
+                self._tombstone(row)
+        self._maybe_compact()
+        return True
+
+    async def trim_documents(self, chunk_counts: Dict[str, int]) -> bool:
+        """Tombstone the chunks of each document at indexes past its chunk count"""
+        for document_id, count in chunk_counts.items():
+            for row in list(self._document_rows.get(document_id, ())):
+                if self._payloads[row].get("chunk_index", -1) >= count:
+                    self._tombstone(row)
+        self._maybe_compact()
+        return True
+
+    def train_index(self, sample_size: Optional[int] = None) -> None:
+        """Train the ANN index on the stored vectors and index all of them"""
+        if self.ann_index is None:
+            self.ann_index = IVFIndex()
+
+        live = np.flatnonzero(self._alive[:self._count])
+        self.ann_index.train(self._matrix[live], sample_size=sample_size)
+        self.ann_index.add(live, self._matrix[live])
+
+    def train_quantizer(self, sample_size: Optional[int] = None, chunk_size: int = 65536) -> None:
+        """Train the quantizer on the stored vectors and encode all of them"""
+        if self.quantizer is None:
+            raise RuntimeError("No quantizer configured")
+
+        live = np.flatnonzero(self._alive[:self._count])
+        sample = live
+        if sample_size and len(live) > sample_size:
+            sample = np.sort(np.random.default_rng(0).choice(live, sample_size, replace=False))
+        self.quantizer.train(self._matrix[sample])
+
+        self._codes = self.quantizer.empty_codes(len(self._matrix))
+        for start in range(0, len(live), chunk_size):
+            rows = live[start:start + chunk_size]
+            self._codes[rows] = self.quantizer.encode(self._matrix[rows])
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Bytes needed for the live vectors at full and quantized precision"""
+        full = len(self._rows) * self.dimension * 4
+        report = {'vectors': len(self._rows), 'float32_bytes': full}
+        if self._codes is not None:
+            quantized = len(self._rows) * self.quantizer.bytes_per_vector
+            report.update({
+                'quantizer': self.quantizer.name,
+                'quantized_bytes': quantized,
+                'compression_ratio': full / quantized if quantized else 0.0
+            })
+        return report
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def _exact_top_k(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self._matrix[:self._count] @ query
+        scores[~self._alive[:self._count]] = -np.inf
+        return self._top_k(scores, k)
+
+    def _approximate_top_k(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k through the ANN index and/or quantized codes, if configured"""
+        quantized = self._codes is not None
+        fetch = k * self.rescore_factor if quantized and self.rescore else k
+
+        if self.ann_index is not None and self.ann_index.is_trained:
+            scorer = (lambda rows: self.quantizer.scores(self._codes[rows], query)) if quantized else None
+            rows, scores = self.ann_index.search(self._matrix, query, fetch, scorer=scorer)
+        elif quantized:
+            scores = self.quantizer.scores(self._codes[:self._count], query)
+            scores[~self._alive[:self._count]] = -np.inf
+            rows, scores = self._top_k(scores, fetch)
+        else:
+            return self._exact_top_k(query, k)
+
+        if quantized and self.rescore:
+            # Tombstoned rows fill the candidates when fetch exceeds the live count
+            rows = np.sort(rows[self._alive[rows]])  # sorted reads are mmap-friendly
+            top, scores = self._top_k(self._matrix[rows] @ query, k)
+            rows = rows[top]
+        return rows[:k], scores[:k]
+
+    async def search(
+            self,
+            query_vector: np.ndarray,
+            k: int = 5,
+            exact: bool = False,
+            filter_dict: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """Top-k cosine search, returning ``(document_id, score)`` per hit
+
+        Uses the ANN index and quantized codes when available, unless ``exact``
+        is set. ``filter_dict`` restricts the search to matching payloads, as
+        in ``QdrantVectorStore.search``.
+        """
+        rows = None
+        if filter_dict:
+            rows = np.flatnonzero(self._filter_mask(filter_dict))
+        k = min(k, len(self._rows) if rows is None else len(rows))
+        if k <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        if rows is not None:
+            rows, scores = self._filtered_top_k(query, rows, k, exact)
+        elif exact:
+            rows, scores = self._exact_top_k(query, k)
+        else:
+            rows, scores = self._approximate_top_k(query, k)
+
+        return [(self._payloads[row]["document_id"], float(score)) for row, score in zip(rows, scores)]
+
+    def evaluate_recall(self, queries: np.ndarray, k: int = 10) -> float:
+        """recall@k of the approximate search path against exact search"""
+        k = min(k, len(self._rows))
+        exact, approximate = [], []
+        for query in np.asarray(queries, dtype=np.float32):
+            query = query / (np.linalg.norm(query) or 1.0)
+            exact.append(self._exact_top_k(query, k)[0])
+            approximate.append(self._approximate_top_k(query, k)[0])
+        return recall_at_k(exact, approximate)
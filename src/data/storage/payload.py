@@ -0,0 +1,41 @@
+from typing import Any, Dict
+
+from ..loaders.base_loader import Document
+from ..loaders.filters import EntryFilter, Equals, Predicate, Range, field_values
+
+# Document fields copied into every chunk payload and indexed for filtering.
+# Multi-valued fields (categories) are stored as lists of their values.
+KEYWORD_FIELDS = ("categories", "license")
+DATETIME_FIELDS = ("update_date",)
+PAYLOAD_FIELDS = KEYWORD_FIELDS + DATETIME_FIELDS
+
+
+def payload_fields(document: Document) -> Dict[str, Any]:
+    """Filterable payload of a document, from its attributes or metadata"""
+    payload = {}
+    for field in PAYLOAD_FIELDS:
+        value = getattr(document, field, None)
+        if value is None:
+            value = document.metadata.get(field)
+        if value is None:
+            continue
+        payload[field] = field_values(field, value) if field == "categories" else value
+    return payload
+
+
+def payload_predicates(filter_dict: Dict[str, Any]) -> Dict[str, Predicate]:
+    """Predicates of a vector search filter, in the loaders' filter syntax
+
+    Only payload fields can be filtered on. On multi-valued fields ``Equals``
+    matches any single value, like ``Contains``; equality on a date field is
+    a range of one instant (midnight for a date without time).
+    """
+    predicates = EntryFilter(filter_dict).predicates
+    for field, predicate in predicates.items():
+        if field not in PAYLOAD_FIELDS:
+            raise ValueError(f"Cannot filter vectors on '{field}'; payload fields are {PAYLOAD_FIELDS}")
+        if field in DATETIME_FIELDS and isinstance(predicate, Equals):
+            predicates[field] = Range(gte=predicate.value, lte=predicate.value)
+        elif isinstance(predicate, Range) and field not in DATETIME_FIELDS:
+            raise ValueError(f"Range filters are only supported on {DATETIME_FIELDS}")
+    return predicates
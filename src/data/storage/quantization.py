@@ -0,0 +1,252 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type
+
+import numpy as np
+
+
+class BaseQuantizer(ABC):
+    """Base class for compressed vector encodings
+
+    A quantizer turns float32 rows into compact codes and scores a float32
+    query against those codes without decoding them to full precision.
+    """
+
+    name: str = ""
+
+    #: Rows converted at a time when scoring, to bound temporary memory
+    chunk_size: int = 65536
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    @property
+    def is_trained(self) -> bool:
+        return True
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit encoding parameters on sample vectors"""
+        pass
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode ``(n, dimension)`` float vectors into codes"""
+        pass
+
+    @abstractmethod
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximately reconstruct float32 vectors from codes"""
+        pass
+
+    @abstractmethod
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate dot products between ``query`` and every encoded row"""
+        pass
+
+    @property
+    @abstractmethod
+    def bytes_per_vector(self) -> int:
+        pass
+
+    @abstractmethod
+    def empty_codes(self, capacity: int) -> np.ndarray:
+        """Zero-filled code array for ``capacity`` rows"""
+        pass
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Trained parameters, as arrays suitable for ``np.savez``"""
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        pass
+
+    @classmethod
+    def from_state(cls, dimension: int, state: Dict[str, np.ndarray]) -> "BaseQuantizer":
+        """Rebuild a trained quantizer from ``state()``"""
+        quantizer = cls(dimension)
+        quantizer.load_state(state)
+        return quantizer
+
+
+class Float16Quantizer(BaseQuantizer):
+    """Half-precision storage; halves memory with negligible recall loss"""
+
+    name = "float16"
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float16)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        return np.concatenate([
+            codes[start:start + self.chunk_size].astype(np.float32) @ query
+            for start in range(0, len(codes), self.chunk_size)
+        ]) if len(codes) else np.zeros(0, dtype=np.float32)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return 2 * self.dimension
+
+    def empty_codes(self, capacity: int) -> np.ndarray:
+        return np.zeros((capacity, self.dimension), dtype=np.float16)
+
+
+class ScalarInt8Quantizer(BaseQuantizer):
+    """8-bit scalar quantization with a per-dimension scale and offset
+
+    Each component is stored as ``round((x - offset) / scale)`` in a uint8, so
+    ``q . x ~= (q * scale) . code + q . offset``.
+    """
+
+    name = "int8"
+
+    def __init__(self, dimension: int):
+        super().__init__(dimension)
+        self.offset: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.scale is not None
+
+    def train(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        low = vectors.min(axis=0)
+        high = vectors.max(axis=0)
+        self.offset = low
+        self.scale = np.where(high > low, (high - low) / 255.0, 1.0).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        if not self.is_trained:
+            raise RuntimeError("int8 quantizer must be trained before encoding")
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.offset) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * self.scale + self.offset
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        weights = (query * self.scale).astype(np.float32)
+        bias = float(query @ self.offset)
+        return np.concatenate([
+            codes[start:start + self.chunk_size].astype(np.float32) @ weights
+            for start in range(0, len(codes), self.chunk_size)
+        ]) + bias if len(codes) else np.zeros(0, dtype=np.float32)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.dimension
+
+    def empty_codes(self, capacity: int) -> np.ndarray:
+        return np.zeros((capacity, self.dimension), dtype=np.uint8)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"offset": self.offset, "scale": self.scale}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.offset = state["offset"]
+        self.scale = state["scale"]
+
+
+class ProductQuantizer(BaseQuantizer):
+    """Product quantization: ``subspaces`` sub-vectors, 256 centroids each
+
+    Rows are stored as one uint8 centroid id per subspace. Queries are scored
+    with per-subspace lookup tables of query/centroid dot products.
+    """
+
+    name = "pq"
+
+    def __init__(self, dimension: int, subspaces: int = 96, iterations: int = 15, seed: int = 0):
+        super().__init__(dimension)
+        if dimension % subspaces:
+            raise ValueError(f"dimension {dimension} is not divisible by {subspaces} subspaces")
+        self.subspaces = subspaces
+        self.iterations = iterations
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None  # (subspaces, 256, sub_dim)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """View ``(n, dimension)`` as ``(subspaces, n, sub_dim)``"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors.reshape(len(vectors), self.subspaces, -1).transpose(1, 0, 2)
+
+    def train(self, vectors: np.ndarray) -> None:
+        rng = np.random.default_rng(self.seed)
+        parts = self._split(vectors)
+        centroids = min(256, parts.shape[1])
+
+        codebooks = np.zeros((self.subspaces, 256, parts.shape[2]), dtype=np.float32)
+        for j, part in enumerate(parts):
+            book = part[rng.choice(len(part), centroids, replace=False)].copy()
+            for _ in range(self.iterations):
+                assignments = self._assign(part, book)
+                sums = np.zeros_like(book)
+                np.add.at(sums, assignments, part)
+                counts = np.bincount(assignments, minlength=centroids)
+                filled = counts > 0
+                book[filled] = sums[filled] / counts[filled, np.newaxis]
+            codebooks[j, :centroids] = book
+            codebooks[j, centroids:] = book[0]  # pad unused centroids with a real one
+        self.codebooks = codebooks
+
+    @staticmethod
+    def _assign(part: np.ndarray, book: np.ndarray) -> np.ndarray:
+        distances = (
+            (part ** 2).sum(axis=1, keepdims=True)
+            - 2 * part @ book.T
+            + (book ** 2).sum(axis=1)
+        )
+        return np.argmin(distances, axis=1)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        if not self.is_trained:
+            raise RuntimeError("Product quantizer must be trained before encoding")
+        parts = self._split(vectors)
+        codes = np.empty((parts.shape[1], self.subspaces), dtype=np.uint8)
+        for j, part in enumerate(parts):
+            codes[:, j] = self._assign(part, self.codebooks[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = [self.codebooks[j][codes[:, j]] for j in range(self.subspaces)]
+        return np.concatenate(parts, axis=1)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        tables = np.einsum("jcd,jd->jc", self.codebooks, self._split(query[np.newaxis, :])[:, 0])
+        subspaces = np.arange(self.subspaces)
+        return np.concatenate([
+            tables[subspaces, codes[start:start + self.chunk_size]].sum(axis=1)
+            for start in range(0, len(codes), self.chunk_size)
+        ]) if len(codes) else np.zeros(0, dtype=np.float32)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.subspaces
+
+    def empty_codes(self, capacity: int) -> np.ndarray:
+        return np.zeros((capacity, self.subspaces), dtype=np.uint8)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"codebooks": self.codebooks}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.codebooks = state["codebooks"]
+        self.subspaces = len(self.codebooks)
+
+    @classmethod
+    def from_state(cls, dimension: int, state: Dict[str, np.ndarray]) -> "ProductQuantizer":
+        quantizer = cls(dimension, subspaces=len(state["codebooks"]))
+        quantizer.load_state(state)
+        return quantizer
+
+
+QUANTIZERS: Dict[str, Type[BaseQuantizer]] = {
+    quantizer.name: quantizer
+    for quantizer in (Float16Quantizer, ScalarInt8Quantizer, ProductQuantizer)
+}
@@ -1,3 +1,3 @@
-from .base_validator import ValidationResult
+from .base_validator import BatchValidationResult, ValidationResult
 from .document_validatot import DocumentValidator
 from .embedding_validator import EmbeddingValidator
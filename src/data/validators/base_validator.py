@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
 
 
 @dataclass
@@ -10,6 +12,18 @@ class ValidationResult:
     warnings: List[str]
 
 
+@dataclass
+class BatchValidationResult:
+    """Per-row validation outcome for a batch; messages are keyed by row index"""
+    valid: np.ndarray
+    errors: Dict[int, List[str]] = field(default_factory=dict)
+    warnings: Dict[int, List[str]] = field(default_factory=dict)
+
+    @property
+    def is_valid(self) -> bool:
+        return bool(self.valid.all())
+
+
 class BaseValidator(ABC):
     """Base class for all validators"""
 
@@ -1,4 +1,7 @@
 from typing import List, Dict, Any
+
+import numpy as np
+
 from .base_validator import BaseValidator, ValidationResult
 from ..loaders.base_loader import Document
 
@@ -6,35 +9,64 @@ from ..loaders.base_loader import Document
 class DocumentValidator(BaseValidator):
     """Validator for Document objects"""
 
+    MAX_CONTENT_LENGTH = 1_000_000  # 1MB text limit
+    MIN_CONTENT_LENGTH = 10
+
     def validate(self, document: Document) -> ValidationResult:
-        errors = []
-        warnings = []
-
-        # Required fields validation
-        if not document.id:
-            errors.append("Document ID is required")
-
-        if not document.content:
-            errors.append("Document content cannot be empty")
-        elif len(document.content) < 10:
-            warnings.append("Document content is very short")
-
-        if not isinstance(document.metadata, dict):
-            errors.append("Metadata must be a dictionary")
-
-        # Content validation
-        if len(document.content) > 1_000_000:  # 1MB text limit
-            errors.append("Document content exceeds maximum size")
-
-        # Metadata validation
-        if document.metadata:
-            if 'source' not in document.metadata:
-                warnings.append("Source information missing in metadata")
-            if 'created_at' not in document.metadata:
-                warnings.append("Creation date missing in metadata")
-
-        return ValidationResult(
-            is_valid=len(errors) == 0,
-            errors=errors,
-            warnings=warnings
-        )
\ No newline at end of file
+        return self.validate_batch([document])[0]
+
+    def validate_batch(self, documents: List[Document]) -> List[ValidationResult]:
+        """Validate a list of documents in a single pass
+
+        Every check is evaluated as a boolean mask over the whole batch; only
+        the message lists are assembled per document. Also warns about IDs
+        repeated within the batch, since later copies overwrite earlier ones
+        in bulk upserts.
+        """
+        count = len(documents)
+        if count == 0:
+            return []
+
+        ids = [document.id for document in documents]
+        lengths = np.fromiter((len(document.content or "") for document in documents), dtype=np.int64, count=count)
+        is_dict = np.fromiter((isinstance(document.metadata, dict) for document in documents), dtype=bool, count=count)
+        metadata = [document.metadata if dict_ and document.metadata else {} for document, dict_ in zip(documents, is_dict)]
+        has_metadata = np.fromiter((bool(m) for m in metadata), dtype=bool, count=count)
+
+        # Every occurrence of an ID after its first one
+        first = {}
+        for i, document_id in enumerate(ids):
+            first.setdefault(document_id, i)
+        duplicate = np.ones(count, dtype=bool)
+        duplicate[list(first.values())] = False
+
+        error_checks = [
+            (np.fromiter((not document_id for document_id in ids), dtype=bool, count=count), "Document ID is required"),
+            (lengths == 0, "Document content cannot be empty"),
+            (~is_dict, "Metadata must be a dictionary"),
+            (lengths > self.MAX_CONTENT_LENGTH, "Document content exceeds maximum size"),
+        ]
+        warning_checks = [
+            ((lengths > 0) & (lengths < self.MIN_CONTENT_LENGTH), "Document content is very short"),
+            (has_metadata & np.fromiter(('source' not in m for m in metadata), dtype=bool, count=count),
+             "Source information missing in metadata"),
+            (has_metadata & np.fromiter(('created_at' not in m for m in metadata), dtype=bool, count=count),
+             "Creation date missing in metadata"),
+            (duplicate, "Duplicate document ID in batch"),
+        ]
+
+        errors = self._messages(error_checks, count)
+        warnings = self._messages(warning_checks, count)
+        return [
+            ValidationResult(is_valid=not errors[i], errors=errors[i], warnings=warnings[i])
+            for i in range(count)
+        ]
+
+    @staticmethod
+    def _messages(checks: List[Any], count: int) -> List[List[str]]:
+        """Per-document message lists for the rows flagged by each mask"""
+        messages: List[List[str]] = [[] for _ in range(count)]
+        for mask, message in checks:
+            for i in np.flatnonzero(mask):
+                messages[i].append(message)
+        return messages
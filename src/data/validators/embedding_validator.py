@@ -1,5 +1,7 @@
 import numpy as np
-from .base_validator import BaseValidator, ValidationResult
+from typing import Dict, List, Sequence, Union
+
+from .base_validator import BaseValidator, BatchValidationResult, ValidationResult
 
 
 class EmbeddingValidator(BaseValidator):
@@ -35,3 +37,56 @@ class EmbeddingValidator(BaseValidator):
             errors=errors,
             warnings=warnings
         )
+
+    def validate_batch(
+            self,
+            embeddings: Union[np.ndarray, Sequence[np.ndarray]],
+            normalize: bool = False
+    ) -> BatchValidationResult:
+        """Validate an (N, D) matrix of embeddings in a few vectorized passes
+
+        With ``normalize``, finite rows that are not unit length are normalized
+        in place (when ``embeddings`` is a writeable float array) instead of only
+        producing a warning.
+        """
+        matrix = embeddings if isinstance(embeddings, np.ndarray) else np.asarray(embeddings)
+        rows = len(matrix)
+
+        if matrix.ndim != 2:
+            return self._reject_all(rows, f"Expected a 2-D embedding matrix, got {matrix.ndim} dimensions")
+        if matrix.shape[1] != self.expected_dim:
+            return self._reject_all(
+                rows, f"Expected embedding dimension {self.expected_dim}, got {matrix.shape[1]}"
+            )
+
+        with np.errstate(invalid="ignore", over="ignore"):
+            norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+        # A non-finite component always yields a non-finite norm, so the
+        # element-wise check is only needed when some norm is non-finite
+        if np.isfinite(norms).all():
+            finite = np.ones(rows, dtype=bool)
+        else:
+            finite = np.isfinite(matrix).all(axis=1)
+        non_unit = finite & ~np.isclose(norms, 1.0, atol=1e-5)
+
+        errors: Dict[int, List[str]] = {
+            int(i): ["Embedding contains non-finite values"] for i in np.flatnonzero(~finite)
+        }
+        warnings: Dict[int, List[str]] = {}
+
+        if normalize and non_unit.any():
+            fixable = non_unit & (norms > 0)
+            matrix[fixable] /= norms[fixable, np.newaxis]
+            non_unit &= ~fixable
+
+        for i in np.flatnonzero(non_unit):
+            warnings[int(i)] = ["Embedding is not normalized"]
+
+        return BatchValidationResult(valid=finite, errors=errors, warnings=warnings)
+
+    @staticmethod
+    def _reject_all(rows: int, message: str) -> BatchValidationResult:
+        return BatchValidationResult(
+            valid=np.zeros(rows, dtype=bool),
+            errors={i: [message] for i in range(rows)}
+        )
@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from ..data.loaders.base_loader import Document
+
+DEFAULT_PROMPT = (
+    "Answer the question using only the context below.\n\n"
+    "Context:\n{context}\n\n"
+    "Question: {query}\n"
+    "Answer:"
+)
+
+
+@dataclass
+class Answer:
+    """LLM answer with the IDs of the documents it was grounded on"""
+    query: str
+    text: str
+    document_ids: List[str] = field(default_factory=list)
+    # 'exact' or 'semantic' when served from a query cache
+    cached: Optional[str] = None
+
+
+class BaseLLM(ABC):
+    """Base class for language model backends"""
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        """Complete ``prompt``"""
+        pass
+
+
+class LLMChain:
+    """Retrieve context documents for a query and answer it with an LLM
+
+    ``retriever`` is anything with an async
+    ``search(query, k, query_embedding=None)`` returning documents, such as
+    ``HybridRetriever``. Context is cut at ``max_context_chars``.
+    """
+
+    def __init__(
+            self,
+            retriever,
+            llm: BaseLLM,
+            k: int = 5,
+            prompt_template: str = DEFAULT_PROMPT,
+            max_context_chars: int = 8000
+    ):
+        self.retriever = retriever
+        self.llm = llm
+        self.k = k
+        self.prompt_template = prompt_template
+        self.max_context_chars = max_context_chars
+
+    def build_prompt(self, query: str, documents: List[Document]) -> str:
+        parts = []
+        remaining = self.max_context_chars
+        for document in documents:
+            if remaining <= 0:
+                break
+            title = document.metadata.get('title')
+            part = f"[{document.id}] {title}\n{document.content}" if title else f"[{document.id}] {document.content}"
+            parts.append(part[:remaining])
+            remaining -= len(parts[-1])
+        return self.prompt_template.format(context="\n\n".join(parts), query=query)
+
+    async def run(self, query: str, query_embedding: Optional[np.ndarray] = None) -> Answer:
+        """Answer ``query`` from the retrieved documents"""
+        documents = await self.retriever.search(query, self.k, query_embedding=query_embedding)
+        text = await self.llm.generate(self.build_prompt(query, documents))
+        return Answer(query=query, text=text, document_ids=[document.id for document in documents])
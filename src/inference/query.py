@@ -0,0 +1,314 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..preprocessor.embeddings import EmbeddingEngine, normalize_text
+from .llm_chain import Answer, LLMChain
+
+
+def normalize_query(query: str) -> str:
+    """Exact-cache key: case, whitespace and trailing punctuation are ignored"""
+    return normalize_text(query).lower().rstrip("?!. ")
+
+
+@dataclass
+class CacheStats:
+    """Hit counters for a query cache"""
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    # Lookups that waited for an identical in-flight query instead of missing
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    # Answers not cached because their documents changed while they were computed
+    stale: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.exact_hits + self.semantic_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        if not self.lookups:
+            return 0.0
+        return (self.exact_hits + self.semantic_hits) / self.lookups
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'exact_hits': self.exact_hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'stale': self.stale,
+            'hit_rate': self.hit_rate
+        }
+
+
+@dataclass
+class _Entry:
+    answer: Answer
+    expires_at: float
+    slot: Optional[int] = None
+
+
+class QueryCache:
+    """Two-level answer cache: exact normalized text, then embedding similarity
+
+    Entries live in one LRU ``OrderedDict`` keyed by normalized query and
+    expire ``ttl`` seconds after insertion. Entries stored with an embedding
+    also occupy a row of a unit-vector matrix (rows are reused), so a semantic
+    lookup is one matrix-vector product; a cached answer is reused when its
+    cosine similarity reaches ``similarity_threshold``.
+
+    ``invalidate`` drops every answer grounded on the given documents; pass
+    it to ``DataManager.add_ingest_listener`` so re-ingested or deleted
+    documents never serve stale answers. Each call starts a new
+    ``generation``; ``put`` given the generation read before an answer was
+    computed refuses it if any of its documents were invalidated since. The
+    last ``max_entries`` invalidated documents are remembered for this;
+    answers older than that window are refused.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 10_000,
+            ttl: Optional[float] = 3600.0,
+            similarity_threshold: float = 0.95,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.clock = clock
+        self.stats = CacheStats()
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_document: Dict[str, Set[str]] = {}
+        self._generation = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._invalidated_floor = 0
+        self._embeddings: Optional[np.ndarray] = None
+        # Expiry time per embedding row; -inf marks a free row
+        self._slot_expires = np.empty(0, dtype=np.float64)
+        self._slot_keys: List[Optional[str]] = []
+        self._free_slots: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Number of ``invalidate`` calls so far"""
+        return self._generation
+
+    def get(self, query: str) -> Optional[Answer]:
+        """Exact lookup by normalized query text"""
+        key = normalize_query(query)
+        entry = self._live_entry(key)
+        if entry is None:
+            return None
+        self.stats.exact_hits += 1
+        return replace(entry.answer, query=query, cached='exact')
+
+    def get_similar(self, query: str, embedding: np.ndarray) -> Optional[Answer]:
+        """Semantic lookup; counts a miss when nothing is close enough"""
+        match = self._nearest(embedding)
+        if match is not None:
+            key, similarity = match
+            entry = self._live_entry(key)
+            if entry is not None and similarity >= self.similarity_threshold:
+                self.stats.semantic_hits += 1
+                return replace(entry.answer, query=query, cached='semantic')
+        self.stats.misses += 1
+        return None
+
+    def put(
+            self,
+            query: str,
+            answer: Answer,
+            embedding: Optional[np.ndarray] = None,
+            generation: Optional[int] = None
+    ) -> None:
+        if generation is not None and self._is_stale(answer, generation):
+            self.stats.stale += 1
+            return
+        key = normalize_query(query)
+        self._discard(key)
+        while len(self._entries) >= self.max_entries:
+            self._discard(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+        expires_at = self.clock() + self.ttl if self.ttl is not None else float('inf')
+        entry = _Entry(answer=replace(answer, cached=None), expires_at=expires_at)
+        if embedding is not None:
+            entry.slot = self._store_embedding(key, embedding, expires_at)
+        self._entries[key] = entry
+        for document_id in answer.document_ids:
+            self._by_document.setdefault(document_id, set()).add(key)
+
+    def invalidate(self, document_ids: Iterable[str]) -> int:
+        """Drop answers grounded on any of ``document_ids``"""
+        self._generation += 1
+        keys = set()
+        for document_id in document_ids:
+            keys.update(self._by_document.pop(document_id, ()))
+            self._invalidated[document_id] = self._generation
+            self._invalidated.move_to_end(document_id)
+        while len(self._invalidated) > self.max_entries:
+            _, self._invalidated_floor = self._invalidated.popitem(last=False)
+        for key in keys:
+            self._discard(key)
+        self.stats.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._discard(key)
+
+    def _is_stale(self, answer: Answer, generation: int) -> bool:
+        """Whether documents of ``answer`` were invalidated after ``generation``"""
+        if generation == self._generation:
+            return False
+        if generation < self._invalidated_floor:
+            return True
+        return any(self._invalidated.get(document_id, 0) > generation for document_id in answer.document_ids)
+
+    def _live_entry(self, key: str) -> Optional[_Entry]:
+        """Entry for ``key`` if present and not expired, marked most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self.clock():
+            self._discard(key)
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, embedding: np.ndarray) -> Optional[Tuple[str, float]]:
+        if self._embeddings is None or len(self._free_slots) == len(self._slot_keys):
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return None
+        rows = len(self._slot_keys)
+        similarities = self._embeddings[:rows] @ (query / norm)
+        # Free and expired rows never win, so a closer expired entry cannot hide a live one
+        similarities[self._slot_expires[:rows] <= self.clock()] = -np.inf
+        best = int(np.argmax(similarities))
+        if similarities[best] == -np.inf:
+            return None
+        return self._slot_keys[best], float(similarities[best])
+
+    def _store_embedding(self, key: str, embedding: np.ndarray, expires_at: float) -> int:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self._embeddings is None:
+            self._embeddings = np.zeros((min(self.max_entries, 1024), len(vector)), dtype=np.float32)
+            self._slot_expires = np.full(len(self._embeddings), -np.inf)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._slot_keys)
+            self._slot_keys.append(None)
+            if slot == len(self._embeddings):
+                grown = np.zeros((min(self.max_entries, 2 * slot), self._embeddings.shape[1]), dtype=np.float32)
+                grown[:slot] = self._embeddings
+                self._embeddings = grown
+                self._slot_expires = np.concatenate([
+                    self._slot_expires, np.full(len(grown) - slot, -np.inf)
+                ])
+
+        norm = np.linalg.norm(vector)
+        self._embeddings[slot] = vector / norm if norm else 0.0
+        self._slot_expires[slot] = expires_at
+        self._slot_keys[slot] = key
+        return slot
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.slot is not None:
+            self._embeddings[entry.slot] = 0.0
+            self._slot_expires[entry.slot] = -np.inf
+            self._slot_keys[entry.slot] = None
+            self._free_slots.append(entry.slot)
+        for document_id in entry.answer.document_ids:
+            keys = self._by_document.get(document_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_document[document_id]
+
+
+class QueryEngine:
+    """Answer queries through an ``LLMChain`` behind a ``QueryCache``
+
+    A repeated question is answered from the exact cache without any model
+    call. Otherwise the query is embedded once; the embedding serves the
+    semantic lookup and, on a miss, the retrieval of the chain. Concurrent
+    misses for the same normalized query share one chain run; if that run is
+    cancelled, its waiters retry. Answers whose documents were invalidated
+    during the run are returned but not cached.
+    """
+
+    def __init__(self, chain: LLMChain, engine: EmbeddingEngine, cache: Optional[QueryCache] = None):
+        self.chain = chain
+        self.engine = engine
+        self.cache = cache
+        self._in_flight: Dict[str, "asyncio.Future[Answer]"] = {}
+
+    async def ask(self, query: str) -> Answer:
+        if self.cache is None:
+            return await self.chain.run(query)
+
+        answer = self.cache.get(query)
+        if answer is not None:
+            return answer
+
+        key = normalize_query(query)
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.cache.stats.coalesced += 1
+            try:
+                return replace(await asyncio.shield(pending), query=query)
+            except asyncio.CancelledError:
+                # Only the shared run was cancelled, not this caller
+                if not pending.cancelled():
+                    raise
+                return await self.ask(query)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        generation = self.cache.generation
+        try:
+            embedding = (await self.engine.embed([query]))[0]
+            answer = self.cache.get_similar(query, embedding)
+            if answer is None:
+                answer = await self.chain.run(query, query_embedding=embedding)
+                self.cache.put(query, answer, embedding, generation=generation)
+            future.set_result(answer)
+            return answer
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters, if any, see the exception; mark it retrieved otherwise
+            future.exception()
+            raise
+        finally:
+            # Cancelled (or otherwise aborted): wake the waiters up
+            if not future.done():
+                future.cancel()
+            del self._in_flight[key]
@@ -0,0 +1,477 @@
+import math
+import os
+import re
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..data.loaders.base_loader import Document
+from ..data.manager import DataManager
+from ..data.processors.nltk_resources import FALLBACK_STOPWORDS
+
+_TERM = re.compile(r"\w+")
+
+
+def default_analyzer(text: str) -> List[str]:
+    """Lowercased word terms without English stopwords"""
+    return [term for term in _TERM.findall(text.lower()) if term not in FALLBACK_STOPWORDS]
+
+
+def append_varint(out: bytearray, value: int) -> None:
+    """Append ``value`` as an LEB128 varint"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varints(data: bytes) -> np.ndarray:
+    """Decode a run of LEB128 varints in one vectorized pass"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.empty(0, dtype=np.uint64)
+    last = raw < 0x80
+    ends = np.flatnonzero(last)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    group = np.concatenate([[0], np.cumsum(last[:-1])])
+    shifts = ((np.arange(len(raw)) - starts[group]) * 7).astype(np.uint64)
+    return np.add.reduceat((raw & 0x7F).astype(np.uint64) << shifts, starts)
+
+
+def encode_varints(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode non-negative integers as LEB128 varints in one vectorized pass
+
+    Returns the encoded bytes and the encoded length of every value.
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        sizes += values >= np.uint64(1 << shift)
+    starts = np.cumsum(sizes) - sizes
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for i in range(int(sizes.max(initial=0))):
+        has = sizes > i
+        group = (values[has] >> np.uint64(7 * i)) & np.uint64(0x7F)
+        more = (sizes[has] > i + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + i] = (group | more).astype(np.uint8)
+    return out, sizes
+
+
+class _PostingList:
+    """Append-only compressed postings: varint (doc id delta, term frequency) pairs
+
+    ``count`` includes postings of tombstoned documents and ``max_tf`` is an
+    upper bound over all of them.
+    """
+
+    __slots__ = ("data", "count", "last_doc", "max_tf")
+
+    def __init__(self, data: Optional[bytearray] = None, count: int = 0, last_doc: int = -1, max_tf: int = 0):
+        self.data = data if data is not None else bytearray()
+        self.count = count
+        self.last_doc = last_doc
+        self.max_tf = max_tf
+
+    def append(self, doc: int, tf: int) -> None:
+        append_varint(self.data, doc - self.last_doc - 1 if self.count else doc)
+        append_varint(self.data, tf)
+        self.last_doc = doc
+        self.count += 1
+        if tf > self.max_tf:
+            self.max_tf = tf
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = decode_varints(bytes(self.data))
+        gaps = values[0::2].astype(np.int64)
+        gaps[1:] += 1
+        return np.cumsum(gaps), values[1::2].astype(np.float64)
+
+
+class BM25Index:
+    """Incremental BM25 inverted index with compressed posting lists
+
+    Documents get increasing internal IDs, so each term's postings are an
+    append-only byte string of varint-encoded doc-ID gaps and term
+    frequencies. Re-adding or removing a document tombstones its old
+    version; ``maybe_compact`` drops tombstones once they exceed
+    ``compact_threshold`` (``DataManager`` calls it at the end of a streamed
+    ingest). IDF is computed from live document frequencies, so tombstones
+    never skew scores.
+
+    ``search`` prunes with per-term score upper bounds (MaxScore, the
+    term-at-a-time sibling of WAND), so documents that cannot reach the
+    current top-k are never scored against common terms.
+
+    Documents are analyzed with ``analyzer`` unless tokens are given; use
+    the same analyzer that produced ingest tokens (e.g.
+    ``TextProcessor.terms``) so queries match. ``DataManager`` does this for
+    an index left on ``default_analyzer``. The index is loaded from
+    ``index_path`` if present and written back by ``save``.
+    """
+
+    # Postings re-encoded per bulk pass in ``compact``
+    COMPACT_POSTINGS = 1 << 20
+
+    def __init__(
+            self,
+            k1: float = 1.2,
+            b: float = 0.75,
+            analyzer: Callable[[str], List[str]] = default_analyzer,
+            index_path: Optional[Path] = None,
+            compact_threshold: float = 0.25,
+            cache_size: int = 1024
+    ):
+        self.k1 = k1
+        self.b = b
+        self.analyzer = analyzer
+        self.index_path = Path(index_path) if index_path else None
+        self.compact_threshold = compact_threshold
+
+        self._postings: Dict[str, _PostingList] = {}
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._lengths = np.empty(0, dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        self._total_length = 0
+        # Bumped on every tombstone; cached document frequencies are recounted
+        self._removals = 0
+        self._cache_size = cache_size
+        self._decoded: "OrderedDict[str, tuple]" = OrderedDict()
+
+        if self.index_path and self.index_path.exists():
+            self._load(self.index_path)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    @property
+    def uses_default_analyzer(self) -> bool:
+        return self.analyzer is default_analyzer
+
+    @property
+    def average_length(self) -> float:
+        return self._total_length / len(self._rows) if self._rows else 0.0
+
+    def add(self, doc_id: str, tokens: Optional[Sequence[str]] = None, text: Optional[str] = None) -> None:
+        """Index a document from its tokens, or from ``text`` via the analyzer"""
+        if tokens is None:
+            tokens = self.analyzer(text or "")
+        self._remove(doc_id)
+
+        row = len(self._ids)
+        if row == len(self._lengths):
+            size = max(1024, 2 * row)
+            self._lengths = np.concatenate([self._lengths, np.zeros(size - row, dtype=np.int32)])
+            self._alive = np.concatenate([self._alive, np.zeros(size - row, dtype=bool)])
+        self._ids.append(doc_id)
+        self._rows[doc_id] = row
+        self._lengths[row] = len(tokens)
+        self._alive[row] = True
+        self._total_length += len(tokens)
+
+        for term, tf in Counter(tokens).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _PostingList()
+            postings.append(row, tf)
+
+    def remove(self, doc_ids: Iterable[str]) -> int:
+        """Tombstone documents"""
+        return sum(self._remove(doc_id) for doc_id in doc_ids)
+
+    def _remove(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._ids[row] = None
+        self._alive[row] = False
+        self._total_length -= int(self._lengths[row])
+        self._removals += 1
+        return True
+
+    def maybe_compact(self) -> bool:
+        """Compact if tombstones exceed ``compact_threshold``; True if it did"""
+        dead = len(self._ids) - len(self._rows)
+        if self._ids and dead / len(self._ids) > self.compact_threshold:
+            self.compact()
+            return True
+        return False
+
+    def compact(self) -> None:
+        """Drop tombstoned documents and renumber the rest
+
+        Postings are decoded, renumbered and re-encoded in bulk for groups of
+        terms holding about ``COMPACT_POSTINGS`` postings each.
+        """
+        live = self._alive[:len(self._ids)]
+        remap = np.cumsum(live) - 1
+        terms = list(self._postings)
+        counts = np.fromiter((p.count for p in self._postings.values()), dtype=np.int64, count=len(terms))
+        bounds = np.flatnonzero(np.diff(np.cumsum(counts) // self.COMPACT_POSTINGS)) + 1
+        postings = {}
+        for start, end in zip(np.concatenate([[0], bounds]).tolist(), np.concatenate([bounds, [len(terms)]]).tolist()):
+            postings.update(self._compact_terms(terms[start:end], live, remap))
+
+        self._postings = postings
+        self._lengths = self._lengths[:len(self._ids)][live].copy()
+        self._ids = [doc_id for doc_id in self._ids if doc_id is not None]
+        self._alive = np.ones(len(self._ids), dtype=bool)
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._decoded.clear()
+
+    def _compact_terms(self, terms: List[str], live: np.ndarray, remap: np.ndarray) -> Dict[str, _PostingList]:
+        """Re-encoded posting lists of ``terms`` without dead documents"""
+        lists = [self._postings[term] for term in terms]
+        counts = np.array([p.count for p in lists], dtype=np.int64)
+        values = decode_varints(b"".join(p.data for p in lists))
+
+        # Gaps back to document IDs, restarting at every term
+        term_of = np.repeat(np.arange(len(lists)), counts)
+        starts = np.cumsum(counts) - counts
+        steps = values[0::2].astype(np.int64) + 1
+        steps[starts] -= 1
+        totals = np.cumsum(steps)
+        docs = totals - np.repeat(totals[starts] - steps[starts], counts)
+
+        keep = live[docs]
+        docs, tfs, term_of = remap[docs[keep]], values[1::2][keep], term_of[keep]
+        if not len(docs):
+            return {}
+        first = np.ones(len(docs), dtype=bool)
+        first[1:] = term_of[1:] != term_of[:-1]
+        gaps = np.where(first, docs, docs - np.concatenate([[0], docs[:-1]]) - 1)
+
+        pairs = np.empty(2 * len(docs), dtype=np.uint64)
+        pairs[0::2] = gaps
+        pairs[1::2] = tfs
+        data, sizes = encode_varints(pairs)
+        data = data.tobytes()
+        offsets = np.concatenate([[0], np.cumsum(sizes[0::2] + sizes[1::2])])
+
+        heads = np.flatnonzero(first)
+        tails = np.concatenate([heads[1:], [len(docs)]])
+        max_tfs = np.maximum.reduceat(tfs, heads)
+        return {
+            terms[term]: _PostingList(bytearray(data[offsets[head]:offsets[tail]]), tail - head, last, max_tf)
+            for term, head, tail, last, max_tf in zip(
+                term_of[heads].tolist(), heads.tolist(), tails.tolist(),
+                docs[tails - 1].tolist(), max_tfs.tolist()
+            )
+        }
+
+    def _idf(self, df: int) -> float:
+        n = max(len(self._rows), 1)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _decode(self, term: str) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Decoded postings and live document frequency of ``term``
+
+        Postings are cached until the term gets new ones; the document
+        frequency is recounted after tombstones.
+        """
+        postings = self._postings[term]
+        cached = self._decoded.get(term)
+        if cached is not None and cached[0] == postings.count:
+            self._decoded.move_to_end(term)
+            _, docs, tfs, removals, df = cached
+            if removals == self._removals:
+                return docs, tfs, df
+        else:
+            docs, tfs = postings.decode()
+        df = len(docs) if len(self._rows) == len(self._ids) else int(np.count_nonzero(self._alive[docs]))
+        self._decoded[term] = (postings.count, docs, tfs, self._removals, df)
+        if len(self._decoded) > self._cache_size:
+            self._decoded.popitem(last=False)
+        return docs, tfs, df
+
+    def _query_terms(self, query) -> List[str]:
+        terms = self.analyzer(query) if isinstance(query, str) else list(query)
+        return [term for term in dict.fromkeys(terms) if term in self._postings]
+
+    def _upper_bound(self, postings: _PostingList, idf: float) -> float:
+        """Highest score a single term can contribute: max_tf in a zero-length document"""
+        return idf * (self.k1 + 1.0) * postings.max_tf / (postings.max_tf + self.k1 * (1.0 - self.b))
+
+    def _scores(self, tfs: np.ndarray, docs: np.ndarray, idf: float) -> np.ndarray:
+        norm = self.k1 * (1.0 - self.b + self.b * self._lengths[docs] / max(self.average_length, 1e-9))
+        return idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+    def search(self, query, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-``k`` ``(doc_id, score)`` for a query string or term list
+
+        Terms are scored rarest-bound-first into a candidate set. Once the
+        k-th best partial score exceeds the summed upper bounds of the
+        remaining terms, no unseen document can reach the top-k: from then
+        on only existing candidates are looked up in the remaining (usually
+        long, common-term) posting lists, and candidates that cannot catch
+        up are dropped.
+        """
+        terms = []
+        for term in self._query_terms(query):
+            docs, tfs, df = self._decode(term)
+            if not df:
+                continue
+            idf = self._idf(df)
+            terms.append((self._upper_bound(self._postings[term], idf), idf, term, docs, tfs))
+        terms.sort(key=lambda entry: (entry[0], entry[2]), reverse=True)
+        remaining = [sum(entry[0] for entry in terms[i:]) for i in range(len(terms))]
+
+        # Accumulate in a dense array, tracking which documents were touched
+        accumulator = np.zeros(len(self._ids), dtype=np.float64)
+        seen = np.zeros(len(self._ids), dtype=bool)
+        candidates = np.empty(0, dtype=np.int64)
+        scores = None
+        for i, (_, idf, _, docs, tfs) in enumerate(terms):
+            if scores is None:
+                threshold = self._kth_score(accumulator[candidates[self._alive[candidates]]], k)
+                if threshold <= remaining[i]:
+                    # Postings of a term hold distinct documents, so fancy-index += is exact
+                    accumulator[docs] += self._scores(tfs, docs, idf)
+                    unseen = docs[~seen[docs]]
+                    seen[unseen] = True
+                    candidates = np.concatenate([candidates, unseen])
+                    continue
+                scores = accumulator[candidates]
+            else:
+                threshold = self._kth_score(scores[self._alive[candidates]], k)
+
+            # Unseen documents are out of reach; look up existing candidates only
+            positions = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+            hit = docs[positions] == candidates
+            scores[hit] += self._scores(tfs[positions[hit]], candidates[hit], idf)
+            if i + 1 < len(terms):
+                keep = scores + remaining[i + 1] >= threshold
+                candidates, scores = candidates[keep], scores[keep]
+
+        if scores is None:
+            scores = accumulator[candidates]
+        live = self._alive[candidates]
+        candidates, scores = candidates[live], scores[live]
+        # Best score first, earlier documents first among ties
+        top = np.lexsort((candidates, -scores))[:k]
+        return [(self._ids[row], float(score)) for row, score in zip(candidates[top].tolist(), scores[top].tolist())]
+
+    @staticmethod
+    def _kth_score(scores: np.ndarray, k: int) -> float:
+        """k-th best of ``scores``, or -1 when there are fewer than ``k``"""
+        if len(scores) < k:
+            return -1.0
+        return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+    def search_exhaustive(self, query, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-``k`` by scoring every posting; reference for ``search``"""
+        scores = np.zeros(len(self._ids), dtype=np.float64)
+        for term in self._query_terms(query):
+            docs, tfs, df = self._decode(term)
+            np.add.at(scores, docs, self._scores(tfs, docs, self._idf(df)))
+
+        live = np.flatnonzero((scores > 0) & self._alive[:len(self._ids)])
+        top = live[np.argsort(-scores[live], kind="stable")[:k]]
+        return [(self._ids[row], float(scores[row])) for row in top]
+
+    def save(self, path: Optional[Path] = None) -> None:
+        path = Path(path) if path else self.index_path
+        if path is None:
+            raise ValueError("No index path configured")
+
+        terms = list(self._postings)
+        lists = [self._postings[term] for term in terms]
+        tmp_path = Path(f"{path}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                params=np.array([self.k1, self.b]),
+                terms=np.array(terms, dtype=np.str_),
+                offsets=np.concatenate([[0], np.cumsum([len(p.data) for p in lists], dtype=np.int64)]),
+                postings=np.frombuffer(b"".join(bytes(p.data) for p in lists), dtype=np.uint8),
+                stats=np.array([[p.count, p.last_doc, p.max_tf] for p in lists], dtype=np.int64).reshape(-1, 3),
+                ids=np.array([doc_id or "" for doc_id in self._ids], dtype=np.str_),
+                alive=self._alive[:len(self._ids)],
+                lengths=self._lengths[:len(self._ids)]
+            )
+        os.replace(tmp_path, path)
+
+    def _load(self, path: Path) -> None:
+        with np.load(path) as data:
+            self.k1, self.b = (float(x) for x in data["params"])
+            offsets = data["offsets"]
+            postings = data["postings"].tobytes()
+            self._postings = {
+                term: _PostingList(bytearray(postings[offsets[i]:offsets[i + 1]]), int(count), int(last), int(max_tf))
+                for i, (term, (count, last, max_tf)) in enumerate(zip(data["terms"].tolist(), data["stats"]))
+            }
+            self._ids = [
+                doc_id if alive else None
+                for doc_id, alive in zip(data["ids"].tolist(), data["alive"].tolist())
+            ]
+            self._lengths = data["lengths"].astype(np.int32)
+            self._alive = data["alive"].copy()
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids) if doc_id is not None}
+        self._total_length = int(sum(int(self._lengths[row]) for row in self._rows.values()))
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked ID lists: each ID scores ``sum(1 / (k + rank))``"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever:
+    """Combine BM25 and dense vector retrieval with reciprocal rank fusion
+
+    Each retriever contributes its top ``candidates`` documents; the fused
+    top-k are loaded from the document store in one round-trip.
+    """
+
+    def __init__(
+            self,
+            manager: DataManager,
+            lexical_index: BM25Index,
+            engine,
+            candidates: int = 50,
+            rrf_k: int = 60
+    ):
+        self.manager = manager
+        self.lexical_index = lexical_index
+        self.engine = engine
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    async def search(
+            self,
+            query: str,
+            k: int = 5,
+            query_embedding: Optional[np.ndarray] = None
+    ) -> List[Document]:
+        """Documents for ``query``, with fused and per-retriever ranks in metadata
+
+        ``query_embedding`` skips embedding the query when the caller has it.
+        """
+        lexical = [doc_id for doc_id, _ in self.lexical_index.search(query, self.candidates)]
+        if query_embedding is None:
+            query_embedding = (await self.engine.embed([query]))[0]
+        dense = [doc_id for doc_id, _ in await self.manager.rank_similar(query_embedding, self.candidates)]
+
+        fused = reciprocal_rank_fusion([lexical, dense], self.rrf_k)[:k]
+        if not fused:
+            return []
+        lexical_ranks = {doc_id: rank for rank, doc_id in enumerate(lexical, start=1)}
+        dense_ranks = {doc_id: rank for rank, doc_id in enumerate(dense, start=1)}
+
+        documents = await self.manager.document_store.load_many([doc_id for doc_id, _ in fused])
+        results = []
+        for (doc_id, score), document in zip(fused, documents):
+            if document:
+                document.metadata['fusion_score'] = score
+                document.metadata['lexical_rank'] = lexical_ranks.get(doc_id)
+                document.metadata['vector_rank'] = dense_ranks.get(doc_id)
+                results.append(document)
+        return results
@@ -0,0 +1,3 @@
+from .embeddings import EmbeddingCache, EmbeddingEngine, EmbeddingModel, HashingEmbedder
+from .pipeline import PreprocessingPipeline
+from .splitter import TextSplitter, chunk_text, chunk_texts
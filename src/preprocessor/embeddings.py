@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-normalized text, so formatting-only changes hit the cache"""
+    return " ".join(text.split())
+
+
+class EmbeddingModel(ABC):
+    """Pluggable embedding model
+
+    ``embed`` is synchronous and CPU/GPU bound; the engine calls it off the
+    event loop. Batches passed to it are grouped by ``length``.
+    """
+
+    model_id: str
+    dimension: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed ``texts`` into a ``(len(texts), dimension)`` float32 matrix"""
+        pass
+
+    def length(self, text: str) -> int:
+        """Approximate token count, used to group texts of similar length"""
+        return len(text.split())
+
+
+class HashingEmbedder(EmbeddingModel):
+    """Deterministic, CPU-only feature-hashing embedder
+
+    Word unigrams and bigrams are hashed (CRC32) into ``dimension`` signed
+    buckets and the result is L2-normalized. Not semantic, but stable across
+    processes and runs, which makes it suitable for offline tests and
+    benchmarks of the pipeline.
+    """
+
+    def __init__(self, dimension: int = 768):
+        self.dimension = dimension
+        self.model_id = f"hashing-v1-{dimension}"
+
+    def _features(self, text: str) -> np.ndarray:
+        tokens = _TOKEN.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return np.fromiter(
+            (zlib.crc32(gram.encode("utf8")) for gram in grams), dtype=np.uint32, count=len(grams)
+        )
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = self._features(text)
+            if len(hashes) == 0:
+                matrix[row, 0] = 1.0
+                continue
+            signs = np.where(hashes & 1, 1.0, -1.0).astype(np.float32)
+            matrix[row] = np.bincount(
+                (hashes >> 1) % self.dimension, weights=signs, minlength=self.dimension
+            )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # Rows whose signed counts cancel out fall back to a fixed unit vector
+        cancelled = norms[:, 0] == 0
+        matrix[cancelled, 0] = 1.0
+        norms[cancelled] = 1.0
+        matrix /= norms
+        return matrix
+
+
+class EmbeddingCache:
+    """Persistent, content-addressed embedding cache with LRU eviction
+
+    Vectors are stored in SQLite keyed by ``sha256(model_id, normalized text)``.
+    Every read refreshes an entry's ``last_used`` stamp; once the cache holds
+    more than ``max_entries`` vectors the least recently used are deleted.
+    ``path=None`` keeps the cache in memory. Methods may be called from
+    executor threads; access to the connection is serialized.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 1_000_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path) if path else ":memory:", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def key(model_id: str, text: str) -> bytes:
+        return hashlib.sha256(f"{model_id}\0{normalize_text(text)}".encode("utf8")).digest()
+
+    def get_many(self, keys: Sequence[bytes], chunk_size: int = 500) -> Dict[bytes, np.ndarray]:
+        """Cached vectors for ``keys``; misses are absent from the result"""
+        with self._lock:
+            return self._get_many(keys, chunk_size)
+
+    def _get_many(self, keys: Sequence[bytes], chunk_size: int) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), chunk_size):
+            chunk = unique[i:i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, vector in rows:
+                found[key] = np.frombuffer(vector, dtype=np.float32)
+            if rows:
+                self._db.execute(
+                    f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                    [time.time_ns(), *(key for key, _ in rows)]
+                )
+        self._db.commit()
+        return found
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """Store vectors, then evict least recently used entries beyond ``max_entries``"""
+        with self._lock:
+            self._put_many(keys, vectors)
+
+    def _put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        now = time.time_ns()
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            [
+                (key, np.ascontiguousarray(vector, dtype=np.float32).tobytes(), now)
+                for key, vector in zip(keys, vectors)
+            ]
+        )
+        self._count += self._db.total_changes - before
+
+        excess = self._count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self._count -= excess
+        self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class EmbeddingEngine:
+    """Batched embedding of chunks from many documents at once
+
+    Texts already in the cache are not embedded again, and duplicates within
+    a call are embedded once. The rest are sorted by length and embedded in
+    batches of ``batch_size`` (less padding for transformer models). Model
+    calls and cache I/O run off the event loop; each batch is embedded and
+    written to the cache in one executor call. Results come back as one
+    contiguous float32 matrix in input order.
+    """
+
+    def __init__(
+            self,
+            model: EmbeddingModel,
+            cache: Optional[EmbeddingCache] = None,
+            batch_size: int = 64
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.cache_hits = 0
+        self.embedded = 0
+
+    @property
+    def dimension(self) -> int:
+        return self.model.dimension
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed ``texts`` into a ``(len(texts), dimension)`` float32 matrix"""
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+        if not texts:
+            return matrix
+
+        loop = asyncio.get_running_loop()
+        keys = [EmbeddingCache.key(self.model.model_id, text) for text in texts]
+        cached = await loop.run_in_executor(None, self.cache.get_many, keys) if self.cache is not None else {}
+
+        # Rows sharing a key need a single model call
+        pending: Dict[bytes, List[int]] = {}
+        for row, key in enumerate(keys):
+            vector = cached.get(key)
+            if vector is not None:
+                matrix[row] = vector
+                self.cache_hits += 1
+            else:
+                pending.setdefault(key, []).append(row)
+
+        missing = sorted(pending, key=lambda key: self.model.length(texts[pending[key][0]]))
+        for i in range(0, len(missing), self.batch_size):
+            batch_keys = missing[i:i + self.batch_size]
+            batch_texts = [texts[pending[key][0]] for key in batch_keys]
+            vectors = await loop.run_in_executor(None, self._embed_batch, batch_keys, batch_texts)
+            for key, vector in zip(batch_keys, vectors):
+                matrix[pending[key]] = vector
+            self.embedded += len(batch_keys)
+
+        return matrix
+
+    def _embed_batch(self, keys: List[bytes], texts: List[str]) -> np.ndarray:
+        """Embed one batch and cache its vectors (runs in an executor thread)"""
+        vectors = self.model.embed(texts)
+        if self.cache is not None:
+            self.cache.put_many(keys, vectors)
+        return vectors
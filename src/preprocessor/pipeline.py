@@ -0,0 +1,64 @@
+from typing import Callable, List, Optional, Tuple
+
+from ..data.loaders.base_loader import Document
+from ..data.processors import ProcessorChain
+from .embeddings import EmbeddingEngine
+
+Span = Tuple[int, int]
+
+
+class PreprocessingPipeline:
+    """Chunk documents and embed all their chunks in one engine call
+
+    Produces ``metadata['preprocessing_results']`` with ``embeddings`` (one
+    row per chunk, views into the batch matrix) and ``chunk_offsets``
+    (``(start, end)`` character spans into the content), as consumed by
+    ``DataManager``. Without a ``splitter`` each document is a single chunk.
+
+    A ``processor_chain`` (e.g. a ``TextProcessor`` emitting tokens for the
+    lexical index) runs on the batch before chunking; its processors must
+    not drop documents.
+    """
+
+    def __init__(
+            self,
+            engine: EmbeddingEngine,
+            splitter: Optional[Callable[[str], List[Span]]] = None,
+            processor_chain: Optional[ProcessorChain] = None
+    ):
+        self.engine = engine
+        self.splitter = splitter
+        self.processor_chain = processor_chain
+
+    def _spans(self, document: Document) -> List[Span]:
+        if self.splitter is None:
+            return [(0, len(document.content))]
+        return list(self.splitter(document.content))
+
+    async def preprocess(self, document: Document) -> Document:
+        """Chunk and embed a single document"""
+        return (await self.preprocess_batch([document]))[0]
+
+    async def preprocess_batch(self, documents: List[Document]) -> List[Document]:
+        """Chunk and embed documents, batching chunks across documents"""
+        if self.processor_chain is not None:
+            documents = await self.processor_chain.process_batch(documents)
+        spans = [self._spans(document) for document in documents]
+        texts = [
+            document.content[start:end]
+            for document, doc_spans in zip(documents, spans)
+            for start, end in doc_spans
+        ]
+        matrix = await self.engine.embed(texts)
+
+        row = 0
+        for document, doc_spans in zip(documents, spans):
+            document.metadata = {
+                **document.metadata,
+                'preprocessing_results': {
+                    'embeddings': matrix[row:row + len(doc_spans)],
+                    'chunk_offsets': doc_spans
+                }
+            }
+            row += len(doc_spans)
+        return documents
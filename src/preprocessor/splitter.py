@@ -0,0 +1,162 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from ..data.loaders.base_loader import Document
+from ..data.processors.scientific_processor import ScientificProcessor
+
+Span = Tuple[int, int]
+
+_TOKEN = re.compile(r'\S+')
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s|$)')
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+
+
+def chunk_text(text: str, span: Span) -> str:
+    """Rebuild a chunk from its parent text"""
+    start, end = span
+    return text[start:end]
+
+
+def chunk_texts(document: Document) -> Iterator[str]:
+    """Rebuild the chunks of a stored document from its ``chunk_offsets``"""
+    offsets = document.metadata.get('preprocessing_results', {}).get('chunk_offsets') or []
+    for span in offsets:
+        yield chunk_text(document.content, span)
+
+
+class TextSplitter:
+    """Split text into overlapping ``(start, end)`` character spans
+
+    Only offsets are produced; no substrings are built while splitting.
+    Token, sentence and paragraph offsets of the whole text are collected
+    up front (memory grows with the text), then spans are yielded one at a
+    time. ``chunk_size`` and ``chunk_overlap`` count characters or
+    whitespace-separated tokens depending on ``unit``. Chunks never cut
+    through a token and prefer to end at a paragraph break, then at a
+    sentence end, within their second half. Section headers found by
+    ``ScientificProcessor`` are hard boundaries: no chunk spans two
+    sections, and a chunk starting a section carries no overlap.
+    """
+
+    UNITS = ('chars', 'tokens')
+
+    def __init__(
+            self,
+            chunk_size: int = 1000,
+            chunk_overlap: int = 100,
+            unit: str = 'chars',
+            respect_sections: bool = True,
+            section_processor: Optional[ScientificProcessor] = None
+    ):
+        if unit not in self.UNITS:
+            raise ValueError(f"Unknown unit: {unit}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be in [0, chunk_size)")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.unit = unit
+        self.respect_sections = respect_sections
+        self.section_processor = section_processor or ScientificProcessor()
+
+    def __call__(self, text: str) -> Iterator[Span]:
+        return self.split(text)
+
+    def _section_boundaries(self, text: str) -> List[int]:
+        if not self.respect_sections:
+            return []
+        spans = self.section_processor.section_spans(text)
+        return sorted({offset for header_start, _, body_end in spans.values() for offset in (header_start, body_end)})
+
+    def split(self, text: str) -> Iterator[Span]:
+        """Yield chunk spans covering every token of ``text``
+
+        The text is scanned once for token and break offsets before the
+        first span is yielded.
+        """
+        tokens = [match.span() for match in _TOKEN.finditer(text)]
+        if not tokens:
+            return
+        starts = [start for start, _ in tokens]
+        ends = [end for _, end in tokens]
+        sentence_ends = [match.end() for match in _SENTENCE_END.finditer(text)]
+        paragraph_breaks = [match.start() for match in _PARAGRAPH_BREAK.finditer(text)]
+        hard = self._section_boundaries(text)
+
+        i = 0
+        while i < len(tokens):
+            start = starts[i]
+            j = self._last_token(i, starts, ends)
+            end, at_boundary = self._break(i, j, starts, ends, hard, paragraph_breaks, sentence_ends)
+            yield start, end
+
+            next_i = bisect_left(starts, end)
+            if next_i >= len(tokens):
+                return
+            if at_boundary or not self.chunk_overlap:
+                i = next_i
+                continue
+            i = max(i + 1, self._overlap_start(next_i, end, starts, sentence_ends))
+
+    def _last_token(self, i: int, starts: Sequence[int], ends: Sequence[int]) -> int:
+        """Index of the last token that fits in a chunk starting at token ``i``"""
+        if self.unit == 'tokens':
+            return min(i + self.chunk_size, len(ends)) - 1
+        return max(i, bisect_right(ends, starts[i] + self.chunk_size) - 1)
+
+    def _break(
+            self,
+            i: int,
+            j: int,
+            starts: Sequence[int],
+            ends: Sequence[int],
+            hard: Sequence[int],
+            paragraph_breaks: Sequence[int],
+            sentence_ends: Sequence[int]
+    ) -> Tuple[int, bool]:
+        """End offset of the chunk spanning tokens ``i..j``, and whether it ends at a section boundary"""
+        start, max_end = starts[i], ends[j]
+
+        # A section boundary inside the chunk ends it right there
+        boundary = bisect_right(hard, start)
+        if boundary < len(hard) and hard[boundary] < max_end:
+            last = bisect_right(ends, hard[boundary]) - 1
+            if last >= i:
+                return ends[last], True
+
+        if j == len(ends) - 1:
+            return max_end, False
+
+        # Otherwise prefer a paragraph break, then a sentence end, in the second half
+        middle = ends[(i + j) // 2]
+        for breaks in (paragraph_breaks, sentence_ends):
+            k = bisect_right(breaks, max_end) - 1
+            if k >= 0 and breaks[k] > middle:
+                last = bisect_right(ends, breaks[k]) - 1
+                return ends[last], False
+        return max_end, False
+
+    def _overlap_start(
+            self,
+            next_i: int,
+            end: int,
+            starts: Sequence[int],
+            sentence_ends: Sequence[int]
+    ) -> int:
+        """Token where the next chunk starts, ``chunk_overlap`` units before ``end``
+
+        A sentence start inside the overlap window is preferred.
+        """
+        if self.unit == 'tokens':
+            k = max(0, next_i - self.chunk_overlap)
+        else:
+            k = bisect_left(starts, end - self.chunk_overlap)
+
+        sentence = bisect_left(sentence_ends, starts[k])
+        if sentence < len(sentence_ends) and sentence_ends[sentence] < end:
+            aligned = bisect_left(starts, sentence_ends[sentence])
+            if aligned < next_i:
+                return aligned
+        return k
@@ -0,0 +1,2 @@
+class ResourceUnavailableError(RuntimeError):
+    """A required data resource is missing and may not be downloaded"""
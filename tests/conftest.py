@@ -1,4 +1,6 @@
-﻿import pytest
+﻿import json
+
+import pytest
 import numpy as np
 from src.data.loaders import Document
 
@@ -14,3 +16,110 @@ def sample_document():
 def sample_embedding():
     embedding = np.random.randn(768)
     return embedding / np.linalg.norm(embedding)
+
+
+def make_arxiv_entry(i, **overrides):
+    entry = {
+        "id": f"0704.{i:04d}",
+        "submitter": "Test Submitter",
+        "authors": "A. Author and B. Author",
+        "title": f"Paper {i}",
+        "comments": None,
+        "journal-ref": None,
+        "doi": None,
+        "report-no": None,
+        "categories": "cs.CL cs.LG",
+        "license": None,
+        "abstract": f"Abstract of paper number {i}.",
+        "update_date": "2008-11-13"
+    }
+    entry.update(overrides)
+    return entry
+
+
+@pytest.fixture
+def arxiv_data_dir(tmp_path):
+    path = tmp_path / "arxiv-metadata-oai-snapshot.json"
+    with open(path, "w", encoding="utf8") as f:
+        for i in range(25):
+            f.write(json.dumps(make_arxiv_entry(i)) + "\n")
+    return tmp_path
+
+
+class FakeIngest:
+    """In-memory stand-in for the stores during streamed ingest
+
+    ``process_batch`` replaces ``DataManager.process_batch``: it records each
+    window, fails the IDs in ``failing`` and raises once ``crash_at``
+    documents have been processed. With ``passthrough`` windows are handed
+    on to the real ``process_batch`` instead. The document store methods
+    used by incremental runs keep content hashes in ``stored``.
+    """
+
+    def __init__(self):
+        self.windows = []
+        self.stored = {}
+        self.seen = {}
+        self.deleted = []
+        self.failing = set()
+        self.crash_at = None
+        self._process_batch = None
+
+    @property
+    def processed(self):
+        return [doc_id for window in self.windows for doc_id in window]
+
+    def install(self, manager, passthrough=False):
+        self._process_batch = manager.process_batch if passthrough else None
+        manager.process_batch = self.process_batch
+        manager.document_store.load_content_hashes = self.load_content_hashes
+        manager.document_store.mark_seen = self.mark_seen
+        manager.document_store.iter_stale_ids = self.iter_stale_ids
+        manager.document_store.delete_many = self.delete_many
+        return manager
+
+    async def process_batch(self, documents, batch_size=100):
+        if self.crash_at is not None and len(self.processed) >= self.crash_at:
+            raise RuntimeError("interrupted")
+        self.windows.append([d.id for d in documents])
+        if self._process_batch is not None:
+            return await self._process_batch(documents, batch_size=batch_size)
+        ok = [d for d in documents if d.id not in self.failing]
+        for document in ok:
+            self.stored[document.id] = document.metadata.get('content_hash')
+        return {
+            'successful': [d.id for d in ok],
+            'failed': [d.id for d in documents if d.id in self.failing],
+            'total': len(documents)
+        }
+
+    async def load_content_hashes(self, ids):
+        return {i: self.stored[i] for i in ids if i in self.stored}
+
+    async def mark_seen(self, ids, run_id):
+        self.seen.update(dict.fromkeys(ids, run_id))
+        return len(ids)
+
+    async def iter_stale_ids(self, run_id):
+        stale = [doc_id for doc_id in self.stored if self.seen.get(doc_id) != run_id]
+        if stale:
+            yield stale
+
+    async def delete_many(self, ids):
+        for doc_id in ids:
+            del self.stored[doc_id]
+        self.deleted.extend(ids)
+        return len(ids)
+
+
+@pytest.fixture
+def fake_ingest():
+    return FakeIngest()
+
+
+def rewrite_arxiv_entries(path, edit):
+    """Apply ``edit`` to the list of entries of an arXiv snapshot file"""
+    entries = [json.loads(line) for line in open(path, encoding="utf8")]
+    edit(entries)
+    with open(path, "w", encoding="utf8") as f:
+        f.writelines(json.dumps(entry) + "\n" for entry in entries)
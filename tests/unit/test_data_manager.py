@@ -1,19 +1,30 @@
-﻿import pytest
+﻿import asyncio
+
+import pytest
 import numpy as np
 from unittest.mock import Mock, AsyncMock
 
-from src.data.loaders import Document
+from src.data.checkpoint import IngestCheckpoint
+from src.data.loaders import ArxivLoader, Document
 from src.data.manager import DataManager
+from src.data.processors import DedupProcessor, ProcessorChain, TextProcessor
 from src.data.validators import ValidationResult
+from src.inference.retriever import BM25Index
+from src.preprocessor import EmbeddingEngine, HashingEmbedder, PreprocessingPipeline
+from tests.conftest import rewrite_arxiv_entries
 
 @pytest.fixture
-async def mock_stores():
+def mock_stores():
     document_store = Mock()
     document_store.save = AsyncMock()
+    document_store.save_many = AsyncMock(side_effect=lambda documents: [True] * len(documents))
     document_store.load = AsyncMock()
+    document_store.load_many = AsyncMock()
     
     vector_store = Mock()
     vector_store.save = AsyncMock()
+    vector_store.save_many = AsyncMock(return_value=True)
+    vector_store.trim_documents = AsyncMock(return_value=True)
     vector_store.search = AsyncMock()
     
     return document_store, vector_store
@@ -21,5 +32,350 @@ async def mock_stores():
 class TestDataManager:
     @pytest.mark.asyncio
     async def test_process_document(self, mock_stores):
-        # Your test implementation here
-        pass
+        document_store, vector_store = mock_stores
+        manager = DataManager(document_store, vector_store)
+
+        stored = await manager.process_document(Document(id="a", content="Some document content", metadata={}))
+        rejected = await manager.process_document(Document(id="b", content="", metadata={}))
+
+        assert stored.id == "a" and rejected is None
+        saved = [d.id for call in document_store.save_many.await_args_list for d in call.args[0]]
+        assert saved == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_load_and_process_stream(self, mock_stores, arxiv_data_dir, fake_ingest):
+        document_store, vector_store = mock_stores
+        manager = fake_ingest.install(
+            DataManager(document_store, vector_store, loader=ArxivLoader(str(arxiv_data_dir)))
+        )
+
+        summary = await manager.load_and_process_stream(window_size=10)
+
+        assert [len(window) for window in fake_ingest.windows] == [10, 10, 5]
+        assert summary == {'successful': 25, 'failed': 0, 'total': 25, 'windows': 3}
+
+    @pytest.mark.asyncio
+    async def test_load_and_process_stream_resumes_from_checkpoint(
+            self, mock_stores, arxiv_data_dir, tmp_path, fake_ingest
+    ):
+        document_store, vector_store = mock_stores
+        manager = fake_ingest.install(
+            DataManager(document_store, vector_store, loader=ArxivLoader(str(arxiv_data_dir)))
+        )
+        checkpoint_path = tmp_path / "ingest.json"
+        fake_ingest.crash_at = 20
+
+        with pytest.raises(RuntimeError):
+            await manager.load_and_process_stream(window_size=10, checkpoint_path=checkpoint_path)
+        assert IngestCheckpoint.load(checkpoint_path).offset == 20
+
+        fake_ingest.crash_at = None
+        summary = await manager.load_and_process_stream(window_size=10, checkpoint_path=checkpoint_path)
+
+        assert fake_ingest.processed[20:] == [f"0704.{i:04d}" for i in range(20, 25)]
+        assert summary['total'] == 5
+        checkpoint = IngestCheckpoint.load(checkpoint_path)
+        assert checkpoint.completed and checkpoint.successful == 25
+
+    @pytest.mark.asyncio
+    async def test_resumed_stream_keeps_indexes_of_committed_windows(
+            self, mock_stores, arxiv_data_dir, tmp_path, fake_ingest
+    ):
+        document_store, vector_store = mock_stores
+        loader = ArxivLoader(str(arxiv_data_dir))
+        checkpoint_path = tmp_path / "ingest.json"
+
+        def restart():
+            manager = DataManager(
+                document_store, vector_store, loader=loader,
+                deduplicator=DedupProcessor(index_path=tmp_path / "dedup.npz"),
+                lexical_index=BM25Index(index_path=tmp_path / "bm25.npz")
+            )
+            return fake_ingest.install(manager, passthrough=True)
+
+        fake_ingest.crash_at = 10
+        with pytest.raises(RuntimeError):
+            await restart().load_and_process_stream(window_size=10, checkpoint_path=checkpoint_path)
+        assert IngestCheckpoint.load(checkpoint_path).offset == 10
+
+        fake_ingest.crash_at = None
+        manager = restart()
+        window_one = [f"0704.{i:04d}" for i in range(10)]
+        assert all(doc_id in manager.deduplicator.index for doc_id in window_one)
+        assert all(doc_id in manager.lexical_index for doc_id in window_one)
+
+        summary = await manager.load_and_process_stream(window_size=10, checkpoint_path=checkpoint_path)
+
+        assert summary['total'] == 15 and summary['skipped'] == 0
+        resumed = restart()
+        assert all(f"0704.{i:04d}" in resumed.deduplicator.index for i in range(25))
+        assert len(resumed.lexical_index) == 25
+        assert [doc_id for doc_id, _ in resumed.lexical_index.search("number 3", k=1)] == ["0704.0003"]
+
+    @pytest.mark.asyncio
+    async def test_incremental_ingest_skips_unchanged_and_deletes_missing(
+            self, mock_stores, arxiv_data_dir, fake_ingest
+    ):
+        document_store, vector_store = mock_stores
+        vector_store.delete_documents = AsyncMock(return_value=True)
+        loader = ArxivLoader(str(arxiv_data_dir))
+        manager = fake_ingest.install(DataManager(document_store, vector_store, loader=loader))
+
+        first = await manager.load_and_process_stream(window_size=10, incremental=True)
+        assert first['successful'] == 25 and first['unchanged'] == 0
+
+        def change_one_remove_one(entries):
+            entries[3]['abstract'] = "A revised abstract."
+            del entries[7]
+
+        rewrite_arxiv_entries(loader.file_path, change_one_remove_one)
+        second = await manager.load_and_process_stream(window_size=10, incremental=True)
+
+        assert second['successful'] == 1 and second['unchanged'] == 23
+        assert second['deleted'] == 1
+        assert fake_ingest.deleted == ["0704.0007"]
+        deleted_vectors = [call.args[0] for call in vector_store.delete_documents.await_args_list]
+        assert deleted_vectors == [["0704.0007"]]
+
+    @pytest.mark.asyncio
+    async def test_incremental_ingest_keeps_documents_that_fail(self, mock_stores, arxiv_data_dir, fake_ingest):
+        document_store, vector_store = mock_stores
+        vector_store.delete_documents = AsyncMock(return_value=True)
+        loader = ArxivLoader(str(arxiv_data_dir))
+        manager = fake_ingest.install(DataManager(document_store, vector_store, loader=loader))
+        await manager.load_and_process_stream(window_size=10, incremental=True)
+        first_hash = fake_ingest.stored["0704.0003"]
+
+        # The changed entry fails to reprocess on the second run
+        rewrite_arxiv_entries(loader.file_path, lambda entries: entries[3].update(abstract="A revised abstract."))
+        fake_ingest.failing.add("0704.0003")
+        second = await manager.load_and_process_stream(window_size=10, incremental=True)
+
+        assert second['failed'] == 1 and second['deleted'] == 0
+        assert fake_ingest.stored["0704.0003"] == first_hash
+        assert fake_ingest.deleted == []
+        vector_store.delete_documents.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_process_batch_pipeline(self, mock_stores):
+        document_store, vector_store = mock_stores
+        manager = DataManager(document_store, vector_store, concurrency=4)
+        documents = [
+            Document(id=f"doc_{i}", content="Some document content", metadata={"source": "test"})
+            for i in range(20)
+        ]
+        documents.append(Document(id="empty", content="", metadata={}))
+
+        results = await manager.process_batch(documents, batch_size=5)
+
+        assert sorted(results['successful']) == sorted(d.id for d in documents[:20])
+        assert results['failed'] == ["empty"]
+        assert results['stage_stats']['validate']['failed'] == 1
+        assert results['stage_stats']['store']['processed'] == 20
+        assert sum(len(call.args[0]) for call in document_store.save_many.await_args_list) == 20
+
+    @pytest.mark.asyncio
+    async def test_process_batch_bounds_in_flight_documents(self, mock_stores):
+        document_store, vector_store = mock_stores
+        in_flight = 0
+        peak = 0
+
+        async def slow_save_many(documents):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [True] * len(documents)
+
+        document_store.save_many.side_effect = slow_save_many
+        manager = DataManager(document_store, vector_store, concurrency=3)
+        documents = [
+            Document(id=f"doc_{i}", content="Some document content", metadata={"source": "test"})
+            for i in range(12)
+        ]
+
+        results = await manager.process_batch(documents, batch_size=1)
+
+        assert len(results['successful']) == 12
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode, stored", [('skip', 2), ('link', 3)])
+    async def test_process_batch_deduplicates(self, mock_stores, mode, stored):
+        document_store, vector_store = mock_stores
+        manager = DataManager(
+            document_store, vector_store, concurrency=1, deduplicator=DedupProcessor(mode=mode)
+        )
+        content = "near duplicate abstracts of the same paper appear as several arxiv versions"
+        documents = [
+            Document(id="a", content=content, metadata={}),
+            Document(id="b", content=content, metadata={}),
+            Document(id="c", content="an unrelated abstract about something else entirely", metadata={}),
+        ]
+
+        results = await manager.process_batch(documents)
+
+        assert results['skipped'] == (["b"] if mode == 'skip' else [])
+        assert sum(len(call.args[0]) for call in document_store.save_many.await_args_list) == stored
+
+    @pytest.mark.asyncio
+    async def test_failed_canonical_leaves_dedup_index(self, mock_stores):
+        document_store, vector_store = mock_stores
+        document_store.save_many.side_effect = lambda documents: [d.id != "a" for d in documents]
+        deduplicator = DedupProcessor(mode='skip')
+        manager = DataManager(document_store, vector_store, concurrency=1, deduplicator=deduplicator)
+        content = "near duplicate abstracts of the same paper appear as several arxiv versions"
+
+        first = await manager.process_batch([Document(id="a", content=content, metadata={})])
+        second = await manager.process_batch([Document(id="b", content=content, metadata={})])
+
+        assert first['failed'] == ["a"] and "a" not in deduplicator.index
+        assert second['successful'] == ["b"] and second['skipped'] == []
+
+    @pytest.mark.asyncio
+    async def test_process_batch_builds_lexical_index(self, mock_stores):
+        document_store, vector_store = mock_stores
+        lexical_index = BM25Index()
+        pipeline = PreprocessingPipeline(
+            EmbeddingEngine(HashingEmbedder()),
+            processor_chain=ProcessorChain([TextProcessor(offline=True, emit_tokens=True)])
+        )
+        manager = DataManager(
+            document_store, vector_store, preprocessing_pipeline=pipeline, lexical_index=lexical_index
+        )
+        documents = [
+            Document(id="a", content="Dark matter halos of dwarf galaxies.", metadata={}),
+            Document(id="b", content="Protein folding with molecular dynamics (hep-th).", metadata={}),
+        ]
+
+        results = await manager.process_batch(documents)
+
+        assert sorted(results['successful']) == ["a", "b"]
+        saved = [d for call in document_store.save_many.await_args_list for d in call.args[0]]
+        assert all('tokens' not in d.metadata for d in saved)
+        assert [doc_id for doc_id, _ in lexical_index.search("dwarf galaxies")] == ["a"]
+        assert [doc_id for doc_id, _ in lexical_index.search("hep-th")] == ["b"]
+
+        async def stale_ids(run_id):
+            yield ["a"]
+
+        document_store.iter_stale_ids = stale_ids
+        document_store.delete_many = AsyncMock(return_value=1)
+        vector_store.delete_documents = AsyncMock()
+        await manager.delete_stale("run")
+        assert "a" not in lexical_index
+
+    def test_explicit_lexical_analyzer_is_kept(self, mock_stores):
+        document_store, vector_store = mock_stores
+        processor = TextProcessor(offline=True, emit_tokens=True)
+        pipeline = PreprocessingPipeline(
+            EmbeddingEngine(HashingEmbedder()), processor_chain=ProcessorChain([processor])
+        )
+
+        wired = DataManager(document_store, vector_store, preprocessing_pipeline=pipeline, lexical_index=BM25Index())
+        explicit = DataManager(
+            document_store, vector_store, preprocessing_pipeline=pipeline, lexical_index=BM25Index(analyzer=str.split)
+        )
+
+        assert wired.lexical_index.analyzer == processor.terms
+        assert explicit.lexical_index.analyzer is str.split
+
+    @pytest.mark.asyncio
+    async def test_search_similar_loads_in_one_round_trip(self, mock_stores, sample_embedding):
+        document_store, vector_store = mock_stores
+        vector_store.search.return_value = [("a", 0.9), ("missing", 0.8), ("b", 0.7)]
+        document_store.load_many.return_value = [
+            Document(id="a", content="first", metadata={}),
+            None,
+            Document(id="b", content="second", metadata={}),
+        ]
+        manager = DataManager(document_store, vector_store)
+
+        results = await manager.search_similar(sample_embedding, k=3)
+
+        document_store.load_many.assert_awaited_once_with(["a", "missing", "b"])
+        assert [(d.id, d.metadata['similarity_score']) for d in results] == [("a", 0.9), ("b", 0.7)]
+
+    @pytest.mark.asyncio
+    async def test_stores_every_chunk_embedding(self, mock_stores):
+        document_store, vector_store = mock_stores
+
+        class FakePipeline:
+            async def preprocess(self, document):
+                embeddings = np.eye(768, dtype=np.float32)[:3]
+                document.metadata['preprocessing_results'] = {
+                    'embeddings': embeddings,
+                    'chunk_offsets': [(0, 5), (5, 10), (10, 15)]
+                }
+                return document
+
+        manager = DataManager(document_store, vector_store, preprocessing_pipeline=FakePipeline())
+        documents = [
+            Document(id=f"doc_{i}", content="Some document content", metadata={"source": "test"})
+            for i in range(2)
+        ]
+        documents[1].metadata.update(categories="cs.LG stat.ML", update_date="2023-01-02")
+
+        results = await manager.process_batch(documents, batch_size=10, concurrency=1)
+
+        assert len(results['successful']) == 2
+        vector_store.save_many.assert_awaited_once()
+        call = vector_store.save_many.await_args
+        keys, matrix = call.args
+        assert keys == ["doc_0#0", "doc_0#1", "doc_0#2", "doc_1#0", "doc_1#1", "doc_1#2"]
+        assert matrix.shape == (6, 768)
+        assert call.kwargs['payloads'][1] == {'document_id': 'doc_0', 'chunk_index': 1, 'start': 5, 'end': 10}
+        # Filterable document fields are copied into every chunk payload
+        assert call.kwargs['payloads'][4] == {
+            'document_id': 'doc_1', 'chunk_index': 1, 'start': 5, 'end': 10,
+            'categories': ['cs.LG', 'stat.ML'], 'update_date': '2023-01-02'
+        }
+        assert 'embeddings' not in documents[0].metadata['preprocessing_results']
+        vector_store.trim_documents.assert_awaited_once_with({'doc_0': 3, 'doc_1': 3})
+
+    @pytest.mark.asyncio
+    async def test_store_failure_is_isolated_per_document(self, mock_stores):
+        document_store, vector_store = mock_stores
+        document_store.clear_content_hashes = AsyncMock(return_value=1)
+
+        class FakePipeline:
+            async def preprocess(self, document):
+                document.metadata['preprocessing_results'] = {'embeddings': np.eye(768, dtype=np.float32)[:1]}
+                return document
+
+        async def save_vectors(keys, matrix, payloads=None):
+            if "bad#0" in keys:
+                raise RuntimeError("unserializable payload")
+            return True
+
+        vector_store.save_many.side_effect = save_vectors
+        manager = DataManager(document_store, vector_store, preprocessing_pipeline=FakePipeline())
+        documents = [Document(id=doc_id, content="Some content", metadata={}) for doc_id in ("a", "bad", "c")]
+
+        results = await manager.process_batch(documents, batch_size=10, concurrency=1)
+
+        assert sorted(results['successful']) == ["a", "c"] and results['failed'] == ["bad"]
+        # Retried documents still carry their embeddings
+        stored_keys = [call.args[0] for call in vector_store.save_many.await_args_list[1:]]
+        assert stored_keys == [["a#0"], ["bad#0"], ["c#0"]]
+        # Written to the document store without vectors: flagged for reprocessing
+        assert document_store.clear_content_hashes.await_args_list[-1].args[0] == ["bad"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("aggregation, expected", [
+        ('max', [("b", 0.95), ("a", 0.9)]),
+        ('sum', [("a", 1.7), ("b", 0.95)]),
+    ])
+    async def test_search_similar_groups_chunk_hits(self, mock_stores, sample_embedding, aggregation, expected):
+        document_store, vector_store = mock_stores
+        vector_store.search.return_value = [("b", 0.95), ("a", 0.9), ("a", 0.8), ("c", 0.1)]
+        document_store.load_many.side_effect = lambda ids: [
+            Document(id=doc_id, content="content", metadata={}) for doc_id in ids
+        ]
+        manager = DataManager(document_store, vector_store)
+
+        results = await manager.search_similar(sample_embedding, k=2, aggregation=aggregation)
+
+        vector_store.search.assert_awaited_once_with(sample_embedding, 8, filter_dict=None)
+        assert [(d.id, pytest.approx(d.metadata['similarity_score'])) for d in results] == expected
@@ -1,8 +1,185 @@
-﻿import pytest
-from src.data.loaders import ArxivLoader
+﻿import json
+import os
+import types
+
+import pytest
+from src.data.loaders import ArxivLoader, Contains, DocumentBatch, In, Range
+from src.data.loaders.arxiv_loader import ArxivDocument
+from src.data.loaders.filters import EntryFilter, split_authors
+from src.data.loaders.offset_index import LineOffsetIndex
+from tests.conftest import make_arxiv_entry
 
 class TestArxivLoader:
     def test_load_documents(self):
         loader = ArxivLoader("test_data_dir")
         # Your test implementation here
         pass
+
+    def test_iter_documents_is_lazy(self, arxiv_data_dir):
+        loader = ArxivLoader(str(arxiv_data_dir))
+        documents = loader.iter_documents()
+        assert isinstance(documents, types.GeneratorType)
+        assert next(documents).id == "0704.0000"
+        assert len(list(loader.iter_documents(limit=10))) == 10
+
+    def test_load_documents_matches_stream(self, arxiv_data_dir):
+        loader = ArxivLoader(str(arxiv_data_dir))
+        assert [d.id for d in loader.load_documents()] == [d.id for d in loader.iter_documents()]
+
+    def test_offset_and_slice_use_index(self, arxiv_data_dir):
+        loader = ArxivLoader(str(arxiv_data_dir))
+
+        page = loader.load_documents(limit=5, offset=10)
+
+        assert [d.id for d in page] == [f"0704.{i:04d}" for i in range(10, 15)]
+        assert [d.id for d in loader.load_slice(23, 30)] == ["0704.0023", "0704.0024"]
+        assert LineOffsetIndex.sidecar_path(loader.file_path).exists()
+
+    def test_get_document_by_id(self, arxiv_data_dir):
+        loader = ArxivLoader(str(arxiv_data_dir))
+
+        assert loader.get_document("0704.0017").title == "Paper 17"
+        assert loader.get_document("9999.9999") is None
+
+    def test_split_ranges_cover_file(self, arxiv_data_dir):
+        loader = ArxivLoader(str(arxiv_data_dir))
+
+        ranges = loader.split_ranges(4)
+
+        assert len(ranges) == 4
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == os.path.getsize(loader.file_path)
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        ids = [d.id for start, end in ranges for d in map(loader._parse_entry, loader._load_entries(start, end))]
+        assert ids == [d.id for d in loader.iter_documents()]
+
+    def test_index_rebuilt_when_file_changes(self, arxiv_data_dir):
+        loader = ArxivLoader(str(arxiv_data_dir))
+        assert len(loader.build_index()) == 25
+
+        with open(loader.file_path, "a", encoding="utf8") as f:
+            f.write(json.dumps(make_arxiv_entry(25)) + "\n")
+
+        assert len(ArxivLoader(str(arxiv_data_dir)).build_index()) == 26
+        assert loader.get_document("0704.0025").title == "Paper 25"
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_parallel_load_matches_sequential(self, arxiv_data_dir, ordered):
+        loader = ArxivLoader(str(arxiv_data_dir))
+        expected = [d.id for d in loader.load_documents()]
+
+        chunks = list(loader.iter_document_chunks(workers=2, ordered=ordered, chunk_bytes=1024))
+        ids = [d.id for chunk in chunks for d in chunk]
+
+        assert len(chunks) > 2
+        assert (ids if ordered else sorted(ids)) == expected
+
+    def test_parallel_load_limit_and_filter(self, arxiv_data_dir):
+        loader = ArxivLoader(str(arxiv_data_dir))
+        loader.PARALLEL_CHUNK_BYTES = 1024
+
+        assert [d.id for d in loader.load_documents(limit=7, workers=2)] == [f"0704.{i:04d}" for i in range(7)]
+        assert [d.id for d in loader.load_by_filter({"title": "Paper 12"}, workers=2)] == ["0704.0012"]
+
+
+    def test_documents_are_compact(self, arxiv_data_dir):
+        first, second = ArxivLoader(str(arxiv_data_dir)).load_documents(limit=2)
+
+        assert not hasattr(first, "__dict__")
+        assert first.abstract is first.content
+        assert first.metadata is second.metadata
+        assert first.categories is second.categories
+
+    def test_abstract_is_a_settable_content_alias(self, arxiv_data_dir):
+        document = ArxivLoader(str(arxiv_data_dir)).load_documents(limit=1)[0]
+        fields = {name: getattr(document, name) for name in (
+            "submitter", "authors", "title", "comments", "journal_ref",
+            "doi", "report_no", "categories", "license", "update_date"
+        )}
+
+        rebuilt = ArxivDocument(id=document.id, abstract="New abstract", metadata={}, **fields)
+        assert rebuilt.content == "New abstract"
+        assert ArxivDocument(id="x", content="same", abstract="same", metadata={}, **fields).abstract == "same"
+        with pytest.raises(ValueError):
+            ArxivDocument(id="x", content="one", abstract="two", metadata={}, **fields)
+
+        rebuilt.abstract = "Edited"
+        assert rebuilt.content == "Edited"
+        assert not hasattr(rebuilt, "__dict__")
+        assert repr(rebuilt).startswith("ArxivDocument(")
+
+    def test_document_batch_round_trip(self, arxiv_data_dir):
+        documents = ArxivLoader(str(arxiv_data_dir)).load_documents(limit=3)
+
+        batch = DocumentBatch.from_documents(documents)
+
+        assert len(batch) == 3
+        assert batch.ids == [d.id for d in documents]
+        assert [(d.id, d.content) for d in batch] == [(d.id, d.content) for d in documents]
+
+@pytest.fixture
+def mixed_data_dir(tmp_path):
+    categories = ["cs.CL cs.LG", "math.CO", "cs.LG stat.ML", "hep-th"]
+    with open(tmp_path / ArxivLoader.FILENAME, "w", encoding="utf8") as f:
+        for i in range(40):
+            entry = make_arxiv_entry(
+                i,
+                categories=categories[i % 4],
+                update_date=f"20{10 + i % 10:02d}-01-01",
+                authors="Ada Lovelace and Alan Turing" if i % 5 == 0 else "Grace Hopper"
+            )
+            f.write(json.dumps(entry) + "\n")
+    return tmp_path
+
+
+class TestFilters:
+    def test_split_authors(self):
+        assert split_authors("A. Smith, B. Jones and C. Anderson") == ["A. Smith", "B. Jones", "C. Anderson"]
+
+    def test_prefilter_rejects_raw_lines(self):
+        entry_filter = EntryFilter({"categories": Contains("cs.CL"), "update_date": Range(gte="2015-01-01")})
+
+        assert entry_filter.prefilter(b'{"categories": "cs.CL cs.LG"}')
+        assert not entry_filter.prefilter(b'{"categories": "math.CO"}')
+        assert not entry_filter.matches({"categories": "cs.CLX", "update_date": "2016-01-01"})
+        assert entry_filter.matches({"categories": "cs.CL cs.LG", "update_date": "2016-01-01"})
+
+    def test_membership_and_range_filters(self, mixed_data_dir):
+        loader = ArxivLoader(str(mixed_data_dir))
+
+        cs_cl = loader.load_by_filter({"categories": Contains("cs.CL")})
+        recent_lg = loader.load_by_filter({
+            "categories": In(["cs.LG"]),
+            "update_date": Range(gte="2016-01-01", lte="2018-12-31")
+        })
+
+        assert [d.id for d in cs_cl] == [f"0704.{i:04d}" for i in range(0, 40, 4)]
+        assert [d.id for d in recent_lg] == ["0704.0006", "0704.0008", "0704.0016", "0704.0018",
+                                             "0704.0026", "0704.0028", "0704.0036", "0704.0038"]
+
+    def test_indexed_filter_reads_only_candidates(self, mixed_data_dir, mocker):
+        loader = ArxivLoader(str(mixed_data_dir))
+        expected = [d.id for d in loader.load_by_filter({
+            "categories": Contains("cs.LG"), "authors": Contains("Alan Turing")
+        })]
+
+        loader.build_field_indexes()
+        reopened = ArxivLoader(str(mixed_data_dir))
+        scan = mocker.spy(reopened, "_load_entries")
+        read = mocker.spy(reopened, "_load_lines")
+
+        documents = reopened.load_by_filter({"categories": Contains("cs.LG"), "authors": Contains("Alan Turing")})
+
+        assert [d.id for d in documents] == expected == ["0704.0000", "0704.0010", "0704.0020", "0704.0030"]
+        scan.assert_not_called()
+        assert len(read.call_args.args[0]) == 4
+
+    def test_stale_field_index_is_ignored(self, mixed_data_dir):
+        loader = ArxivLoader(str(mixed_data_dir))
+        loader.build_field_indexes(fields=("update_date",))
+
+        with open(loader.file_path, "a", encoding="utf8") as f:
+            f.write(json.dumps(make_arxiv_entry(99, update_date="2030-01-01")) + "\n")
+
+        documents = loader.load_by_filter({"update_date": Range(gte="2030-01-01")})
+        assert [d.id for d in documents] == ["0704.0099"]
@@ -0,0 +1,197 @@
+import random
+import threading
+import types
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.data.loaders import Document
+from src.data.manager import DataManager
+from src.preprocessor import (
+    EmbeddingCache, EmbeddingEngine, EmbeddingModel, HashingEmbedder, PreprocessingPipeline, TextSplitter
+)
+from src.preprocessor.splitter import chunk_texts
+
+
+class RecordingModel(EmbeddingModel):
+    model_id = "recording"
+    dimension = 4
+
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        return np.array([[len(t), 1, 0, 0] for t in texts], dtype=np.float32)
+
+
+class TestHashingEmbedder:
+    def test_deterministic_unit_vectors(self):
+        model = HashingEmbedder(dimension=64)
+        texts = ["graph neural networks", "", "graph neural networks"]
+
+        matrix = model.embed(texts)
+
+        assert matrix.dtype == np.float32 and matrix.shape == (3, 64)
+        np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-6)
+        np.testing.assert_array_equal(matrix[0], matrix[2])
+        np.testing.assert_array_equal(matrix, HashingEmbedder(dimension=64).embed(texts))
+
+
+class TestEmbeddingEngine:
+    @pytest.mark.asyncio
+    async def test_groups_by_length_and_keeps_input_order(self):
+        model = RecordingModel()
+        engine = EmbeddingEngine(model, batch_size=2)
+        texts = ["a b c d", "a", "a b c", "a b", "a"]
+
+        matrix = await engine.embed(texts)
+
+        assert model.batches == [["a", "a b"], ["a b c", "a b c d"]]
+        assert matrix.flags["C_CONTIGUOUS"]
+        assert matrix[:, 0].tolist() == [len(t) for t in texts]
+
+    @pytest.mark.asyncio
+    async def test_cache_survives_restart(self, tmp_path):
+        path = tmp_path / "embeddings.sqlite"
+        first = EmbeddingEngine(RecordingModel(), cache=EmbeddingCache(path))
+        expected = await first.embed(["alpha beta", "gamma"])
+        first.cache.close()
+
+        model = RecordingModel()
+        second = EmbeddingEngine(model, cache=EmbeddingCache(path))
+        # Whitespace-only changes hit the cache
+        matrix = await second.embed(["alpha  beta\n", "gamma", "delta"])
+
+        assert model.batches == [["delta"]]
+        assert second.cache_hits == 2
+        np.testing.assert_array_equal(matrix[:2], expected)
+
+    @pytest.mark.asyncio
+    async def test_cache_io_runs_off_the_event_loop(self):
+        class ThreadRecordingCache(EmbeddingCache):
+            def __init__(self):
+                super().__init__()
+                self.threads = []
+
+            def get_many(self, keys, chunk_size=500):
+                self.threads.append(threading.get_ident())
+                return super().get_many(keys, chunk_size)
+
+            def put_many(self, keys, vectors):
+                self.threads.append(threading.get_ident())
+                super().put_many(keys, vectors)
+
+        cache = ThreadRecordingCache()
+        engine = EmbeddingEngine(RecordingModel(), cache=cache, batch_size=1)
+
+        await engine.embed(["a", "b c"])
+        matrix = await engine.embed(["a", "b c"])
+
+        # One lookup per call, one write per embedded batch
+        assert len(cache.threads) == 4
+        assert threading.get_ident() not in cache.threads
+        assert engine.cache_hits == 2 and matrix[:, 0].tolist() == [1, 3]
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = EmbeddingCache(max_entries=2)
+        keys = [EmbeddingCache.key("m", text) for text in ("a", "b", "c")]
+        cache.put_many(keys[:2], np.eye(2, dtype=np.float32))
+        cache.get_many([keys[0]])
+        cache.put_many(keys[2:], np.ones((1, 2), dtype=np.float32))
+
+        assert len(cache) == 2
+        assert set(cache.get_many(keys)) == {keys[0], keys[2]}
+
+
+PAPER = (
+    "Abstract\nWe study graphs. They are big. We prove bounds on them here.\n\n"
+    "Introduction\nGraphs are everywhere. "
+    + " ".join(f"Sentence number {i} is here." for i in range(20))
+    + "\n\nReferences\n[1] A. Author.\n[2] B. Author."
+)
+
+
+class TestTextSplitter:
+    @pytest.mark.parametrize("unit, size, overlap", [("chars", 120, 30), ("tokens", 20, 5), ("chars", 50, 0)])
+    def test_spans_cover_every_token_within_size(self, unit, size, overlap):
+        splitter = TextSplitter(size, overlap, unit=unit)
+
+        spans = list(splitter.split(PAPER))
+
+        covered = set()
+        for start, end in spans:
+            chunk = PAPER[start:end]
+            assert chunk == chunk.strip()
+            assert (len(chunk.split()) if unit == "tokens" else len(chunk)) <= size
+            covered.update(i for i in range(start, end) if not PAPER[i].isspace())
+        assert covered == {i for i, c in enumerate(PAPER) if not c.isspace()}
+        assert [start for start, _ in spans] == sorted(start for start, _ in spans)
+
+    def test_respects_sections_and_sentences(self):
+        spans = list(TextSplitter(120, 30)(PAPER))
+        chunks = [PAPER[start:end] for start, end in spans]
+
+        assert chunks[0].startswith("Abstract") and "Introduction" not in chunks[0]
+        assert chunks[1].startswith("Introduction")
+        assert chunks[-1].startswith("References")
+        # Body chunks end at sentence ends, and overlaps start at sentence starts
+        assert all(chunk.endswith(".") for chunk in chunks)
+        assert all(chunk.startswith("Sentence") for chunk in chunks[2:-1])
+        assert spans[2][0] < spans[1][1]
+
+    def test_is_lazy(self):
+        spans = TextSplitter(50, 10)(PAPER)
+
+        assert isinstance(spans, types.GeneratorType)
+        assert PAPER[slice(*next(spans))] == "Abstract\nWe study graphs. They are big."
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_random_text_terminates_with_progress(self, seed):
+        rng = random.Random(seed)
+        text = "".join(rng.choice(["word", "x" * 80, ". ", "\n\n", " ", "Results\n"]) for _ in range(500))
+
+        spans = list(TextSplitter(60, 59)(text))
+
+        assert all(b[0] > a[0] for a, b in zip(spans, spans[1:]))
+
+
+class TestPreprocessingPipeline:
+    @pytest.mark.asyncio
+    async def test_manager_stores_pipeline_embeddings(self):
+        document_store = Mock()
+        document_store.save_many = AsyncMock(side_effect=lambda documents: [True] * len(documents))
+        vector_store = Mock()
+        vector_store.save_many = AsyncMock(return_value=True)
+        vector_store.trim_documents = AsyncMock(return_value=True)
+        model = RecordingModel()
+        model.dimension = 768
+        model.embed = lambda texts: HashingEmbedder().embed(texts)
+        pipeline = PreprocessingPipeline(EmbeddingEngine(model, batch_size=8))
+        manager = DataManager(document_store, vector_store, preprocessing_pipeline=pipeline, concurrency=1)
+        documents = [
+            Document(id=f"doc_{i}", content=f"Abstract of paper {i}.", metadata={}) for i in range(10)
+        ]
+
+        results = await manager.process_batch(documents, batch_size=10)
+
+        assert len(results['successful']) == 10
+        keys, matrix = vector_store.save_many.await_args.args
+        assert keys == [f"doc_{i}#0" for i in range(10)]
+        np.testing.assert_allclose(matrix, HashingEmbedder().embed([d.content for d in documents]))
+        assert documents[0].metadata['preprocessing_results']['chunk_offsets'] == [(0, 20)]
+
+    @pytest.mark.asyncio
+    async def test_chunks_rebuild_from_stored_offsets(self):
+        pipeline = PreprocessingPipeline(
+            EmbeddingEngine(HashingEmbedder(dimension=32)), splitter=TextSplitter(120, 30)
+        )
+        document = Document(id="p", content=PAPER, metadata={})
+
+        await pipeline.preprocess(document)
+
+        results = document.metadata['preprocessing_results']
+        chunks = list(chunk_texts(document))
+        assert len(chunks) == len(results['embeddings']) == 9
+        np.testing.assert_allclose(results['embeddings'], HashingEmbedder(dimension=32).embed(chunks))
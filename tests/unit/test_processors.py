@@ -0,0 +1,275 @@
+import asyncio
+import random
+import re
+
+import nltk
+import pytest
+
+from src.data.loaders import Document
+from src.data.processors import (
+    BaseProcessor, DedupProcessor, MetadataProcessor, ProcessorChain, ScientificProcessor, TextProcessor
+)
+from src.data.processors import nltk_resources
+from src.utils.exceptions import ResourceUnavailableError
+
+
+class TestScientificProcessor:
+    @pytest.mark.asyncio
+    async def test_does_not_mutate_shared_metadata(self):
+        shared = {"source": "test"}
+        documents = [
+            Document(id=f"doc_{i}", content="Abstract\nWe study $x$.", metadata=shared)
+            for i in range(2)
+        ]
+
+        processed = await ScientificProcessor().process_batch(documents)
+
+        assert shared == {"source": "test"}
+        assert processed[0].metadata["equation_count"] == 1
+        assert processed[0].metadata is not processed[1].metadata
+
+
+def _legacy_scan(processor, text, grouped=True):
+    """The original regex-per-section implementation"""
+    sections = {}
+    for section, pattern in processor.section_patterns.items():
+        if grouped:
+            pattern = f'(?:{pattern})'
+        match = re.search(rf'(?i){pattern}.*?\n(.*?)(?=\n\n|\Z)', text, re.DOTALL)
+        if match:
+            sections[section] = match.group(1).strip()
+    references = []
+    ref_section = re.search(r'references.*?\n(.*?)(?=\n\n|\Z)', text, re.DOTALL | re.IGNORECASE)
+    if ref_section:
+        references = [ref.strip() for ref in ref_section.group(1).split('\n') if ref.strip()]
+    return sections, references, re.findall(r'\$.*?\$', text)
+
+
+def _synthetic_paper(rng, n_tokens):
+    vocab = [
+        "Abstract", "INTRODUCTION", "background", "Methods", "methodology", "Results",
+        "discussion", "Conclusion", "References", "backgroundiscussion", "$", "$x^2$",
+        "\n", "\n", "\n\n", "\n\n\n", "data", "we", "show", "model", "a", "[1]", "  "
+    ]
+    return " ".join(rng.choice(vocab) for _ in range(n_tokens))
+
+
+class TestScientificScanner:
+    def test_matches_legacy_regexes(self):
+        rng = random.Random(0)
+        processor = ScientificProcessor()
+        for _ in range(200):
+            text = _synthetic_paper(rng, rng.randint(0, 400))
+            assert processor._scan(text) == _legacy_scan(processor, text)
+
+    def test_matches_ungrouped_legacy_where_it_did_not_crash(self):
+        processor = ScientificProcessor()
+        text = "Abstract\nWe study $x$ and $y\nz$.\n\nResults\nGood.\n\nReferences\n[1] A\n[2] B"
+
+        assert processor._scan(text) == _legacy_scan(processor, text, grouped=False)
+        assert processor._scan(text)[1] == ["[1] A", "[2] B"]
+
+    def test_large_input(self):
+        rng = random.Random(0)
+        processor = ScientificProcessor()
+        text = _synthetic_paper(rng, 200_000)
+
+        assert processor._scan(text) == _legacy_scan(processor, text)
+
+
+def _abstract(i, edit=""):
+    words = [f"term{(i * 7919 + j * 104729) % 5003}" for j in range(80)]
+    return " ".join(words) + edit
+
+
+class TestDedupProcessor:
+    @pytest.mark.asyncio
+    async def test_links_near_duplicates_to_canonical(self):
+        processor = DedupProcessor(threshold=0.7)
+        documents = [Document(id=f"doc_{i}", content=_abstract(i), metadata={}) for i in range(50)]
+        documents.append(Document(id="v2", content=_abstract(3, " with a minor revision"), metadata={}))
+
+        processed = await processor.process_batch(documents)
+
+        assert [d.id for d in processed if DedupProcessor.is_duplicate(d)] == ["v2"]
+        assert processed[-1].metadata["duplicate_of"] == "doc_3"
+        assert processed[-1].metadata["duplicate_similarity"] >= 0.7
+        assert len(processor.index) == 50
+
+    @pytest.mark.asyncio
+    async def test_skip_mode_drops_duplicates(self):
+        processor = DedupProcessor(mode="skip")
+        documents = [
+            Document(id="a", content=_abstract(1), metadata={}),
+            Document(id="b", content=_abstract(1), metadata={}),
+            Document(id="c", content=_abstract(2), metadata={}),
+        ]
+
+        processed = await processor.process_batch(documents)
+
+        assert [d.id for d in processed] == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_reprocessing_a_document_is_not_a_duplicate(self):
+        processor = DedupProcessor()
+        document = Document(id="a", content=_abstract(1), metadata={})
+        await processor.process(document)
+
+        again = await processor.process(Document(id="a", content=_abstract(1), metadata={}))
+
+        assert not DedupProcessor.is_duplicate(again)
+
+    @pytest.mark.asyncio
+    async def test_index_persists_across_runs(self, tmp_path):
+        path = tmp_path / "dedup.npz"
+        processor = DedupProcessor(index_path=path)
+        processor.index.merge_every = 8
+        for i in range(20):
+            await processor.process(Document(id=f"doc_{i}", content=_abstract(i), metadata={}))
+        processor.remove(["doc_5"])
+        processor.save()
+
+        reloaded = DedupProcessor(index_path=path)
+        duplicate = await reloaded.process(Document(id="copy", content=_abstract(12), metadata={}))
+        revived = await reloaded.process(Document(id="copy5", content=_abstract(5), metadata={}))
+
+        assert len(reloaded.index) == 20
+        assert duplicate.metadata["duplicate_of"] == "doc_12"
+        assert not DedupProcessor.is_duplicate(revived)
+
+
+@pytest.fixture
+def no_nltk_data(monkeypatch):
+    """Pretend no NLTK data is installed and count download attempts"""
+    downloads = []
+    monkeypatch.setattr(nltk_resources, "_find", lambda resource: False)
+    monkeypatch.setattr(nltk, "download", lambda package, quiet=True: downloads.append(package) or False)
+    for cached in (nltk_resources._ensure, nltk_resources.get_stopwords, nltk_resources.get_tokenizers):
+        cached.cache_clear()
+    yield downloads
+    for cached in (nltk_resources._ensure, nltk_resources.get_stopwords, nltk_resources.get_tokenizers):
+        cached.cache_clear()
+
+
+class TestTextProcessor:
+    def test_construction_does_not_touch_nltk(self, no_nltk_data):
+        TextProcessor()
+        TextProcessor(offline=False)
+
+        assert no_nltk_data == []
+
+    @pytest.mark.asyncio
+    async def test_downloads_at_most_once_per_process(self, no_nltk_data):
+        for _ in range(3):
+            await TextProcessor(offline=False).process(
+                Document(id="a", content="One sentence. Another one.", metadata={})
+            )
+
+        assert sorted(no_nltk_data) == ["punkt", "punkt_tab", "stopwords"]
+
+    @pytest.mark.asyncio
+    async def test_offline_uses_bundled_fallback(self, no_nltk_data):
+        document = Document(id="a", content="We study graphs. The results are new!", metadata={})
+
+        processed = await TextProcessor(offline=True).process(document)
+
+        assert no_nltk_data == []
+        assert processed.metadata["sentence_count"] == 2
+        # "We", "the" and "are" are stopwords; punctuation tokens are kept
+        assert processed.metadata["word_count"] == 6
+        assert TextProcessor(offline=True).stop_words is TextProcessor(offline=True).stop_words
+
+    def test_offline_without_fallback_fails_fast(self, no_nltk_data):
+        processor = TextProcessor(offline=True, fallback=False)
+
+        with pytest.raises(ResourceUnavailableError, match="downloads are disabled"):
+            processor.stop_words
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("workers", [None, 2])
+    async def test_batch_matches_per_document_output(self, no_nltk_data, workers):
+        texts = [
+            f"Paper {i} studies graphs (and trees)! We show a bound of O(n). Results follow; see Sec. {i}."
+            for i in range(40)
+        ]
+        reference = TextProcessor(offline=True)
+        expected = []
+        for text in texts:
+            cleaned = reference._clean_text(text)
+            expected.append((
+                cleaned,
+                len(reference._tokenize_sentences(cleaned)),
+                len(reference._tokenize_words(cleaned))
+            ))
+
+        processor = TextProcessor(offline=True, workers=workers, chunk_size=16)
+        try:
+            processed = await processor.process_batch(
+                [Document(id=str(i), content=text, metadata={}) for i, text in enumerate(texts)]
+            )
+        finally:
+            processor.close()
+
+        assert [
+            (d.content, d.metadata["sentence_count"], d.metadata["word_count"]) for d in processed
+        ] == expected
+
+
+class TestProcessorChain:
+    @staticmethod
+    def _documents(n):
+        return [
+            Document(id=f"doc_{i}", content=f"Abstract\nPaper {i} on $x$ graphs. More text.", metadata={"source": "s"})
+            for i in range(n)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_sequential_chain(self, no_nltk_data):
+        def chain():
+            return ProcessorChain([
+                TextProcessor(offline=True), ScientificProcessor(), MetadataProcessor(), DedupProcessor(mode="skip")
+            ])
+
+        sequential_chain = chain()
+        sequential = [await sequential_chain.process(d) for d in self._documents(5)]
+        batched = await chain().process_batch(self._documents(5))
+
+        def comparable(document):
+            metadata = dict(document.metadata)
+            metadata.pop("processed_at")
+            metadata.pop("created_at")
+            return document.id, document.content, metadata
+
+        assert [comparable(d) for d in batched] == [comparable(d) for d in sequential]
+
+    @pytest.mark.asyncio
+    async def test_fuses_metadata_only_processors_and_records_timings(self):
+        chain = ProcessorChain([ScientificProcessor(), MetadataProcessor()], concurrent_extract=True)
+
+        assert chain._stages == [[0, 1]]
+        split = ProcessorChain([ScientificProcessor(), TextProcessor(offline=True), MetadataProcessor()])
+        assert split._stages == [[0], 1, [2]]
+        processed = await chain.process_batch(self._documents(3))
+
+        assert processed[0].metadata["equation_count"] == 1
+        assert processed[0].metadata["content_length"] == len(processed[0].content)
+        timings = chain.timings()
+        assert set(timings) == {"0:ScientificProcessor", "1:MetadataProcessor"}
+        assert timings["0:ScientificProcessor"]["documents"] == 3
+
+    @pytest.mark.asyncio
+    async def test_bounds_documents_in_flight(self):
+        in_flight = peak = 0
+
+        class SlowProcessor(BaseProcessor):
+            async def process(self, document):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return document
+
+        await ProcessorChain([SlowProcessor()], concurrency=3).process_batch(self._documents(10))
+
+        assert peak == 3
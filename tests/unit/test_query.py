@@ -0,0 +1,210 @@
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.data.loaders import Document
+from src.data.manager import DataManager
+from src.inference.llm_chain import Answer, BaseLLM, LLMChain
+from src.inference.query import QueryCache, QueryEngine, normalize_query
+from src.preprocessor import EmbeddingEngine, HashingEmbedder
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLLM(BaseLLM):
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0)
+        return f"answer {len(self.prompts)}"
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_normalize_query():
+    assert normalize_query("  What is  Dark Matter? ") == normalize_query("what is dark matter")
+
+
+class TestQueryCache:
+    def test_exact_hit_ignores_formatting(self):
+        cache = QueryCache()
+        cache.put("What is dark matter?", Answer("What is dark matter?", "42", ["a"]))
+
+        answer = cache.get("what is   dark matter")
+        assert answer.text == "42" and answer.cached == 'exact'
+        assert answer.query == "what is   dark matter"
+        assert cache.get("what is dark energy") is None
+
+    def test_semantic_hit_above_threshold(self):
+        cache = QueryCache(similarity_threshold=0.9)
+        cache.put("q1", Answer("q1", "near"), embedding=unit(1, 0, 0))
+        cache.put("q2", Answer("q2", "far"), embedding=unit(0, 1, 0))
+
+        assert cache.get_similar("q3", unit(1, 0.1, 0)).text == "near"
+        assert cache.get_similar("q4", unit(1, 1, 0)) is None
+        assert cache.stats.semantic_hits == 1 and cache.stats.misses == 1
+        assert cache.stats.hit_rate == 0.5
+
+    def test_lru_eviction_reuses_embedding_rows(self):
+        cache = QueryCache(max_entries=2)
+        cache.put("a", Answer("a", "A"), embedding=unit(1, 0))
+        cache.put("b", Answer("b", "B"), embedding=unit(0, 1))
+        cache.get("a")
+        cache.put("c", Answer("c", "C"), embedding=unit(1, 1))
+
+        assert cache.get("b") is None
+        assert cache.get("a").text == "A" and cache.get("c").text == "C"
+        assert cache.stats.evictions == 1
+        assert len(cache._slot_keys) == 2
+        assert cache.get_similar("b'", unit(0, 1)) is None
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = QueryCache(ttl=10, clock=clock)
+        cache.put("q", Answer("q", "A"), embedding=unit(1, 0))
+
+        clock.now = 9.9
+        assert cache.get("q") is not None
+        clock.now = 10.0
+        assert cache.get("q") is None
+        assert cache.get_similar("q", unit(1, 0)) is None
+        assert cache.stats.expirations == 1 and len(cache) == 0
+
+    def test_semantic_lookup_skips_expired_closer_entry(self):
+        clock = FakeClock()
+        cache = QueryCache(ttl=10, similarity_threshold=0.9, clock=clock)
+        cache.put("old", Answer("old", "expired"), embedding=unit(1, 0, 0))
+        clock.now = 5.0
+        cache.put("new", Answer("new", "live"), embedding=unit(1, 0.2, 0))
+
+        clock.now = 12.0
+        answer = cache.get_similar("q", unit(1, 0.05, 0))
+
+        assert answer is not None and answer.text == "live"
+        assert cache.stats.semantic_hits == 1 and cache.stats.misses == 0
+
+    def test_invalidate_by_document(self):
+        cache = QueryCache()
+        cache.put("q1", Answer("q1", "A", ["a", "b"]), embedding=unit(1, 0))
+        cache.put("q2", Answer("q2", "B", ["c"]), embedding=unit(0, 1))
+
+        assert cache.invalidate(["b", "missing"]) == 1
+        assert cache.get("q1") is None and cache.get("q2") is not None
+        assert cache.get_similar("q1", unit(1, 0)) is None
+        assert cache._by_document == {"c": {"q2"}}
+
+    def test_stale_puts_outside_the_invalidation_window(self):
+        cache = QueryCache(max_entries=2)
+        generation = cache.generation
+        cache.invalidate(["x", "y", "z"])
+
+        cache.put("q", Answer("q", "A", ["a"]), generation=generation)
+        cache.put("r", Answer("r", "B", ["a"]), generation=cache.generation)
+
+        assert cache.get("q") is None and cache.get("r") is not None
+
+
+class TestQueryEngine:
+    def make_engine(self, documents=("a", "b")):
+        retriever = Mock()
+        retriever.search = AsyncMock(
+            return_value=[Document(id=doc_id, content=f"content {doc_id}", metadata={}) for doc_id in documents]
+        )
+        llm = CountingLLM()
+        embedder = EmbeddingEngine(HashingEmbedder(dimension=64))
+        cache = QueryCache(similarity_threshold=0.99)
+        return QueryEngine(LLMChain(retriever, llm, k=2), embedder, cache), retriever, llm, embedder
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_skips_embedding_and_llm(self):
+        engine, retriever, llm, embedder = self.make_engine()
+
+        first = await engine.ask("What is dark matter?")
+        second = await engine.ask("what is dark matter")
+
+        assert first.cached is None and first.document_ids == ["a", "b"]
+        assert second.cached == 'exact' and second.text == first.text
+        assert len(llm.prompts) == 1 and embedder.embedded == 1
+        # The retriever got the embedding computed for the cache lookup
+        assert retriever.search.call_args.kwargs['query_embedding'].shape == (64,)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_run(self):
+        engine, _, llm, _ = self.make_engine()
+
+        answers = await asyncio.gather(*(engine.ask("Dark matter halos?") for _ in range(5)))
+
+        assert len(llm.prompts) == 1
+        assert {answer.text for answer in answers} == {"answer 1"}
+        assert engine.cache.stats.coalesced == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_strand_waiters(self):
+        engine, _, llm, _ = self.make_engine()
+        release = asyncio.Event()
+        generate = llm.generate
+
+        async def first_call_hangs(prompt):
+            if not llm.prompts:
+                llm.prompts.append(prompt)
+                await release.wait()
+            return await generate(prompt)
+
+        llm.generate = first_call_hangs
+        leader = asyncio.create_task(engine.ask("Dark matter halos?"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(engine.ask("dark matter halos"))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        answer = await asyncio.wait_for(waiter, timeout=1)
+
+        assert leader.cancelled()
+        assert answer.text == "answer 2" and answer.query == "dark matter halos"
+        assert engine.cache.get("dark matter halos").text == "answer 2"
+
+    @pytest.mark.asyncio
+    async def test_answer_invalidated_mid_run_is_not_cached(self):
+        engine, _, llm, _ = self.make_engine()
+        generate = llm.generate
+
+        async def reingest_during_generation(prompt):
+            engine.cache.invalidate(["b"])
+            return await generate(prompt)
+
+        llm.generate = reingest_during_generation
+        answer = await engine.ask("dark matter")
+
+        assert answer.text == "answer 1"
+        assert engine.cache.get("dark matter") is None
+        assert engine.cache.stats.stale == 1
+
+    @pytest.mark.asyncio
+    async def test_reingest_invalidates_answers(self):
+        engine, _, llm, _ = self.make_engine()
+        document_store = Mock()
+        document_store.save_many = AsyncMock(side_effect=lambda documents: [True] * len(documents))
+        vector_store = Mock()
+        vector_store.trim_documents = AsyncMock(return_value=True)
+        manager = DataManager(document_store, vector_store)
+        manager.add_ingest_listener(engine.cache.invalidate)
+
+        await engine.ask("dark matter")
+        await manager.process_batch([Document(id="b", content="Revised content", metadata={})])
+        answer = await engine.ask("dark matter")
+
+        assert answer.cached is None and len(llm.prompts) == 2
+        assert engine.cache.stats.invalidations == 1
@@ -0,0 +1,212 @@
+import random
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from src.data.loaders import Document
+from src.data.processors import TextProcessor
+from src.inference.retriever import (
+    BM25Index, HybridRetriever, append_varint, decode_varints, encode_varints,
+    reciprocal_rank_fusion
+)
+from src.preprocessor import EmbeddingEngine, HashingEmbedder
+
+VOCABULARY = [f"term{i}" for i in range(300)]
+
+
+def random_corpus(n, seed=0):
+    rng = random.Random(seed)
+    # Zipf-like term distribution, so posting lengths vary widely
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+    return {
+        f"doc{i}": rng.choices(VOCABULARY, weights=weights, k=rng.randint(5, 120))
+        for i in range(n)
+    }
+
+
+def assert_same_ranking(actual, expected):
+    # Term scores may be summed in another order, so ties can differ in the last ulp
+    def ranking(results):
+        return sorted((-round(score, 9), doc_id) for doc_id, score in results)
+
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+    cutoff = ranking(expected)[-1][0] if expected else 0
+    assert [r for r in ranking(actual) if r[0] < cutoff] == [r for r in ranking(expected) if r[0] < cutoff]
+
+
+class TestVarints:
+    def test_round_trip(self):
+        values = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 31, 2 ** 40 + 5]
+        data = bytearray()
+        for value in values:
+            append_varint(data, value)
+        assert decode_varints(bytes(data)).tolist() == values
+
+    def test_vectorized_encoding_matches_scalar(self):
+        values = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 31, 2 ** 40 + 5, 2 ** 63 + 1]
+        expected = bytearray()
+        for value in values:
+            append_varint(expected, value)
+
+        data, sizes = encode_varints(values)
+
+        assert data.tobytes() == bytes(expected)
+        assert sizes.sum() == len(expected)
+        assert decode_varints(data.tobytes()).tolist() == values
+
+    def test_empty(self):
+        assert len(decode_varints(b"")) == 0
+        assert len(encode_varints([])[0]) == 0
+
+
+class TestBM25Index:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_wand_matches_exhaustive(self, seed):
+        index = BM25Index()
+        for doc_id, tokens in random_corpus(500, seed).items():
+            index.add(doc_id, tokens=tokens)
+
+        rng = random.Random(seed)
+        for _ in range(20):
+            query = rng.sample(VOCABULARY[:100], rng.randint(1, 5))
+            for k in (1, 10, 50):
+                assert_same_ranking(index.search(query, k), index.search_exhaustive(query, k))
+
+    def test_analyzes_text(self):
+        index = BM25Index()
+        index.add("a", text="Quantum entanglement of photons")
+        index.add("b", text="Classical mechanics of rigid bodies")
+        assert [doc_id for doc_id, _ in index.search("the entanglement")] == ["a"]
+        assert index.search("of the") == []
+
+    def test_readding_replaces_document(self):
+        index = BM25Index(compact_threshold=1.0)
+        index.add("a", tokens=["alpha", "beta"])
+        index.add("a", tokens=["gamma"])
+
+        assert len(index) == 1
+        assert index.search(["alpha"]) == []
+        assert [doc_id for doc_id, _ in index.search(["gamma"])] == ["a"]
+
+    def test_reingest_keeps_scores_stable(self):
+        corpus = {f"doc{i}": ["common", "filler"] + ([f"topic{i}"] * (i % 3 + 1)) for i in range(10)}
+        corpus["q"] = ["quantum", "common", "filler"]
+        fresh = BM25Index()
+        for doc_id, tokens in corpus.items():
+            fresh.add(doc_id, tokens=tokens)
+
+        index = BM25Index()
+        for _ in range(20):
+            for doc_id, tokens in corpus.items():
+                index.add(doc_id, tokens=tokens)
+            index.maybe_compact()
+
+        assert len(index._ids) <= len(corpus) / (1 - index.compact_threshold) + 1
+        for query in ("quantum", "common filler", "topic4 quantum"):
+            assert_same_ranking(index.search(query, k=5), fresh.search(query, k=5))
+        assert index.search("quantum")[0][1] > 0
+
+    def test_remove_and_compact(self):
+        corpus = random_corpus(200, seed=1)
+        index = BM25Index(compact_threshold=0.1)
+        for doc_id, tokens in corpus.items():
+            index.add(doc_id, tokens=tokens)
+
+        removed = [f"doc{i}" for i in range(0, 200, 3)]
+        assert index.remove(removed + ["missing"]) == len(removed)
+        assert index.maybe_compact() and not index.maybe_compact()
+
+        reference = BM25Index()
+        for doc_id, tokens in corpus.items():
+            if doc_id not in removed:
+                reference.add(doc_id, tokens=tokens)
+
+        # Compaction renumbers documents; scores match an index built without them
+        assert len(index._ids) == len(index)
+        for query in (["term0"], ["term3", "term7"], ["term1", "term50", "term99"]):
+            assert_same_ranking(index.search(query, 20), reference.search(query, 20))
+
+    def test_compact_matches_fresh_index(self, monkeypatch):
+        monkeypatch.setattr(BM25Index, "COMPACT_POSTINGS", 50)
+        corpus = random_corpus(300, seed=3)
+        removed = {f"doc{i}" for i in range(0, 300, 4)}
+        index = BM25Index()
+        for doc_id, tokens in corpus.items():
+            index.add(doc_id, tokens=tokens)
+        index.remove(removed)
+        index.add("doc1", tokens=["term0"] * 200)
+
+        index.compact()
+
+        # Survivors keep their order; the re-added document comes last
+        reference = BM25Index()
+        for doc_id, tokens in corpus.items():
+            if doc_id not in removed and doc_id != "doc1":
+                reference.add(doc_id, tokens=tokens)
+        reference.add("doc1", tokens=["term0"] * 200)
+        assert index._ids == reference._ids
+        assert index._postings.keys() == reference._postings.keys()
+        for term, expected in reference._postings.items():
+            actual = index._postings[term]
+            assert actual.data == expected.data
+            assert (actual.count, actual.last_doc, actual.max_tf) == (expected.count, expected.last_doc, expected.max_tf)
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "bm25.npz"
+        index = BM25Index(index_path=path, compact_threshold=1.0)
+        for doc_id, tokens in random_corpus(100, seed=2).items():
+            index.add(doc_id, tokens=tokens)
+        index.remove(["doc5"])
+        index.save()
+
+        loaded = BM25Index(index_path=path)
+        assert len(loaded) == len(index)
+        assert "doc5" not in loaded
+        for query in (["term0", "term4"], ["term20"]):
+            assert_same_ranking(loaded.search(query, 10), index.search(query, 10))
+
+        # Postings stay appendable after a reload
+        loaded.add("new", tokens=["term20"] * 50)
+        assert loaded.search(["term20"], 1)[0][0] == "new"
+
+    def test_text_processor_terms_match_ingest_tokens(self):
+        processor = TextProcessor(offline=True, emit_tokens=True)
+        document = Document(id="a", content="The Higgs boson, observed at CERN!", metadata={})
+        processed = processor._apply(document, *processor._analyze(document.content))
+
+        index = BM25Index(analyzer=processor.terms)
+        index.add("a", tokens=processed.metadata['tokens'])
+        assert processed.metadata['tokens'] == ["higgs", "boson", "observed", "cern"]
+        assert [doc_id for doc_id, _ in index.search("higgs at CERN")] == ["a"]
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retriever_fuses_rankings():
+    lexical_index = BM25Index()
+    lexical_index.add("lexical", text="graphene superconductivity")
+    lexical_index.add("both", text="graphene bilayer superconductivity twisted")
+
+    manager = Mock()
+    manager.rank_similar = AsyncMock(return_value=[("both", 0.9), ("dense", 0.8)])
+    documents = {
+        doc_id: Document(id=doc_id, content=doc_id, metadata={})
+        for doc_id in ("lexical", "both", "dense")
+    }
+    manager.document_store.load_many = AsyncMock(side_effect=lambda ids: [documents[i] for i in ids])
+
+    retriever = HybridRetriever(manager, lexical_index, EmbeddingEngine(HashingEmbedder(dimension=16)))
+    results = await retriever.search("twisted graphene superconductivity", k=3)
+
+    assert [doc.id for doc in results] == ["both", "lexical", "dense"]
+    assert results[0].metadata['lexical_rank'] == 1
+    assert results[0].metadata['vector_rank'] == 1
+    assert results[2].metadata['lexical_rank'] is None
+    query_embedding, candidates = manager.rank_similar.call_args.args
+    assert query_embedding.shape == (16,)
+    assert candidates == retriever.candidates
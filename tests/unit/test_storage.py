@@ -0,0 +1,571 @@
+import numpy as np
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from pymongo.errors import BulkWriteError
+from qdrant_client.http import models as rest
+
+from src.data.loaders import Document
+from src.data.loaders.filters import Contains, In, Range
+from src.data.storage import MongoDocumentStore, NumpyVectorStore, QdrantVectorStore
+from src.data.storage.ann_index import IVFIndex, recall_at_k
+from src.data.storage.quantization import Float16Quantizer, ProductQuantizer, ScalarInt8Quantizer
+from src.data.storage.payload import payload_fields
+from src.data.storage.vector_store import chunk_key, point_id, to_qdrant_filter
+
+
+class _Cursor:
+    def __init__(self, records):
+        self.records = records
+
+    def __aiter__(self):
+        self._it = iter(self.records)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.fixture
+def document_store():
+    store = MongoDocumentStore("mongodb://localhost:27017", bulk_chunk_size=2)
+    store.collection = MagicMock()
+    store.collection.bulk_write = AsyncMock()
+    store.collection.delete_many = AsyncMock()
+    return store
+
+
+def _documents(n):
+    return [Document(id=f"doc_{i}", content=f"content {i}", metadata={}) for i in range(n)]
+
+
+class TestMongoDocumentStore:
+    @pytest.mark.asyncio
+    async def test_save_many_chunks_unordered_bulk_writes(self, document_store):
+        saved = await document_store.save_many(_documents(5))
+
+        assert saved == [True] * 5
+        calls = document_store.collection.bulk_write.await_args_list
+        assert [len(call.args[0]) for call in calls] == [2, 2, 1]
+        assert all(call.kwargs["ordered"] is False for call in calls)
+
+    @pytest.mark.asyncio
+    async def test_save_many_reports_failed_writes(self, document_store):
+        document_store.collection.bulk_write.side_effect = [
+            None,
+            BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "boom"}]}),
+            None,
+        ]
+
+        saved = await document_store.save_many(_documents(5))
+
+        assert saved == [True, True, True, False, True]
+
+    @pytest.mark.asyncio
+    async def test_load_many_preserves_input_order(self, document_store):
+        records = {
+            f"doc_{i}": {"id": f"doc_{i}", "content": f"content {i}", "metadata": {}}
+            for i in range(3)
+        }
+        document_store.collection.find = MagicMock(
+            side_effect=lambda query: _Cursor([records[i] for i in query["id"]["$in"] if i in records][::-1])
+        )
+
+        documents = await document_store.load_many(["doc_2", "missing", "doc_0", "doc_1"])
+
+        assert [d.id if d else None for d in documents] == ["doc_2", None, "doc_0", "doc_1"]
+        assert document_store.collection.find.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_many_sums_deleted_counts(self, document_store):
+        document_store.collection.delete_many.return_value = MagicMock(deleted_count=2)
+
+        assert await document_store.delete_many(["a", "b", "c"]) == 4
+        assert document_store.collection.delete_many.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_load_content_hashes_projects_hash_only(self, document_store):
+        document_store.collection.find = MagicMock(side_effect=lambda query, projection: _Cursor([
+            {"id": doc_id, "metadata": {"content_hash": f"h{doc_id}"}}
+            for doc_id in query["id"]["$in"] if doc_id != "new"
+        ]))
+
+        hashes = await document_store.load_content_hashes(["a", "new", "b"])
+
+        assert hashes == {"a": "ha", "b": "hb"}
+        assert document_store.collection.find.call_args_list[0].args[1]["metadata.content_hash"] == 1
+
+
+@pytest_asyncio.fixture
+async def vector_store():
+    store = QdrantVectorStore(location=":memory:", dimension=8, batch_size=3)
+    await store.initialize()
+    yield store
+    await store.close()
+
+
+def _unit_rows(n, dim=8, seed=0):
+    matrix = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class TestQdrantVectorStore:
+    @pytest.mark.asyncio
+    async def test_save_many_and_load(self, vector_store):
+        keys = [f"doc_{i}" for i in range(7)]
+        matrix = _unit_rows(7)
+
+        assert await vector_store.save_many(keys, matrix)
+
+        loaded = await vector_store.load("doc_5")
+        np.testing.assert_allclose(loaded, matrix[5], rtol=1e-5)
+        assert await vector_store.load("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_search_and_delete(self, vector_store):
+        matrix = _unit_rows(5)
+        await vector_store.save_many([f"doc_{i}" for i in range(5)], matrix)
+
+        results = await vector_store.search(matrix[2], k=2)
+        assert results[0][0] == "doc_2"
+        assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+        assert await vector_store.delete("doc_2")
+        assert "doc_2" not in [key for key, _ in await vector_store.search(matrix[2], k=5)]
+
+    @pytest.mark.asyncio
+    async def test_save_many_rejects_mismatched_shape(self, vector_store):
+        with pytest.raises(ValueError):
+            await vector_store.save_many(["a", "b"], _unit_rows(3))
+
+    def test_point_ids_are_deterministic(self):
+        assert point_id("doc_1") == point_id("doc_1")
+        assert point_id("doc_1") != point_id("doc_2")
+        # Pinned so that a change to the ID scheme is caught before it orphans stored points
+        assert point_id("doc_1") == "9a876df9-b45f-5233-8923-9ac00551185e"
+
+    @pytest.mark.asyncio
+    async def test_migrate_point_ids(self, vector_store):
+        matrix = _unit_rows(5)
+        await vector_store.client.upsert(
+            collection_name=vector_store.collection_name,
+            points=[
+                rest.PointStruct(id=i, vector=matrix[i].tolist(), payload={"document_id": f"doc_{i}"})
+                for i in range(5)
+            ]
+        )
+
+        assert await vector_store.migrate_point_ids(page_size=2) == 5
+        assert await vector_store.migrate_point_ids(page_size=2) == 0
+
+        np.testing.assert_allclose(await vector_store.load("doc_3"), matrix[3], rtol=1e-5)
+        count = await vector_store.client.count(vector_store.collection_name)
+        assert count.count == 5
+
+    @pytest.mark.asyncio
+    async def test_delete_documents_removes_all_chunks(self, vector_store):
+        matrix = _unit_rows(4)
+        keys = [chunk_key("a", 0), chunk_key("a", 1), chunk_key("b", 0), chunk_key("b", 1)]
+        payloads = [
+            {"document_id": key.split("#")[0], "chunk_index": int(key.split("#")[1])} for key in keys
+        ]
+        await vector_store.save_many(keys, matrix, payloads=payloads)
+
+        assert await vector_store.delete_documents(["a"])
+
+        assert await vector_store.load(chunk_key("a", 1)) is None
+        assert await vector_store.load(chunk_key("b", 1)) is not None
+
+    @pytest.mark.asyncio
+    async def test_trim_documents_drops_chunks_past_count(self, vector_store):
+        keys = [chunk_key("a", i) for i in range(3)] + [chunk_key("b", i) for i in range(2)]
+        payloads = [{"document_id": key.split("#")[0], "chunk_index": int(key.split("#")[1])} for key in keys]
+        await vector_store.save_many(keys, _unit_rows(5), payloads=payloads)
+
+        assert await vector_store.trim_documents({"a": 1, "b": 2})
+
+        assert await vector_store.load(chunk_key("a", 0)) is not None
+        assert await vector_store.load(chunk_key("a", 1)) is None
+        assert await vector_store.load(chunk_key("a", 2)) is None
+        assert await vector_store.load(chunk_key("b", 1)) is not None
+
+
+@pytest_asyncio.fixture
+async def numpy_store(tmp_path):
+    store = NumpyVectorStore(str(tmp_path / "vectors"), dimension=8, initial_capacity=2)
+    await store.initialize()
+    return store
+
+
+class TestNumpyVectorStore:
+    @pytest.mark.asyncio
+    async def test_search_matches_brute_force(self, numpy_store):
+        matrix = _unit_rows(50)
+        await numpy_store.save_many([f"doc_{i}" for i in range(50)], matrix)
+
+        query = _unit_rows(1, seed=1)[0]
+        expected = np.argsort(-(matrix @ query))[:5]
+
+        results = await numpy_store.search(query, k=5)
+
+        assert [key for key, _ in results] == [f"doc_{i}" for i in expected]
+        assert results[0][1] == pytest.approx(float(matrix[expected[0]] @ query), abs=1e-5)
+
+    @pytest.mark.asyncio
+    async def test_overwrite_and_delete(self, numpy_store):
+        matrix = _unit_rows(4)
+        await numpy_store.save_many(["a", "b", "c", "d"], matrix)
+        await numpy_store.save("a", matrix[3])
+
+        np.testing.assert_allclose(await numpy_store.load("a"), matrix[3], rtol=1e-5)
+        assert await numpy_store.delete("b")
+        assert not await numpy_store.delete("b")
+        assert await numpy_store.load("b") is None
+        assert "b" not in [key for key, _ in await numpy_store.search(matrix[1], k=4)]
+        assert len(numpy_store) == 3
+
+    @pytest.mark.asyncio
+    async def test_compaction_keeps_live_rows(self, numpy_store):
+        matrix = _unit_rows(10)
+        await numpy_store.save_many([f"doc_{i}" for i in range(10)], matrix)
+        for i in range(0, 10, 2):
+            await numpy_store.delete(f"doc_{i}")
+
+        assert numpy_store._count == 5
+        np.testing.assert_allclose(await numpy_store.load("doc_7"), matrix[7], rtol=1e-5)
+        assert (await numpy_store.search(matrix[9], k=1))[0][0] == "doc_9"
+
+    @pytest.mark.asyncio
+    async def test_compaction_is_persisted_without_flush(self, numpy_store):
+        numpy_store.COPY_ROWS = 2
+        matrix = _unit_rows(10)
+        await numpy_store.save_many([f"doc_{i}" for i in range(10)], matrix)
+        numpy_store.flush()
+        for i in range(0, 10, 2):
+            await numpy_store.delete(f"doc_{i}")
+
+        # Reopen without close(), as after a crash
+        reopened = NumpyVectorStore(str(numpy_store.directory), dimension=8)
+        await reopened.initialize()
+
+        assert reopened._count == 5
+        np.testing.assert_allclose(await reopened.load("doc_7"), matrix[7], rtol=1e-5)
+        assert (await reopened.search(matrix[9], k=1))[0][0] == "doc_9"
+
+    @pytest.mark.asyncio
+    async def test_failed_matrix_swap_keeps_store_usable(self, numpy_store, monkeypatch):
+        matrix = _unit_rows(10)
+        await numpy_store.save_many([f"doc_{i}" for i in range(10)], matrix)
+
+        def failing_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("src.data.storage.numpy_store.os.replace", failing_replace)
+        with pytest.raises(OSError):
+            numpy_store.compact()
+        monkeypatch.undo()
+
+        np.testing.assert_allclose(await numpy_store.load("doc_3"), matrix[3], rtol=1e-5)
+        assert (await numpy_store.search(matrix[9], k=1))[0][0] == "doc_9"
+
+    @pytest.mark.asyncio
+    async def test_delete_documents_removes_all_chunks(self, numpy_store):
+        keys = [chunk_key("a", 0), chunk_key("a", 1), chunk_key("b", 0)]
+        payloads = [{"document_id": "a"}, {"document_id": "a"}, {"document_id": "b"}]
+        await numpy_store.save_many(keys, _unit_rows(3), payloads=payloads)
+
+        await numpy_store.delete_documents(["a"])
+
+        assert [key for key, _ in await numpy_store.search(_unit_rows(1)[0], k=3)] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_trim_documents_drops_chunks_past_count(self, numpy_store):
+        keys = [chunk_key("a", 0), chunk_key("a", 1), chunk_key("b", 0)]
+        payloads = [
+            {"document_id": "a", "chunk_index": 0},
+            {"document_id": "a", "chunk_index": 1},
+            {"document_id": "b", "chunk_index": 0},
+        ]
+        await numpy_store.save_many(keys, _unit_rows(3), payloads=payloads)
+
+        await numpy_store.trim_documents({"a": 1, "b": 0})
+
+        assert await numpy_store.load(chunk_key("a", 0)) is not None
+        assert await numpy_store.load(chunk_key("a", 1)) is None
+        assert len(numpy_store) == 1
+
+    @pytest.mark.asyncio
+    async def test_reopens_from_disk(self, numpy_store):
+        matrix = _unit_rows(6)
+        await numpy_store.save_many([f"doc_{i}" for i in range(6)], matrix)
+        await numpy_store.delete("doc_0")
+        await numpy_store.close()
+
+        reopened = NumpyVectorStore(str(numpy_store.directory), dimension=8)
+        await reopened.initialize()
+
+        assert isinstance(reopened._matrix, np.memmap)
+        assert len(reopened) == 5
+        assert await reopened.load("doc_0") is None
+        np.testing.assert_allclose(await reopened.load("doc_4"), matrix[4], rtol=1e-5)
+
+
+def _clustered_rows(n, dim=16, clusters=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    matrix = centers[rng.integers(clusters, size=n)] + 0.1 * rng.standard_normal((n, dim))
+    matrix = matrix.astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class TestIVFIndex:
+    def test_recall_at_k(self):
+        assert recall_at_k([[1, 2], [3, 4]], [[2, 1], [3, 5]]) == 0.75
+        assert recall_at_k([], []) == 1.0
+
+    @pytest.mark.asyncio
+    async def test_ann_search_recall_and_incremental_adds(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path), dimension=16, ann_index=IVFIndex(nlist=8, nprobe=2))
+        await store.initialize()
+        matrix = _clustered_rows(400)
+        await store.save_many([f"doc_{i}" for i in range(300)], matrix[:300])
+
+        store.train_index()
+        await store.save_many([f"doc_{i}" for i in range(300, 400)], matrix[300:])
+
+        assert store.evaluate_recall(matrix[::40], k=5) >= 0.9
+        assert (await store.search(matrix[350], k=1))[0][0] == "doc_350"
+
+        await store.delete("doc_350")
+        assert "doc_350" not in [key for key, _ in await store.search(matrix[350], k=5)]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_keys_in_one_call_index_last_row_only(self):
+        store = NumpyVectorStore(dimension=16, ann_index=IVFIndex(nlist=4, nprobe=4))
+        await store.initialize()
+        matrix = _clustered_rows(104)
+        await store.save_many([f"doc_{i}" for i in range(100)], matrix[:100])
+        store.train_index()
+
+        await store.save_many(["dup", "x", "dup", "dup"], matrix[100:104])
+
+        assert store._count == 102 and len(store) == 102
+        np.testing.assert_allclose(await store.load("dup"), matrix[103], rtol=1e-5)
+        index = store.ann_index
+        assert (index._assignments >= 0).sum() == 102
+        expected = index._nearest(matrix[103:104], index.centroids)[0]
+        assert index._assignments[store._rows["dup"]] == expected
+
+    @pytest.mark.asyncio
+    async def test_index_survives_restart(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path), dimension=16, ann_index=IVFIndex(nlist=4, nprobe=1))
+        await store.initialize()
+        matrix = _clustered_rows(100)
+        await store.save_many([f"doc_{i}" for i in range(100)], matrix)
+        store.train_index()
+        await store.close()
+
+        reopened = NumpyVectorStore(str(tmp_path), dimension=16)
+        await reopened.initialize()
+
+        assert reopened.ann_index.is_trained
+        assert reopened.ann_index.nprobe == 1
+        assert (await reopened.search(matrix[10], k=1))[0][0] == "doc_10"
+
+
+class TestQuantization:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("quantizer, ratio, min_recall", [
+        (Float16Quantizer(16), 2, 0.95),
+        (ScalarInt8Quantizer(16), 4, 0.9),
+        (ProductQuantizer(16, subspaces=4), 16, 0.75),
+    ])
+    async def test_quantized_search_with_rescoring(self, quantizer, ratio, min_recall):
+        store = NumpyVectorStore(dimension=16, quantizer=quantizer, rescore_factor=8)
+        await store.initialize()
+        matrix = _clustered_rows(600)
+        await store.save_many([f"doc_{i}" for i in range(500)], matrix[:500])
+
+        store.train_quantizer()
+        await store.save_many([f"doc_{i}" for i in range(500, 600)], matrix[500:])
+
+        assert store.memory_report()['compression_ratio'] == ratio
+        assert store.evaluate_recall(matrix[::30], k=5) >= min_recall
+        assert "doc_550" in [key for key, _ in await store.search(matrix[550], k=5)]
+
+    @pytest.mark.asyncio
+    async def test_rescoring_skips_tombstoned_rows(self):
+        store = NumpyVectorStore(dimension=16, quantizer=ScalarInt8Quantizer(16), compact_threshold=1.0)
+        await store.initialize()
+        matrix = _clustered_rows(10)
+        await store.save_many([f"doc_{i}" for i in range(10)], matrix)
+        store.train_quantizer()
+        for i in range(0, 10, 2):
+            await store.delete(f"doc_{i}")
+
+        results = await store.search(matrix[0], k=5)
+
+        assert sorted(key for key, _ in results) == [f"doc_{i}" for i in range(1, 10, 2)]
+
+    def test_int8_scores_approximate_dot_products(self):
+        matrix = _unit_rows(100, dim=16)
+        quantizer = ScalarInt8Quantizer(16)
+        quantizer.train(matrix)
+
+        codes = quantizer.encode(matrix)
+
+        assert codes.dtype == np.uint8
+        np.testing.assert_allclose(quantizer.scores(codes, matrix[0]), matrix @ matrix[0], atol=0.02)
+
+    @pytest.mark.asyncio
+    async def test_quantized_codes_survive_restart(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path), dimension=16, quantizer=ScalarInt8Quantizer(16))
+        await store.initialize()
+        matrix = _clustered_rows(50)
+        await store.save_many([f"doc_{i}" for i in range(50)], matrix)
+        store.train_quantizer()
+        await store.close()
+
+        reopened = NumpyVectorStore(str(tmp_path), dimension=16)
+        await reopened.initialize()
+
+        assert reopened.memory_report()['quantizer'] == "int8"
+        assert (await reopened.search(matrix[7], k=1))[0][0] == "doc_7"
+
+    @pytest.mark.asyncio
+    async def test_qdrant_int8_quantization(self):
+        store = QdrantVectorStore(location=":memory:", dimension=8, quantization="int8")
+        await store.initialize()
+        matrix = _unit_rows(5)
+        await store.save_many([f"doc_{i}" for i in range(5)], matrix)
+
+        assert store._quantization_config().scalar.type == rest.ScalarType.INT8
+        assert store._search_params().quantization.rescore
+        assert (await store.search(matrix[3], k=1))[0][0] == "doc_3"
+        await store.close()
+
+
+def _payload_corpus(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    categories = ["cs.LG", "stat.ML", "hep-th", "math.CO"]
+    payloads = []
+    for i in range(n):
+        payload = {
+            "document_id": f"doc_{i}",
+            "categories": sorted(set(rng.choice(categories, size=rng.integers(1, 3)).tolist())),
+            "update_date": f"{rng.integers(2019, 2025)}-{rng.integers(1, 13):02d}-15",
+        }
+        if i % 3:
+            payload["license"] = "cc-by"
+        payloads.append(payload)
+    return payloads
+
+
+FILTER_CASES = [
+    ({"categories": "cs.LG"}, lambda p: "cs.LG" in p["categories"]),
+    ({"categories": In(["hep-th", "math.CO"])}, lambda p: {"hep-th", "math.CO"} & set(p["categories"])),
+    (
+        {"categories": Contains("cs.LG"), "update_date": Range(gt="2022-01-01")},
+        lambda p: "cs.LG" in p["categories"] and p["update_date"] > "2022-01-01"
+    ),
+    (
+        {"update_date": Range(gte="2020-03-15", lt="2021-06-15"), "license": "cc-by"},
+        lambda p: "2020-03-15" <= p["update_date"] < "2021-06-15" and p.get("license") == "cc-by"
+    ),
+    # Bounds with a time component compare at that precision
+    ({"update_date": Range(lt="2021-06-15T12:00")}, lambda p: p["update_date"] <= "2021-06-15"),
+    ({"update_date": Range(gt="2021-06-15T00:00:00Z")}, lambda p: p["update_date"] > "2021-06-15"),
+    ({"categories": "q-bio.NC"}, lambda p: False),
+]
+
+
+class TestPayloadFilters:
+    @staticmethod
+    def _expected(matrix, payloads, query, matches, k):
+        rows = [i for i, payload in enumerate(payloads) if matches(payload)]
+        rows.sort(key=lambda i: -float(matrix[i] @ query))
+        return [payloads[i]["document_id"] for i in rows[:k]]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("filter_dict, matches", FILTER_CASES)
+    async def test_numpy_prefilter_matches_brute_force(self, numpy_store, filter_dict, matches):
+        payloads = _payload_corpus()
+        matrix = _unit_rows(len(payloads))
+        await numpy_store.save_many([p["document_id"] for p in payloads], matrix, payloads=payloads)
+        query = _unit_rows(1, seed=1)[0]
+
+        results = await numpy_store.search(query, k=5, filter_dict=filter_dict)
+
+        assert [key for key, _ in results] == self._expected(matrix, payloads, query, matches, 5)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("filter_dict, matches", FILTER_CASES)
+    async def test_qdrant_pushdown_matches_brute_force(self, vector_store, filter_dict, matches):
+        payloads = _payload_corpus()
+        matrix = _unit_rows(len(payloads))
+        await vector_store.save_many([p["document_id"] for p in payloads], matrix, payloads=payloads)
+        query = _unit_rows(1, seed=1)[0]
+
+        results = await vector_store.search(query, k=5, filter_dict=filter_dict)
+
+        assert [key for key, _ in results] == self._expected(matrix, payloads, query, matches, 5)
+
+    @pytest.mark.asyncio
+    async def test_numpy_skips_malformed_dates(self, numpy_store):
+        payloads = [
+            {"document_id": "a", "update_date": "2021-06-15"},
+            {"document_id": "b", "update_date": "not a date"},
+        ]
+        await numpy_store.save_many(["a", "b"], _unit_rows(2), payloads=payloads)
+        await numpy_store.close()
+
+        reopened = NumpyVectorStore(str(numpy_store.directory), dimension=8)
+        await reopened.initialize()
+        results = await reopened.search(_unit_rows(1)[0], k=2, filter_dict={"update_date": Range(gte="2000-01-01")})
+
+        assert len(reopened) == 2
+        assert [key for key, _ in results] == ["a"]
+        with pytest.raises(ValueError):
+            await reopened.search(_unit_rows(1)[0], filter_dict={"update_date": Range(gte="yesterday")})
+
+    @pytest.mark.asyncio
+    async def test_numpy_bitmaps_follow_overwrites_and_compaction(self, numpy_store):
+        payloads = _payload_corpus(20)
+        matrix = _unit_rows(20)
+        await numpy_store.save_many([p["document_id"] for p in payloads], matrix, payloads=payloads)
+
+        # Re-saving a key reuses its row with a new payload
+        await numpy_store.save_many(
+            ["doc_0"], matrix[:1], payloads=[{"document_id": "doc_0", "categories": ["q-bio.NC"]}]
+        )
+        for i in range(1, 20, 2):
+            await numpy_store.delete(f"doc_{i}")
+        await numpy_store.close()
+
+        reopened = NumpyVectorStore(str(numpy_store.directory), dimension=8)
+        await reopened.initialize()
+        expected = {
+            p["document_id"] for i, p in enumerate(payloads)
+            if i and i % 2 == 0 and "cs.LG" in p["categories"]
+        }
+        for store in (numpy_store, reopened):
+            renamed = await store.search(matrix[0], k=5, filter_dict={"categories": "q-bio.NC"})
+            assert [key for key, _ in renamed] == ["doc_0"]
+            hits = await store.search(matrix[0], k=20, filter_dict={"categories": "cs.LG"})
+            assert {key for key, _ in hits} == expected
+
+    @pytest.mark.asyncio
+    async def test_filters_reject_unindexed_fields(self, numpy_store):
+        with pytest.raises(ValueError):
+            await numpy_store.search(_unit_rows(1)[0], filter_dict={"title": "x"})
+        with pytest.raises(ValueError):
+            to_qdrant_filter({"categories": Range(gte="a")})
+
+    def test_payload_fields_of_arxiv_documents(self):
+        document = Document(
+            id="a", content="", metadata={"categories": "cs.LG stat.ML", "update_date": "2023-01-02"}
+        )
+        assert payload_fields(document) == {"categories": ["cs.LG", "stat.ML"], "update_date": "2023-01-02"}
@@ -1,4 +1,6 @@
-﻿import pytest
+﻿import numpy as np
+import pytest
+from src.data.loaders import Document
 from src.data.validators import DocumentValidator, EmbeddingValidator
 
 class TestDocumentValidator:
@@ -6,3 +8,60 @@ class TestDocumentValidator:
         validator = DocumentValidator()
         result = validator.validate(sample_document)
         assert result.is_valid
+
+    def test_validate_batch(self, sample_document):
+        validator = DocumentValidator()
+        empty = Document(id="empty", content="", metadata={})
+
+        results = validator.validate_batch([sample_document, empty, sample_document])
+
+        assert [r.is_valid for r in results] == [True, False, True]
+        assert "Duplicate document ID in batch" in results[2].warnings
+        assert "Duplicate document ID in batch" not in results[0].warnings
+
+    def test_validate_batch_collects_messages_per_document(self):
+        validator = DocumentValidator()
+        documents = [
+            Document(id="", content="short", metadata={"source": "x"}),
+            Document(id="big", content="x" * (DocumentValidator.MAX_CONTENT_LENGTH + 1), metadata={}),
+            Document(id="ok", content="long enough content", metadata={"source": "x", "created_at": "2024"}),
+        ]
+
+        results = validator.validate_batch(documents)
+
+        assert results[0].errors == ["Document ID is required"]
+        assert results[0].warnings == ["Document content is very short", "Creation date missing in metadata"]
+        assert results[1].errors == ["Document content exceeds maximum size"]
+        assert results[1].warnings == []
+        assert results[2].is_valid and results[2].warnings == []
+        assert validator.validate_batch([]) == []
+
+
+class TestEmbeddingValidator:
+    def test_validate_batch_flags_rows(self, sample_embedding):
+        validator = EmbeddingValidator()
+        matrix = np.stack([sample_embedding, sample_embedding * 3, sample_embedding])
+        matrix[2, 5] = np.nan
+
+        result = validator.validate_batch(matrix)
+
+        assert result.valid.tolist() == [True, True, False]
+        assert not result.is_valid
+        assert result.errors == {2: ["Embedding contains non-finite values"]}
+        assert result.warnings == {1: ["Embedding is not normalized"]}
+
+    def test_validate_batch_normalizes_in_place(self, sample_embedding):
+        validator = EmbeddingValidator()
+        matrix = np.stack([sample_embedding * 2, np.zeros(768)])
+
+        result = validator.validate_batch(matrix, normalize=True)
+
+        assert result.is_valid
+        np.testing.assert_allclose(matrix[0], sample_embedding)
+        assert result.warnings == {1: ["Embedding is not normalized"]}
+
+    def test_validate_batch_rejects_wrong_dimension(self):
+        result = EmbeddingValidator().validate_batch(np.ones((3, 10)))
+
+        assert not result.valid.any()
+        assert result.errors[0] == ["Expected embedding dimension 768, got 10"]